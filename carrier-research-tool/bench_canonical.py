@@ -0,0 +1,73 @@
+"""
+Benchmark: canonical search keys over the full input list.
+
+Reads the input once, then builds search keys for every row with the old
+whitespace/case normalization and with canonical.py, cold (memo cleared)
+and warm, and prints keys/s and how many distinct searches each leaves.
+
+Usage: python bench_canonical.py [--input input_fast.csv] [--repeat N]
+"""
+import argparse
+import time
+
+from canonical import canonical_search_key, clear_memo, memo_stats
+from input_reader import iter_input
+from lookup_cache import normalize_value
+
+
+def normalized_key(employer):
+    return (
+        normalize_value(employer["employer_name"]),
+        normalize_value(employer["zip_code"]),
+        normalize_value(employer["coverage_date"]),
+    )
+
+
+def canonical_key(employer):
+    return canonical_search_key(
+        employer["employer_name"], employer["zip_code"], employer["coverage_date"]
+    )
+
+
+def time_keys(build_key, employers, repeat, before_each=None):
+    """Best-of-`repeat` seconds to key every row, and the distinct keys"""
+    best = None
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        keys = [build_key(employer) for employer in employers]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(set(keys))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", default="input_fast.csv")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    employers = list(iter_input(args.input))
+    rows = len(employers)
+    print(f"{rows} rows from {args.input}")
+
+    runs = [
+        ("normalized (old key)", normalized_key, None),
+        ("canonical, cold memo", canonical_key, clear_memo),
+        ("canonical, warm memo", canonical_key, None),
+    ]
+    for label, build_key, before_each in runs:
+        elapsed, distinct = time_keys(build_key, employers, args.repeat, before_each)
+        print(
+            f"  {label:<22} {rows / elapsed:>12,.0f} keys/s  "
+            f"{distinct:>6} distinct searches ({rows - distinct} rows deduplicated)"
+        )
+
+    for name, info in memo_stats().items():
+        print(f"  memo {name:<15} {info.currsize} entries, {info.hits} hits, {info.misses} misses")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
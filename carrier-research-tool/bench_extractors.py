@@ -0,0 +1,122 @@
+"""
+Microbenchmark: lxml extractors vs. the BeautifulSoup reference path.
+
+Runs the saved pages in debug_logs/ (error and no-result responses) plus
+synthetic search and detail pages built from debug_page_source.html through
+both implementations, checks that they agree, and prints pages/s for each.
+
+Usage: python bench_extractors.py [--pages N] [--repeat N]
+"""
+import argparse
+import glob
+import html
+import os
+import time
+
+from extractors import (
+    extract_policy_details,
+    extract_search_results,
+    policy_details_bs4,
+    search_results_bs4,
+)
+
+DEBUG_DIR = "debug_logs"
+PAGE_TEMPLATE = "debug_page_source.html"
+
+
+def load_saved_pages(limit):
+    """Read up to `limit` saved response pages, newest first"""
+    paths = sorted(glob.glob(os.path.join(DEBUG_DIR, "*.html")), reverse=True)
+    pages = []
+    for path in paths[:limit]:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def wrap_in_template(fragment):
+    """Embed a results fragment in a real saved page so parse cost is realistic"""
+    with open(PAGE_TEMPLATE, "r", encoding="utf-8") as f:
+        page = f.read()
+    marker = page.rfind("</body>")
+    if marker == -1:
+        return page + fragment
+    return page[:marker] + fragment + page[marker:]
+
+
+def synthetic_search_page(rows):
+    body = "".join(
+        f'<tr class="text-primary link-cursor" data-employer="{html.escape(name)}" '
+        f'data-city="{city}" data-state="CA"><td>{html.escape(name)}</td>'
+        f"<td>{city}</td><td>CA</td></tr>"
+        for name, city in (
+            (f"EMPLOYER {i} & SONS, INC.", f"CITY {i % 17}") for i in range(rows)
+        )
+    )
+    return wrap_in_template(f'<table class="table"><tbody>{body}</tbody></table>')
+
+
+def synthetic_details_page():
+    cells = "".join(
+        f"<td> {value} </td>"
+        for value in (
+            "ACME <b>HOLDINGS</b> LLC",
+            "123 MAIN ST",
+            "FRESNO",
+            "CA",
+            "93716",
+            "STATE COMPENSATION INSURANCE FUND",
+            "12-3456789",
+        )
+    )
+    return wrap_in_template(
+        '<table class="table table-borderless"><tbody>'
+        f'<tr class="detail-row">{cells}</tr></tbody></table>'
+    )
+
+
+def bench(label, func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    elapsed = time.perf_counter() - start
+    rate = len(pages) * repeat / elapsed
+    print(f"  {label:<22} {rate:10.1f} pages/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200, help="saved pages to load")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over each corpus")
+    args = parser.parse_args()
+
+    saved = load_saved_pages(args.pages)
+    search_pages = saved + [synthetic_search_page(n) for n in (1, 5, 25, 100)]
+    details_pages = saved + [synthetic_details_page()]
+
+    mismatches = 0
+    for page in search_pages:
+        mismatches += extract_search_results(page) != search_results_bs4(page)
+    for page in details_pages:
+        mismatches += extract_policy_details(page) != policy_details_bs4(page)
+
+    print(f"Corpus: {len(saved)} saved pages + synthetic result pages")
+    print(f"Agreement: {mismatches} mismatches")
+
+    print("Search pages")
+    fast = bench("extract_search_results", extract_search_results, search_pages, args.repeat)
+    slow = bench("BeautifulSoup", search_results_bs4, search_pages, args.repeat)
+    print(f"  speedup {fast / slow:.1f}x")
+
+    print("Detail pages")
+    fast = bench("extract_policy_details", extract_policy_details, details_pages, args.repeat)
+    slow = bench("BeautifulSoup", policy_details_bs4, details_pages, args.repeat)
+    print(f"  speedup {fast / slow:.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
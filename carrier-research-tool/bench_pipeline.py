@@ -0,0 +1,170 @@
+"""
+End-to-end benchmark of the fast_main pipeline against the local stand-in.
+
+Starts standin_server.StandInServer, points fast_main at it and runs the
+real process_employers_concurrent() (query planning, detail memo, rate
+limiter, progress journal, results store) over a synthetic or given input,
+with no network and no browser. Progress and results files are written to
+a temporary directory, so the real run's files are never touched.
+
+Reports employers/minute, requests per employer, the status mix the
+stand-in served and peak RSS.
+
+Usage:
+  python bench_pipeline.py --employers 2000 --workers 15 --latency-ms 150
+  python bench_pipeline.py --input input_fast.csv --rps 5 --rate-limit-rate 0.02
+  python bench_pipeline.py --hit-filter threshold --hit-min-score 0.7
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from standin_server import CITIES, StandInServer
+
+WORDS = [
+    "BAXTER", "MOORE", "MORRIS", "COTATI", "PACIFIC", "GOLDEN", "VALLEY",
+    "SIERRA", "COASTAL", "SUMMIT", "HARBOR", "MISSION", "CENTRAL", "DELTA",
+]
+KINDS = ["AUTO", "FOOD", "ELECTRIC", "PLUMBING", "BUILDERS", "DENTAL", "FARMS", "LOGISTICS"]
+
+
+def synthetic_employers(count, seed=0):
+    """Yield `count` input rows; names repeat, as real inputs do"""
+    rng = random.Random(seed)
+    for number in range(1, count + 1):
+        _, _, zip_code = rng.choice(CITIES)
+        yield {
+            "bureau_number": str(number),
+            "employer_name": f"{rng.choice(WORDS)} {rng.choice(KINDS)}",
+            "zip_code": zip_code,
+            "coverage_date": "11/1/2025",
+        }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employers", type=int, default=1000, help="synthetic input rows")
+    parser.add_argument("--input", help="input CSV to run instead of synthetic rows")
+    parser.add_argument("--workers", type=int, default=15)
+    parser.add_argument("--in-flight", type=int, default=30, help="query groups in flight")
+    parser.add_argument("--rps", type=float, default=0, help="shared request rate; 0 disables pacing")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--max-hits", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hit-filter", choices=("all", "top_k", "threshold"), default="all")
+    parser.add_argument("--hit-top-k", type=int, default=3)
+    parser.add_argument("--hit-min-score", type=float, default=0.6)
+    parser.add_argument("--verbose", action="store_true", help="keep fast_main's step log")
+    args = parser.parse_args()
+
+    input_path = os.path.abspath(args.input) if args.input else None
+    workdir = tempfile.TemporaryDirectory(prefix="bench_pipeline_")
+    os.chdir(workdir.name)
+
+    import requests
+
+    import fast_main
+    from buffered_log import LEVELS
+    from hit_ranking import HitRanker
+    from lookup_cache import DetailMemo
+    from progress_journal import Progress, ProgressJournal
+    from results_store import ResultsStore
+
+    if not args.verbose:
+        fast_main.execution_log.min_level = LEVELS["WARNING"]
+
+    server = StandInServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_hits=args.max_hits,
+        seed=args.seed,
+    ).start()
+
+    fast_main.SEARCH_URL = server.url
+    fast_main.lookup_cache = None
+    fast_main.detail_memo = DetailMemo()
+    fast_main.hit_ranker = HitRanker(args.hit_filter, args.hit_top_k, args.hit_min_score)
+    fast_main.request_limiter = fast_main.RateLimiter(args.rps) if args.rps else None
+    fast_main.progress_journal = ProgressJournal(
+        "progress.snapshot.jsonl", "progress.journal.jsonl"
+    )
+    results_store = ResultsStore("results.jsonl")
+    progress = Progress()
+
+    if input_path:
+        employers = fast_main.stream_input_csv(input_path)
+    else:
+        employers = synthetic_employers(args.employers, args.seed)
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.workers)
+    session.mount("http://", adapter)
+
+    start = time.perf_counter()
+    try:
+        completed = fast_main.process_employers_concurrent(
+            session,
+            employers,
+            progress,
+            max_workers=args.workers,
+            results_store=results_store,
+            max_in_flight=args.in_flight,
+        )
+    finally:
+        elapsed = time.perf_counter() - start
+        server.stop()
+        fast_main.execution_log.flush()
+
+    stats = server.stats()
+    lookups = stats["handlers"].get("SearchPolicyHolders", 0) + stats["handlers"].get("PolicyHolderDetails", 0)
+    memo = fast_main.detail_memo.stats()
+    ranking = fast_main.hit_ranker.stats()
+
+    print("=" * 60)
+    print("PIPELINE BENCHMARK (local stand-in)")
+    print("=" * 60)
+    print(f"Employers:          {completed}")
+    print(f"Elapsed:            {elapsed:.2f}s")
+    print(f"Employers/minute:   {completed / elapsed * 60:.1f}")
+    print(
+        f"Requests:           {lookups} "
+        f"({stats['handlers'].get('SearchPolicyHolders', 0)} search, "
+        f"{stats['handlers'].get('PolicyHolderDetails', 0)} details)"
+    )
+    print(f"Requests/employer:  {lookups / max(completed, 1):.2f}")
+    print(f"Status mix:         {', '.join(f'{s} {n}' for s, n in sorted(stats['statuses'].items()))}")
+    print(f"Detail memo:        {memo['hits']} hits, {memo['misses']} misses")
+    print(
+        f"Hit filter:         {ranking['mode']}, {ranking['fetched']}/{ranking['hits']} hits fetched, "
+        f"{ranking['skipped']} skipped"
+    )
+    print(f"Result records:     {len(results_store)}")
+    for status, count in progress.status_counts.most_common():
+        print(f"   - {status}: {count}")
+    print(f"Peak RSS:           {peak_rss_mb():.1f} MB")
+
+    fast_main.progress_journal.close()
+    results_store.close()
+    os.chdir(os.path.dirname(workdir.name))
+    workdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
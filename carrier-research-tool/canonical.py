@@ -0,0 +1,88 @@
+"""
+Canonical forms of employer names, ZIP codes and coverage dates.
+
+Input rows for the same employer differ in ways the search doesn't care
+about: "INC." vs "INC" vs no suffix, punctuation, doubled spaces, ZIP+4 vs
+5-digit ZIP ("932919358" vs "93291"), "11/1/2025" vs "11/01/2025". Keys built
+from the canonical forms let the query planner and the lookup cache treat
+those rows as the same search.
+
+The canonical forms are only used for keys; the request still sends the
+row's own values. Rules are precompiled once and each function is memoized
+per distinct input, since a 15k-row list has far fewer distinct values.
+"""
+import re
+from datetime import datetime
+from functools import lru_cache
+
+_MEMO_SIZE = 1 << 16
+
+_AMPERSAND = re.compile(r"\s*&\s*")
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_WHITESPACE = re.compile(r"\s+")
+# "L L C" is what "L.L.C." becomes once the dots are folded
+_LEGAL_SUFFIX = re.compile(
+    r"\s+(?:INC|INCORPORATED|CORP|CORPORATION|CO|COMPANY|LLC|L L C|LLP|L L P"
+    r"|LP|L P|LTD|LIMITED|PC|P C|PLLC|PLC)$"
+)
+_NON_DIGIT = re.compile(r"\D")
+
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y", "%m-%d-%Y")
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def canonical_name(name):
+    """Upper-cased name with punctuation folded and legal suffixes dropped"""
+    name = _AMPERSAND.sub(" AND ", str(name or "").upper())
+    name = _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", name)).strip()
+    # Drop suffixes one at a time ("CO LTD"), but keep the one that is the
+    # whole name ("CO") or part of it ("SMITH AND CO")
+    while True:
+        stripped = _LEGAL_SUFFIX.sub("", name)
+        if stripped == name or not stripped or f" {stripped}".endswith(" AND"):
+            return name
+        name = stripped
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def canonical_zip(zip_code):
+    """The 5-digit ZIP; ZIP+4 is truncated and dropped leading zeros restored"""
+    digits = _NON_DIGIT.sub("", str(zip_code or ""))
+    if not digits:
+        return ""
+    if len(digits) <= 5:
+        return digits.zfill(5)
+    return digits.zfill(9)[:5]
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def canonical_date(date_str):
+    """yyyy-mm-dd for any of the accepted date spellings, else the stripped text"""
+    date_str = str(date_str or "").strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return date_str.upper()
+
+
+def canonical_search_key(employer_name, zip_code, coverage_date):
+    return (
+        canonical_name(employer_name),
+        canonical_zip(zip_code),
+        canonical_date(coverage_date),
+    )
+
+
+def memo_stats():
+    """Hit/miss counts of the memo tables, per function"""
+    return {
+        function.__name__: function.cache_info()
+        for function in (canonical_name, canonical_zip, canonical_date)
+    }
+
+
+def clear_memo():
+    for function in (canonical_name, canonical_zip, canonical_date):
+        function.cache_clear()
@@ -1,3 +1,4 @@
+import atexit
 import base64
 import csv
 import json
@@ -23,6 +24,15 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from seleniumbase import Driver
 
+from buffered_log import BufferedLog
+from debug_store import DebugPageStore
+from http_cassette import Cassette, mount_cassette
+from input_reader import is_spreadsheet, iter_input, sniff_delimiter
+from progress_journal import Progress
+from request_log import RequestLog, bureau_context, current_bureau_numbers
+from response_classifier import classify_response
+from result_record import to_json
+
 # ==========================================================
 # CONFIG
 # ==========================================================
@@ -39,12 +49,15 @@ REQUESTS_SESSION_FILE = "requests_session_fast_1.pkl"
 PROGRESS_FILE = "progress_tracker_fast_1.json"
 REQUEST_LOG_FILE = "request_logs_1.jsonl"
 DEBUG_DIR = "debug_logs"
+DEBUG_PAGES_DIR = os.path.join(DEBUG_DIR, "pages")
+LOG_LEVEL = "DEBUG"  # Lowest status logged: DEBUG, INFO, SUCCESS, WARNING or ERROR
 MAX_RETRIES = 3
 RETRY_DELAY = 2
+CASSETTE_MODE = "passthrough"  # passthrough, record or replay (see http_cassette.py)
+CASSETTE_FILE = "requests_cassette.jsonl.gz"
 
 # Thread safety
 progress_lock = Lock()
-log_lock = Lock()
 
 # Global driver instance
 driver_instance = None
@@ -53,66 +66,67 @@ driver_lock = Lock()
 # Create debug directory
 os.makedirs(DEBUG_DIR, exist_ok=True)
 
+# Console + execution_log.txt, written by a background thread
+execution_log = BufferedLog(
+    os.path.join(DEBUG_DIR, "execution_log.txt"), level=LOG_LEVEL
+)
+
+# Record/replay transport, opened by the first attach_cassette() call
+cassette = None
+
+# Saved response pages, stored once per distinct body
+debug_pages = DebugPageStore(DEBUG_PAGES_DIR)
+
+# Rotating request log with a bureau/session/timestamp index
+request_log = RequestLog(REQUEST_LOG_FILE)
+atexit.register(request_log.flush)
+
 
 # ==========================================================
 # LOGGING FUNCTIONS
 # ==========================================================
 def log_step(step_name, status="INFO", message=""):
     """Log step execution with timestamp"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    status_icons = {
-        "INFO": "ℹ️",
-        "SUCCESS": "✅",
-        "ERROR": "❌",
-        "WARNING": "⚠️",
-        "RETRY": "🔄",
-        "DEBUG": "🔍",
-    }
-    icon = status_icons.get(status, "🔸")
-    log_message = f"{timestamp} {icon} [{status}] {step_name}: {message}"
-    print(log_message)
-    
-    # Also write to a log file
-    with open(os.path.join(DEBUG_DIR, "execution_log.txt"), "a", encoding="utf-8") as f:
-        f.write(log_message + "\n")
+    execution_log.log(step_name, status, message)
 
 
 def log_request_response(session_id, request_type, url, params=None, 
-                        status_code=None, response_text=None, error=None):
-    """Log HTTP requests and responses for debugging"""
+                        status_code=None, response_text=None, error=None, elapsed=None):
+    """Log HTTP requests and responses for debugging; returns the body's classification"""
+    classification = classify_response(response_text)
     timestamp = datetime.now().isoformat()
     log_entry = {
         "timestamp": timestamp,
         "session_id": session_id,
+        "bureau_numbers": current_bureau_numbers(),
         "type": request_type,
         "url": url,
         "params": params,
         "status_code": status_code,
         "response_length": len(response_text) if response_text else 0,
+        "elapsed_ms": round(elapsed.total_seconds() * 1000, 1) if elapsed else None,
         "error": str(error) if error else None,
-        "has_otp_modal": "one-time passcode" in (response_text or "").lower(),
-        "has_session_error": any(indicator in (response_text or "").lower() 
-                                for indicator in ["invalid session", "session expired", "login"]),
+        "has_otp_modal": classification["has_otp_modal"],
+        "has_session_error": classification["has_session_error"],
     }
+    if status_code != 200:
+        log_entry["error_type"] = classification["error_type"]
     
-    # Save response text to separate file if it contains useful data
-    if response_text and (status_code != 200 or "one-time passcode" in response_text.lower()):
-        filename = f"{timestamp.replace(':', '-').replace('.', '-')}_{request_type}_{status_code}.html"
-        with open(os.path.join(DEBUG_DIR, filename), "w", encoding="utf-8") as f:
-            f.write(response_text)
-        log_entry["response_file"] = filename
+    # Save response text (deduplicated) if it contains useful data
+    if response_text and (status_code != 200 or classification["has_otp_modal"]):
+        log_entry["response_hash"] = debug_pages.put(response_text)
     
-    # Write to JSONL file
-    with log_lock:
-        with open(REQUEST_LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+    # Append to the indexed request log
+    request_log.append(log_entry)
     
     # Also log to console if it's interesting
-    if status_code == 400 or error or "one-time passcode" in (response_text or "").lower():
+    if status_code == 400 or error or classification["has_otp_modal"]:
         log_step(f"HTTP {request_type}", "DEBUG", 
                 f"URL: {url}, Status: {status_code}, "
                 f"Params: {params}, Error: {error}")
 
+    return classification
+
 
 # ==========================================================
 # IMPROVED GMAIL API OTP FUNCTIONS
@@ -705,6 +719,7 @@ def handle_cat_chat_disclaimer(driver):
     log_step("Disclaimer", "INFO", "3. Click 'Accept', 'Agree', or similar button")
     
     # Wait for user to complete
+    execution_log.flush()
     input("\nPress ENTER after you've completed the CAPTCHA and accepted the disclaimer...")
     
     # Wait a moment for page to update
@@ -865,13 +880,26 @@ def convert_cookies_to_requests_session():
             )
 
         log_step("Convert Cookies", "SUCCESS", f"Converted {len(selenium_cookies)} cookies")
-        return session
+        return attach_cassette(session)
 
     except Exception as e:
         log_step("Convert Cookies", "ERROR", f"Error converting cookies: {e}")
         return None
 
 
+def attach_cassette(session):
+    """Mount the record/replay transport on a session (no-op in passthrough mode)"""
+    global cassette
+    if CASSETTE_MODE == "passthrough":
+        return session
+    if cassette is None:
+        cassette = Cassette(CASSETTE_FILE, CASSETTE_MODE)
+        atexit.register(cassette.close)
+        log_step("Cassette", "INFO", f"{CASSETTE_MODE.capitalize()} mode with {CASSETTE_FILE}")
+    mount_cassette(session, cassette)
+    return session
+
+
 def save_requests_session(session):
     """Save requests session to file"""
     try:
@@ -894,7 +922,7 @@ def load_requests_session():
             session = pickle.load(file)
 
         log_step("Load Requests Session", "SUCCESS", "Session loaded")
-        return session
+        return attach_cassette(session)
     except Exception as e:
         log_step("Load Requests Session", "ERROR", f"Error loading session: {e}")
         return None
@@ -1076,7 +1104,8 @@ def search_policy_holders_with_recovery(
             
             # Log the response
             log_request_response(session_id, "SEARCH", url, params, 
-                               response.status_code, response.text)
+                               response.status_code, response.text,
+                               elapsed=response.elapsed)
 
             # Handle different status codes
             if response.status_code == 400:
@@ -1203,7 +1232,8 @@ def get_policy_details_with_recovery(
             
             # Log the response
             log_request_response(session_id, "DETAILS", url, params,
-                               response.status_code, response.text)
+                               response.status_code, response.text,
+                               elapsed=response.elapsed)
 
             # Handle 400 errors
             if response.status_code == 400:
@@ -1281,37 +1311,20 @@ def get_policy_details_with_recovery(
 # DATA PROCESSING FUNCTIONS
 # ==========================================================
 def read_input_csv(file_path):
-    """Read the input CSV file"""
+    """Read the input CSV file with employer data"""
     try:
-        employers = []
-
-        with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
-
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
-
+        delimiter = None
+        if not is_spreadsheet(file_path):
+            delimiter = sniff_delimiter(file_path)
             log_step("Read Input", "INFO", f"Detected delimiter: '{delimiter}'")
 
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-
-            for row in reader:
-                cleaned_row = {
-                    key.strip().replace("\ufeff", ""): value.strip()
-                    for key, value in row.items()
-                }
-
-                employers.append(
-                    {
-                        "bureau_number": cleaned_row.get("Bureau Number", ""),
-                        "employer_name": cleaned_row.get("Employer Name", ""),
-                        "zip_code": cleaned_row.get("Zip Code", ""),
-                        "coverage_date": cleaned_row.get("Coverage Date", ""),
-                    }
-                )
+        employers = list(iter_input(file_path, delimiter))
 
-        log_step("Read Input", "SUCCESS", f"Read {len(employers)} employers")
+        log_step(
+            "Read Input",
+            "SUCCESS",
+            f"Read {len(employers)} employers from {file_path}",
+        )
         return employers
     except Exception as e:
         log_step("Read Input", "ERROR", f"Error reading input CSV: {e}")
@@ -1323,7 +1336,7 @@ def load_progress():
     try:
         if os.path.exists(PROGRESS_FILE):
             with open(PROGRESS_FILE, "r", encoding="utf-8") as f:
-                progress = json.load(f)
+                progress = Progress.from_dict(json.load(f))
             log_step(
                 "Load Progress",
                 "SUCCESS",
@@ -1332,17 +1345,17 @@ def load_progress():
             return progress
         else:
             log_step("Load Progress", "INFO", "No progress file found")
-            return {"completed": [], "results": []}
+            return Progress()
     except Exception as e:
         log_step("Load Progress", "ERROR", f"Error loading progress: {e}")
-        return {"completed": [], "results": []}
+        return Progress()
 
 
 def save_progress(progress):
     """Save progress tracking data"""
     try:
         with open(PROGRESS_FILE, "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
+            json.dump(progress, f, indent=2, ensure_ascii=False, default=to_json)
         log_step(
             "Save Progress",
             "SUCCESS",
@@ -1389,7 +1402,7 @@ def save_final_output(results, csv_file=OUTPUT_CSV, json_file=OUTPUT_JSON):
 
         # Save JSON
         with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+            json.dump(results, f, indent=2, ensure_ascii=False, default=to_json)
 
         log_step(
             "Save Output",
@@ -1559,9 +1572,7 @@ def main():
         return
 
     # Filter out already completed employers
-    pending_employers = [
-        e for e in employers if e["bureau_number"] not in progress["completed"]
-    ]
+    pending_employers = list(progress.pending(employers))
 
     if not pending_employers:
         log_step("Main", "SUCCESS", "All employers already processed!")
@@ -1576,12 +1587,12 @@ def main():
 
     for employer in pending_employers:
         # Process employer
-        results, session = process_employer(session, employer, progress)
+        with bureau_context([employer["bureau_number"]]):
+            results, session = process_employer(session, employer, progress)
 
         if results:
             with progress_lock:
-                progress["results"].extend(results)
-                progress["completed"].append(employer["bureau_number"])
+                progress.mark_completed(employer["bureau_number"], results)
                 save_progress(progress)
 
             total_processed += 1
@@ -0,0 +1,151 @@
+"""
+Content-addressed store for saved response pages.
+
+Each body is hashed (sha256 of its UTF-8 bytes) and kept once, gzip'd, at
+<root>/<first two hex chars>/<hash>.html.gz. Saving a page that is already
+stored costs only the hash, so the thousands of identical error pages a
+long run produces take the space of one. Request log entries carry the
+hash in "response_hash" instead of a per-request file name.
+
+Usage:
+  python debug_store.py HASH                   # print a stored page
+  python debug_store.py --log FILE TIMESTAMP   # page for a logged request
+  python debug_store.py --import-dir DIR       # move old *.html pages in
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sys
+from threading import Lock
+
+
+class DebugPageStore:
+    """Deduplicating, gzip-compressed page store keyed by sha256"""
+
+    def __init__(self, root):
+        self.root = root
+        self.saved = 0
+        self.deduplicated = 0
+        self._lock = Lock()
+
+    def path_for(self, digest):
+        return os.path.join(self.root, digest[:2], f"{digest}.html.gz")
+
+    def __contains__(self, digest):
+        return os.path.exists(self.path_for(digest))
+
+    def put(self, text):
+        """Store a page body; returns its hash"""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+
+        with self._lock:
+            if os.path.exists(path):
+                self.deduplicated += 1
+                return digest
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                # mtime=0 keeps the compressed bytes a pure function of the page
+                with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+                    gz.write(data)
+            os.replace(tmp_path, path)
+            self.saved += 1
+        return digest
+
+    def get(self, digest):
+        """Return the stored page for a hash, or None if it isn't stored"""
+        try:
+            with gzip.open(self.path_for(digest), "rb") as f:
+                return f.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def get_for_request(self, log_entry, legacy_dir=None):
+        """Return the page saved for a request log entry, or None.
+
+        Entries written before the store existed name a plain file in
+        "response_file"; pass the directory it lives in as `legacy_dir`.
+        """
+        digest = log_entry.get("response_hash")
+        if digest:
+            return self.get(digest)
+        filename = log_entry.get("response_file")
+        if filename and legacy_dir:
+            path = os.path.join(legacy_dir, filename)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return f.read()
+        return None
+
+    def import_dir(self, directory, remove=False):
+        """Store every *.html page in `directory`; returns {file name: hash}"""
+        imported = {}
+        for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                imported[os.path.basename(path)] = self.put(f.read())
+            if remove:
+                os.remove(path)
+        return imported
+
+    def stats(self):
+        return {"saved": self.saved, "deduplicated": self.deduplicated}
+
+
+def iter_request_pages(log_file, store, legacy_dir=None):
+    """Yield (log entry, page) for every logged request that saved a page"""
+    with open(log_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("response_hash") or entry.get("response_file"):
+                yield entry, store.get_for_request(entry, legacy_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read the debug page store")
+    parser.add_argument("key", nargs="?", help="page hash, or request timestamp with --log")
+    parser.add_argument("--root", default=os.path.join("debug_logs", "pages"), help="store directory")
+    parser.add_argument("--log", help="request log (JSONL) to look the timestamp up in")
+    parser.add_argument("--import-dir", help="store the *.html pages in this directory")
+    parser.add_argument("--remove", action="store_true", help="delete pages after --import-dir")
+    args = parser.parse_args()
+
+    store = DebugPageStore(args.root)
+
+    if args.import_dir:
+        imported = store.import_dir(args.import_dir, remove=args.remove)
+        print(f"Imported {len(imported)} pages as {len(set(imported.values()))} unique pages")
+        return 0
+
+    if not args.key:
+        parser.print_usage()
+        return 1
+
+    if args.log:
+        legacy_dir = os.path.dirname(args.root.rstrip(os.sep)) or "."
+        for entry, page in iter_request_pages(args.log, store, legacy_dir):
+            if entry.get("timestamp") == args.key:
+                if page is None:
+                    break
+                sys.stdout.write(page)
+                return 0
+        print(f"No saved page for request {args.key}", file=sys.stderr)
+        return 1
+
+    page = store.get(args.key)
+    if page is None:
+        print(f"No page stored under {args.key}", file=sys.stderr)
+        return 1
+    sys.stdout.write(page)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import concurrent.futures
-import csv
-import json
+import itertools
 import os
 import pickle
 import quopri
@@ -14,36 +13,64 @@ from threading import Lock
 from urllib.parse import quote, urlencode
 
 import requests
-from bs4 import BeautifulSoup
 from seleniumbase import SB
 
+from buffered_log import BufferedLog
+from extractors import extract_policy_details, extract_search_results
+from http_cassette import Cassette, mount_cassette
+from hit_ranking import HitRanker
+from input_reader import is_spreadsheet, iter_input, sniff_delimiter
+from lookup_cache import DetailMemo, LookupCache
+from progress_journal import Progress, ProgressJournal
+from query_planner import describe_plan, fan_out, iter_query_groups
+from response_classifier import classify_response
+from results_store import ResultsStore, write_final_output
+
 # File paths
 COOKIE_FILE = "browser_cookies_fast.pkl"
 REQUESTS_SESSION_FILE = "requests_session_fast.pkl"
 PROGRESS_FILE = "progress_tracker_fast.json"
+PROGRESS_SNAPSHOT_FILE = "progress_tracker_fast.snapshot.jsonl"
+PROGRESS_JOURNAL_FILE = "progress_tracker_fast.journal.jsonl"
 INPUT_CSV = "input_fast.csv"
 OUTPUT_CSV = "final_output_fast.csv"
 OUTPUT_JSON = "final_output_fast.json"
+RESULTS_STORE_FILE = "final_output_fast.results.jsonl"
+LOOKUP_CACHE_FILE = "lookup_cache_fast.sqlite3"
+SEARCH_URL = "https://www.caworkcompcoverage.com/Search"
 
 MAX_RETRIES = 2  # Reduced for speed
 RETRY_DELAY = 1  # Reduced for speed
+LOG_LEVEL = "DEBUG"  # Lowest status printed: DEBUG, INFO, SUCCESS, WARNING or ERROR
+
+# Console logging, written by a background thread
+execution_log = BufferedLog(level=LOG_LEVEL)
+QUERY_PLAN_WINDOW = 1000  # Query groups held open while streaming the input
 
 # Thread safety
 progress_lock = Lock()
 
+# Local lookup cache, opened in main(); None disables caching
+lookup_cache = None
+
+# Shared request pacing, set up in main(); None sends requests unthrottled
+request_limiter = None
+
+# Per-run memo of detail lookups shared by every worker thread
+detail_memo = DetailMemo()
+
+# Which search hits get a detail request; configured in main()
+hit_ranker = HitRanker()
+
+# Progress journal (PROGRESS_FILE is only read once, to migrate old runs)
+progress_journal = ProgressJournal(
+    PROGRESS_SNAPSHOT_FILE, PROGRESS_JOURNAL_FILE, legacy_file=PROGRESS_FILE
+)
+
 
 def log_step(step_name, status="INFO", message=""):
     """Log step execution with timestamp"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    status_icons = {
-        "INFO": "ℹ️",
-        "SUCCESS": "✅",
-        "ERROR": "❌",
-        "WARNING": "⚠️",
-        "RETRY": "🔄",
-    }
-    icon = status_icons.get(status, "🔸")
-    print(f"{timestamp} {icon} [{status}] {step_name}: {message}")
+    execution_log.log(step_name, status, message)
 
 
 def save_cookies(sb):
@@ -364,6 +391,34 @@ def automated_authentication(sb, website_url):
         return False
 
 
+class RateLimiter:
+    """Fixed-rate pacing shared by all worker threads.
+
+    Each call to wait() reserves the next send slot, 1 / requests_per_second
+    after the previous one, and sleeps until it arrives. Idle time is not
+    banked, so requests never burst above the configured rate.
+    """
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second
+        self.next_slot = time.monotonic()
+        self.lock = Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def throttle():
+    """Block until the shared rate limiter allows another request"""
+    if request_limiter is not None:
+        request_limiter.wait()
+
+
 def convert_date_format(date_str):
     """Convert date from mm/dd/yyyy to yyyy-mm-dd for API requests"""
     try:
@@ -396,9 +451,20 @@ def search_policy_holders_optimized(
             "ZipCode": zip_code,
         }
 
-        url = "https://www.caworkcompcoverage.com/Search"
+        if lookup_cache is not None:
+            cached = lookup_cache.get(params)
+            if cached is not None:
+                log_step(
+                    "API Search",
+                    "SUCCESS",
+                    f"Cache hit: {len(cached)} results",
+                )
+                return cached
+
+        url = SEARCH_URL
 
         # Make the search request with timeout
+        throttle()
         response = session.get(url, params=params, timeout=timeout)
 
         if response.status_code != 200:
@@ -409,47 +475,11 @@ def search_policy_holders_optimized(
             )
             return None
 
-        # Parse the HTML response with lxml for speed
-        soup = BeautifulSoup(response.text, "lxml")
-
-        # Extract search results
-        results = []
-
-        # Find result rows
-        result_rows = soup.find_all(
-            "tr",
-            class_=lambda x: x
-            and any(
-                cls in x
-                for cls in ["result-row", "text-primary", "link-cursor"]
-            ),
-        )
+        # Pull the result rows straight out of the HTML
+        results = extract_search_results(response.text)
 
-        for row in result_rows:
-            employer_data = row.get("data-employer")
-            city_data = row.get("data-city")
-            state_data = row.get("data-state")
-
-            if employer_data:
-                result = {
-                    "employer_name": employer_data,
-                    "city": city_data or "",
-                    "state": state_data or "",
-                }
-                results.append(result)
-
-        # Fallback extraction from table cells
-        if not results:
-            result_rows = soup.select("tr[data-employer]")
-            for row in result_rows:
-                cells = row.find_all("td")
-                if len(cells) >= 3:
-                    result = {
-                        "employer_name": cells[0].get_text(strip=True),
-                        "city": cells[1].get_text(strip=True),
-                        "state": cells[2].get_text(strip=True),
-                    }
-                    results.append(result)
+        if lookup_cache is not None and is_cacheable_search(response.text, results):
+            lookup_cache.put(params, results)
 
         log_step("API Search", "SUCCESS", f"Found {len(results)} results")
         return results
@@ -464,6 +494,18 @@ def search_policy_holders_optimized(
         return None
 
 
+def is_cacheable_search(response_text, results):
+    """Whether a parsed search answer may go in the lookup cache.
+
+    An OTP or expired-session page parses to no results too; only real hits
+    and the site's own "no results" answer are kept.
+    """
+    classification = classify_response(response_text)
+    if classification["has_otp_modal"] or classification["error_type"] == "SESSION_EXPIRED":
+        return False
+    return bool(results) or classification["error_type"] == "NOT_FOUND"
+
+
 def get_policy_details_optimized(session, employer, coverage_date, timeout=10):
     """Optimized get detailed policy information with timeout"""
     log_step(
@@ -485,9 +527,20 @@ def get_policy_details_optimized(session, employer, coverage_date, timeout=10):
             "State": employer["state"],
         }
 
-        url = "https://www.caworkcompcoverage.com/Search"
+        if lookup_cache is not None:
+            cached = lookup_cache.get(params)
+            if cached is not None:
+                log_step(
+                    "API Details",
+                    "SUCCESS",
+                    f"Cache hit for: {employer['employer_name']}",
+                )
+                return cached
+
+        url = SEARCH_URL
 
         # Make the details request with timeout
+        throttle()
         response = session.get(url, params=params, timeout=timeout)
 
         if response.status_code != 200:
@@ -498,43 +551,16 @@ def get_policy_details_optimized(session, employer, coverage_date, timeout=10):
             )
             return None
 
-        # Parse the HTML response with lxml for speed
-        soup = BeautifulSoup(response.text, "lxml")
-
-        # Extract policy details from the table
-        policy_data = {}
-
-        # Find the details table
-        details_table = soup.find(
-            "table",
-            class_=lambda x: x
-            and any(
-                cls in x for cls in ["table-borderless", "table", "border"]
-            ),
-        )
-
-        if details_table:
-            # Find the detail rows
-            detail_rows = details_table.find_all("tr", class_="detail-row")
-
-            for row in detail_rows:
-                cells = row.find_all("td")
-                if len(cells) >= 7:
-                    policy_data = {
-                        "employer_name": cells[0].get_text(strip=True),
-                        "street_address": cells[1].get_text(strip=True),
-                        "city": cells[2].get_text(strip=True),
-                        "state": cells[3].get_text(strip=True),
-                        "zip_code": cells[4].get_text(strip=True),
-                        "insurer_name": cells[5].get_text(strip=True),
-                        "fein": cells[6].get_text(strip=True),
-                        "extracted_at": datetime.now().strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
-                    }
-                    break
+        # Extract policy details from the first complete detail row
+        policy_data = extract_policy_details(response.text)
+        if policy_data:
+            policy_data["extracted_at"] = datetime.now().strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
 
         if policy_data:
+            if lookup_cache is not None:
+                lookup_cache.put(params, policy_data)
             log_step(
                 "API Details",
                 "SUCCESS",
@@ -561,52 +587,29 @@ def get_policy_details_optimized(session, employer, coverage_date, timeout=10):
         return None
 
 
-def read_input_csv(file_path):
-    """Read the input CSV file with employer data"""
+def stream_input_csv(file_path):
+    """Yield employers from the input CSV (or XLSX) one row at a time"""
+    count = 0
     try:
-        employers = []
-
-        # First, let's detect the delimiter
-        with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
-
-            # Try to detect delimiter
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
-
+        delimiter = None
+        if not is_spreadsheet(file_path):
+            delimiter = sniff_delimiter(file_path)
             log_step("Read Input", "INFO", f"Detected delimiter: '{delimiter}'")
 
-            # Read the CSV with detected delimiter
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-
-            for row in reader:
-                # Clean up column names (remove BOM and extra spaces)
-                cleaned_row = {
-                    key.strip().replace("\ufeff", ""): value.strip()
-                    for key, value in row.items()
-                }
-
-                employers.append(
-                    {
-                        "bureau_number": cleaned_row.get("Bureau Number", ""),
-                        "employer_name": cleaned_row.get("Employer Name", ""),
-                        "zip_code": cleaned_row.get("Zip Code", ""),
-                        "coverage_date": cleaned_row.get("Coverage Date", ""),
-                    }
-                )
-
-        log_step(
-            "Read Input",
-            "SUCCESS",
-            f"Read {len(employers)} employers from {file_path}",
-        )
-        return employers
+        for employer in iter_input(file_path, delimiter):
+            count += 1
+            yield employer
     except Exception as e:
         log_step("Read Input", "ERROR", f"Error reading input CSV: {e}")
         # Create a sample input file for the user
         create_sample_input()
-        return []
+        return
+
+    log_step(
+        "Read Input",
+        "SUCCESS",
+        f"Read {count} employers from {file_path}",
+    )
 
 
 def create_sample_input():
@@ -631,38 +634,51 @@ def create_sample_input():
 
 
 def load_progress():
-    """Load progress tracking data"""
+    """Load progress by replaying the snapshot and journal tail"""
     try:
-        if os.path.exists(PROGRESS_FILE):
-            with open(PROGRESS_FILE, "r", encoding="utf-8") as f:
-                progress = json.load(f)
+        progress = progress_journal.load()
+        if progress["completed"]:
             log_step(
                 "Load Progress",
                 "SUCCESS",
-                f"Loaded progress: {len(progress.get('completed', []))} completed",
+                f"Loaded progress: {len(progress['completed'])} completed "
+                f"({progress_journal.snapshot_records} from snapshot, "
+                f"{progress_journal.tail_records} from journal)",
             )
-            return progress
         else:
             log_step(
                 "Load Progress",
                 "INFO",
-                "No progress file found, starting fresh",
+                "No progress found, starting fresh",
             )
-            return {"completed": [], "results": []}
+        return progress
     except Exception as e:
         log_step("Load Progress", "ERROR", f"Error loading progress: {e}")
-        return {"completed": [], "results": []}
+        return Progress()
 
 
-def save_progress(progress):
-    """Save progress tracking data"""
+def record_progress(progress, bureau_number, results):
+    """Append one completed bureau number to the progress journal"""
     try:
-        with open(PROGRESS_FILE, "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
+        progress_journal.record(progress, bureau_number, results)
+        return True
+    except Exception as e:
+        log_step(
+            "Save Progress",
+            "ERROR",
+            f"Error journaling Bureau #{bureau_number}: {e}",
+        )
+        return False
+
+
+def save_progress():
+    """Compact the progress journal into a fresh snapshot"""
+    try:
+        progress_journal.compact()
         log_step(
             "Save Progress",
             "SUCCESS",
-            f"Progress saved: {len(progress.get('completed', []))} completed",
+            f"Progress snapshot saved: {progress_journal.snapshot_records} completed",
         )
         return True
     except Exception as e:
@@ -670,54 +686,14 @@ def save_progress(progress):
         return False
 
 
-def batch_save_progress(progress, force=False, batch_size=10):
-    """Save progress less frequently to reduce I/O overhead"""
-    if force or len(progress["completed"]) % batch_size == 0:
-        return save_progress(progress)
-    return True
-
-
 def save_final_output(results, csv_file=OUTPUT_CSV, json_file=OUTPUT_JSON):
     """Save final results in CSV and JSON formats"""
     try:
-        # Save CSV
-        with open(csv_file, "w", newline="", encoding="utf-8") as csvfile:
-            fieldnames = [
-                "Bureau Number",
-                "Employer Name",
-                "Street Address",
-                "City",
-                "State",
-                "Zip Code",
-                "Insurer Name",
-                "LookupStatus",
-            ]
-            writer = csv.DictWriter(
-                csvfile, fieldnames=fieldnames, delimiter="\t"
-            )
-            writer.writeheader()
-            for result in results:
-                writer.writerow(
-                    {
-                        "Bureau Number": result["bureau_number"],
-                        "Employer Name": result["employer_name"],
-                        "Street Address": result["street_address"],
-                        "City": result["city"],
-                        "State": result["state"],
-                        "Zip Code": result["zip_code"],
-                        "Insurer Name": result["insurer_name"],
-                        "LookupStatus": result["lookup_status"],
-                    }
-                )
-
-        # Save JSON
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-
+        count = write_final_output(results, csv_file, json_file)
         log_step(
             "Save Output",
             "SUCCESS",
-            f"Final output saved to {csv_file} and {json_file}",
+            f"Final output saved to {csv_file} and {json_file} ({count} records)",
         )
         return True
     except Exception as e:
@@ -725,6 +701,19 @@ def save_final_output(results, csv_file=OUTPUT_CSV, json_file=OUTPUT_JSON):
         return False
 
 
+def open_results_store(progress):
+    """Open the append-only results sink, seeding it from legacy progress results"""
+    store = ResultsStore(RESULTS_STORE_FILE)
+    if not len(store) and progress.get("results"):
+        store.append(progress["results"])
+        log_step(
+            "Results Store",
+            "INFO",
+            f"Seeded {len(store)} results from {PROGRESS_FILE}",
+        )
+    return store
+
+
 def process_employer(session, employer_data):
     """Process a single employer and return results"""
     bureau_number = employer_data["bureau_number"]
@@ -753,14 +742,18 @@ def process_employer(session, employer_data):
         }
         return [result]
 
-    # Get details for each search result
+    # Get details for the search results that look like this employer
     all_results = []
-    for search_result in search_results:
-        details = get_policy_details_optimized(
-            session, search_result, coverage_date
+    for search_result in hit_ranker.select(employer_data, search_results):
+        details = detail_memo.get_or_fetch(
+            DetailMemo.make_key(search_result, coverage_date),
+            lambda: get_policy_details_optimized(
+                session, search_result, coverage_date
+            ),
         )
 
         if details:
+            hit_ranker.observe(details)
             result = {
                 "bureau_number": bureau_number,
                 "employer_name": details["employer_name"],
@@ -793,75 +786,121 @@ def process_employer(session, employer_data):
     return all_results
 
 
-def process_employer_threadsafe(session, employer_data, progress):
-    """Thread-safe version of process_employer"""
+def process_group_threadsafe(session, group, progress, results_store=None):
+    """Thread-safe lookup for one query group, fanned out to every member"""
+    lead = group["employers"][0]
     try:
-        employer_results = process_employer(session, employer_data)
+        lead_results = process_employer(session, lead)
 
+        all_results = []
         with progress_lock:
-            progress["results"].extend(employer_results)
-            progress["completed"].append(employer_data["bureau_number"])
-            batch_save_progress(progress)
+            for employer in group["employers"]:
+                employer_results = fan_out(lead_results, employer)
+                if results_store is not None:
+                    results_store.append(employer_results)
+                record_progress(
+                    progress, employer["bureau_number"], employer_results
+                )
+                all_results.extend(employer_results)
 
-        return employer_results
+        return all_results
     except Exception as e:
         log_step(
             "Process Employer",
             "ERROR",
-            f"Thread error for Bureau #{employer_data['bureau_number']}: {e}",
+            f"Thread error for Bureau #{lead['bureau_number']}: {e}",
         )
         return []
 
 
-def process_employers_concurrent(session, employers, progress, max_workers=10):
-    """Process multiple employers concurrently"""
+def log_group_result(future, group, completed_count):
+    """Log the outcome of a finished query group future"""
+    bureau_numbers = ", ".join(
+        f"#{e['bureau_number']}" for e in group["employers"]
+    )
+    try:
+        results = future.result()
+        log_step(
+            "Concurrent Processing",
+            "SUCCESS",
+            f"Progress: {completed_count} done - Bureau {bureau_numbers}: {len(results)} records",
+        )
+    except Exception as e:
+        log_step(
+            "Concurrent Processing",
+            "ERROR",
+            f"Progress: {completed_count} done - Bureau {bureau_numbers} failed: {e}",
+        )
+
+
+def process_employers_concurrent(
+    session,
+    employers,
+    progress,
+    max_workers=10,
+    results_store=None,
+    max_in_flight=None,
+):
+    """Process multiple employers concurrently, one lookup per query group.
+
+    `employers` may be any iterable, including a streamed input file; rows
+    are coalesced into query groups within a bounded planning window. At
+    most `max_in_flight` groups (default twice the workers) are submitted
+    at a time; the next ones are submitted as earlier ones complete.
+    """
     completed_count = 0
-    total_employers = len(employers)
+    max_in_flight = max_in_flight or max_workers * 2
+    plan_stats = {}
+    groups = iter_query_groups(
+        employers, plan_stats, window=QUERY_PLAN_WINDOW
+    )
 
     log_step(
         "Concurrent Processing",
         "INFO",
-        f"Starting {max_workers} workers for {total_employers} employers",
+        f"Starting {max_workers} workers ({max_in_flight} tasks in flight)",
     )
 
     with concurrent.futures.ThreadPoolExecutor(
         max_workers=max_workers
     ) as executor:
-        # Submit all tasks
-        future_to_employer = {
-            executor.submit(
-                process_employer_threadsafe, session, employer, progress
-            ): employer
-            for employer in employers
-        }
+        in_flight = {}
 
-        # Process completed tasks as they finish
-        for future in concurrent.futures.as_completed(future_to_employer):
-            employer = future_to_employer[future]
-            try:
-                results = future.result()
-                completed_count += 1
-                log_step(
-                    "Concurrent Processing",
-                    "SUCCESS",
-                    f"Progress: {completed_count}/{total_employers} - Bureau #{employer['bureau_number']}: {len(results)} records",
-                )
-            except Exception as e:
-                completed_count += 1
-                log_step(
-                    "Concurrent Processing",
-                    "ERROR",
-                    f"Progress: {completed_count}/{total_employers} - Bureau #{employer['bureau_number']} failed: {e}",
-                )
+        def drain(return_when):
+            nonlocal completed_count
+            done, _ = concurrent.futures.wait(
+                in_flight, return_when=return_when
+            )
+            for future in done:
+                group = in_flight.pop(future)
+                completed_count += len(group["employers"])
+                log_group_result(future, group, completed_count)
+
+        for group in groups:
+            # Wait for a slot before pulling more work off the input
+            if len(in_flight) >= max_in_flight:
+                drain(concurrent.futures.FIRST_COMPLETED)
+
+            future = executor.submit(
+                process_group_threadsafe,
+                session,
+                group,
+                progress,
+                results_store,
+            )
+            in_flight[future] = group
 
+        while in_flight:
+            drain(concurrent.futures.FIRST_COMPLETED)
+
+    log_step("Query Plan", "INFO", describe_plan(plan_stats))
     return completed_count
 
 
 def monitor_session_health(session):
     """Check if session is still valid"""
     try:
-        test_url = "https://www.caworkcompcoverage.com/Search"
-        response = session.get(test_url, timeout=5)
+        response = session.get(SEARCH_URL, timeout=5)
         return response.status_code == 200
     except:
         return False
@@ -899,12 +938,48 @@ def execute_with_retry(
     return False
 
 
+def open_lookup_cache(ttl_hours, max_entries, empty_ttl_hours):
+    """Open the on-disk lookup cache; returns None if it can't be opened"""
+    try:
+        cache = LookupCache(
+            LOOKUP_CACHE_FILE,
+            ttl_seconds=ttl_hours * 3600,
+            max_entries=max_entries,
+            empty_ttl_seconds=empty_ttl_hours * 3600,
+        )
+        log_step(
+            "Lookup Cache",
+            "SUCCESS",
+            f"Opened {LOOKUP_CACHE_FILE} with {len(cache)} entries",
+        )
+        return cache
+    except Exception as e:
+        log_step("Lookup Cache", "ERROR", f"Error opening lookup cache: {e}")
+        return None
+
+
 def main():
+    global lookup_cache, request_limiter, hit_ranker
+
     # Configuration with optimized settings
     CONFIG = {
-        "website_url": "https://www.caworkcompcoverage.com/Search",
+        "website_url": SEARCH_URL,
         "max_workers": 15,  # Adjust based on server tolerance
+        "max_in_flight": 30,  # Query groups submitted but not finished
+        "requests_per_second": 5,  # Shared request rate; 0 disables pacing
         "request_timeout": 10,
+        "cache_ttl_hours": 7 * 24,  # 0 disables the lookup cache
+        "cache_max_entries": 100000,
+        "cache_empty_ttl_hours": 6,  # "No results" answers are re-checked sooner
+        # passthrough, record or replay; replaying a recorded run from fresh
+        # progress files repeats it without the network or a login
+        "cassette_mode": "passthrough",
+        "cassette_file": "fast_main.cassette.jsonl.gz",
+        # Which search hits get a detail request: all, top_k or threshold
+        # (see hit_ranking.py); the best-scoring hit is always fetched
+        "hit_filter": "all",
+        "hit_top_k": 3,
+        "hit_min_score": 0.6,
     }
 
     # Check if input file exists
@@ -920,31 +995,44 @@ def main():
 
     # Load progress and input data
     progress = load_progress()
-    pending_employers = read_input_csv(INPUT_CSV)
-
-    # if not employers:
-    #     log_step("Main", "ERROR", "No employers to process")
-    #     return
-    #
-    # # Filter out already completed employers
-    # pending_employers = [
-    #     e for e in employers if e["bureau_number"] not in progress["completed"]
-    # ]
-    #
-    if not pending_employers:
-        log_step("Main", "SUCCESS", "All employers already processed!")
+    results_store = open_results_store(progress)
+
+    # Stream pending employers straight from the input file; completed ones
+    # are skipped with a set lookup and nothing is held in a full list
+    pending_employers = progress.pending(stream_input_csv(INPUT_CSV))
+    first_pending = next(pending_employers, None)
+
+    if first_pending is None:
+        log_step(
+            "Main",
+            "SUCCESS",
+            f"No pending employers ({len(progress['completed'])} already processed)",
+        )
         # Still save final output with existing results
-        save_final_output(progress["results"])
+        save_final_output(results_store.iter_results())
         return
 
     log_step(
         "Main",
         "INFO",
-        f"Processing {len(pending_employers)} pending employers out of {len(pending_employers)} total",
+        f"Processing pending employers ({len(progress['completed'])} already processed)",
     )
 
-    # Try to load existing session first
-    session = load_requests_session()
+    cassette = None
+    if CONFIG["cassette_mode"] != "passthrough":
+        cassette = Cassette(CONFIG["cassette_file"], CONFIG["cassette_mode"])
+        log_step(
+            "Cassette",
+            "INFO",
+            f"{cassette.mode.capitalize()} mode with {CONFIG['cassette_file']}",
+        )
+
+    if cassette is not None and cassette.mode == "replay":
+        # Every response comes from the cassette; no login needed
+        session = requests.Session()
+    else:
+        # Try to load existing session first
+        session = load_requests_session()
 
     if not session:
         log_step(
@@ -1025,34 +1113,65 @@ def main():
         )
         return
 
+    if cassette is not None:
+        mount_cassette(
+            session,
+            cassette,
+            pool_connections=20,
+            pool_maxsize=20,
+            max_retries=0 if cassette.mode == "replay" else 2,
+        )
+
     # Check session health before starting
     if not monitor_session_health(session):
         log_step("Session", "ERROR", "Session is no longer valid")
         return
 
+    # The lookup cache would hide requests from the cassette
+    if CONFIG["cache_ttl_hours"] and cassette is None:
+        lookup_cache = open_lookup_cache(
+            CONFIG["cache_ttl_hours"],
+            CONFIG["cache_max_entries"],
+            CONFIG["cache_empty_ttl_hours"],
+        )
+
+    if CONFIG["requests_per_second"]:
+        request_limiter = RateLimiter(CONFIG["requests_per_second"])
+
+    hit_ranker = HitRanker(
+        CONFIG["hit_filter"], CONFIG["hit_top_k"], CONFIG["hit_min_score"]
+    )
+
     # Start concurrent processing with timing
     start_time = time.time()
 
     completed_count = process_employers_concurrent(
-        session, pending_employers, progress, max_workers=CONFIG["max_workers"]
+        session,
+        itertools.chain([first_pending], pending_employers),
+        progress,
+        max_workers=CONFIG["max_workers"],
+        results_store=results_store,
+        max_in_flight=CONFIG["max_in_flight"],
     )
 
     end_time = time.time()
     total_time = end_time - start_time
 
-    # Force final progress save
-    batch_save_progress(progress, force=True)
+    if cassette is not None:
+        cassette.close()
 
-    # Save final output
-    save_final_output(progress["results"])
+    # Fold the journal tail into a final snapshot
+    save_progress()
+
+    # Save final output once, streamed out of the results sink
+    save_final_output(results_store.iter_results())
 
     # Print performance summary
+    execution_log.flush()
     print("\n" + "=" * 60)
     print("PERFORMANCE SUMMARY")
     print("=" * 60)
-    print(
-        f"📊 Total Employers Processed: {completed_count}/{len(pending_employers)}"
-    )
+    print(f"📊 Total Employers Processed: {completed_count}")
     print(f"⏱️  Total Time: {total_time:.2f} seconds")
     print(
         f"🚀 Average Time per Employer: {total_time/max(completed_count, 1):.2f} seconds"
@@ -1060,7 +1179,31 @@ def main():
     print(
         f"📈 Processing Rate: {completed_count/total_time*60:.2f} employers/minute"
     )
-    print(f"💾 Total Records Found: {len(progress['results'])}")
+    print(f"💾 Total Records Found: {len(results_store)}")
+    for status, count in progress.status_counts.most_common():
+        print(f"   - {status}: {count}")
+    if lookup_cache is not None:
+        cache_stats = lookup_cache.stats()
+        print(
+            f"🗄️  Lookup Cache: {cache_stats['hits']} hits, "
+            f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.1f}% hit rate)"
+        )
+    memo_stats = detail_memo.stats()
+    print(
+        f"🧠 Detail Memo: {memo_stats['hits']} hits, {memo_stats['misses']} misses "
+        f"({memo_stats['distinct']} distinct details, {memo_stats['hit_rate']:.1f}% hit rate)"
+    )
+    ranking = hit_ranker.stats()
+    print(
+        f"🎯 Hit Filter ({ranking['mode']}): {ranking['fetched']} of {ranking['hits']} hits fetched, "
+        f"{ranking['skipped']} detail requests skipped ({ranking['skipped_percent']:.1f}%)"
+    )
+    if cassette is not None:
+        tape = cassette.stats()
+        print(
+            f"📼 Cassette ({tape['mode']}): {tape['recorded']} recorded, "
+            f"{tape['replayed']} replayed, {tape['misses']} misses"
+        )
     print(f"💾 Output Files:")
     print(f"   - CSV: {OUTPUT_CSV}")
     print(f"   - JSON: {OUTPUT_JSON}")
@@ -1068,6 +1211,11 @@ def main():
 
 
 if __name__ == "__main__":
+    if "--export" in sys.argv[1:]:
+        # Rebuild the final CSV/JSON from the results sink without scraping
+        save_final_output(open_results_store(load_progress()).iter_results())
+        sys.exit(0)
+
     log_step(
         "SCRIPT START",
         "INFO",
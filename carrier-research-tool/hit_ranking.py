@@ -0,0 +1,145 @@
+"""
+Relevance ranking of search hits before their details are fetched.
+
+A search can return hits that plainly aren't the input employer: another
+company whose name shares a prefix, or the right name in a different state.
+Each of them costs a detail request. HitRanker scores every hit against the
+input row and, depending on its mode, lets through
+  - all:        every hit (no filtering; the previous behaviour)
+  - top_k:      the k best-scoring hits
+  - threshold:  hits scoring at least min_score
+The best hit is always kept, so an employer with hits never ends up with
+no detail lookup at all.
+
+The score combines
+  - name similarity of the canonical names; input names are often cut
+    short ("MOORE TWININ"), so a hit that starts with the input scores 1
+  - state agreement: the state the input ZIP belongs to against the hit's
+  - city agreement: the cities seen for the input ZIP in details fetched
+    earlier in the run against the hit's city
+Agreement that can't be judged (unknown ZIP, no city seen yet) scores half.
+"""
+import bisect
+from difflib import SequenceMatcher
+from threading import Lock
+
+from canonical import canonical_name, canonical_zip
+
+MODES = ("all", "top_k", "threshold")
+
+NAME_WEIGHT = 0.6
+STATE_WEIGHT = 0.25
+CITY_WEIGHT = 0.15
+
+# First three ZIP digits -> state, as (first prefix of the range, state)
+ZIP3_STATES = [
+    (5, "NY"), (6, "PR"), (8, "VI"), (9, "PR"), (10, "MA"), (28, "RI"),
+    (30, "NH"), (39, "ME"), (50, "VT"), (60, "CT"), (70, "NJ"), (90, "AE"),
+    (100, "NY"), (150, "PA"), (197, "DE"), (200, "DC"), (201, "VA"),
+    (202, "DC"), (206, "MD"), (220, "VA"), (247, "WV"), (270, "NC"),
+    (290, "SC"), (300, "GA"), (320, "FL"), (350, "AL"), (370, "TN"),
+    (386, "MS"), (398, "GA"), (400, "KY"), (430, "OH"), (460, "IN"),
+    (480, "MI"), (500, "IA"), (530, "WI"), (550, "MN"), (569, "DC"),
+    (570, "SD"), (580, "ND"), (590, "MT"), (600, "IL"), (630, "MO"),
+    (660, "KS"), (680, "NE"), (700, "LA"), (716, "AR"), (730, "OK"),
+    (733, "TX"), (734, "OK"), (750, "TX"), (800, "CO"), (820, "WY"),
+    (832, "ID"), (840, "UT"), (850, "AZ"), (870, "NM"), (885, "TX"),
+    (889, "NV"), (900, "CA"), (967, "HI"), (969, "GU"), (970, "OR"),
+    (980, "WA"), (995, "AK"),
+]
+_ZIP3_STARTS = [start for start, _ in ZIP3_STATES]
+
+
+def zip_state(zip_code):
+    """The state a ZIP code belongs to, or "" if it can't be told"""
+    zip5 = canonical_zip(zip_code)
+    if not zip5:
+        return ""
+    position = bisect.bisect_right(_ZIP3_STARTS, int(zip5[:3])) - 1
+    return ZIP3_STATES[position][1] if position >= 0 else ""
+
+
+def name_similarity(input_name, hit_name):
+    """0..1 similarity of two employer names, tolerant of a truncated input"""
+    a = canonical_name(input_name)
+    b = canonical_name(hit_name)
+    if not a or not b:
+        return 0.0
+    if b.startswith(a) or a.startswith(b):
+        return 1.0
+    # Compare against the hit cut to the input's length too, for truncated inputs
+    return max(
+        SequenceMatcher(None, a, b).ratio(),
+        SequenceMatcher(None, a, b[: len(a)]).ratio(),
+    )
+
+
+class HitRanker:
+    """Thread-safe per-run hit filter with counts of the detail requests skipped"""
+
+    def __init__(self, mode="all", top_k=3, min_score=0.6):
+        if mode not in MODES:
+            raise ValueError(f"Unknown hit filter mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.top_k = top_k
+        self.min_score = min_score
+        self.hits_seen = 0
+        self.hits_kept = 0
+        self._zip_cities = {}
+        self._lock = Lock()
+
+    def score(self, employer, hit):
+        """0..1 relevance of one search hit to the input row"""
+        name = name_similarity(employer["employer_name"], hit["employer_name"])
+
+        state = zip_state(employer["zip_code"])
+        if state and hit.get("state"):
+            state_score = float(state == hit["state"].strip().upper())
+        else:
+            state_score = 0.5
+
+        with self._lock:
+            cities = self._zip_cities.get(canonical_zip(employer["zip_code"]))
+        if cities and hit.get("city"):
+            city_score = float(hit["city"].strip().upper() in cities)
+        else:
+            city_score = 0.5
+
+        return NAME_WEIGHT * name + STATE_WEIGHT * state_score + CITY_WEIGHT * city_score
+
+    def select(self, employer, hits):
+        """The hits worth a detail request, in the order the search returned them"""
+        if self.mode == "all" or len(hits) <= 1:
+            kept = hits
+        else:
+            scores = [self.score(employer, hit) for hit in hits]
+            ranked = sorted(range(len(hits)), key=lambda i: scores[i], reverse=True)
+            if self.mode == "top_k":
+                chosen = set(ranked[: max(1, self.top_k)])
+            else:
+                chosen = {i for i in ranked if scores[i] >= self.min_score} or {ranked[0]}
+            kept = [hit for i, hit in enumerate(hits) if i in chosen]
+
+        with self._lock:
+            self.hits_seen += len(hits)
+            self.hits_kept += len(kept)
+        return kept
+
+    def observe(self, details):
+        """Remember which city a fetched detail's ZIP belongs to"""
+        zip5 = canonical_zip(details.get("zip_code"))
+        city = (details.get("city") or "").strip().upper()
+        if zip5 and city:
+            with self._lock:
+                self._zip_cities.setdefault(zip5, set()).add(city)
+
+    def stats(self):
+        with self._lock:
+            skipped = self.hits_seen - self.hits_kept
+            return {
+                "mode": self.mode,
+                "hits": self.hits_seen,
+                "fetched": self.hits_kept,
+                "skipped": skipped,
+                "skipped_percent": skipped / max(1, self.hits_seen) * 100,
+            }
@@ -0,0 +1,219 @@
+"""
+On-disk cache of parsed search/detail lookups.
+
+Entries are keyed by the normalized request parameters (handler included), so
+a repeated search for the same employer/zip/date or a repeated detail lookup
+for the same employer/city/state is answered locally instead of hitting the
+site again. Entries expire after a TTL and the least recently used ones are
+evicted once the cache grows past its size limit. Empty results ("no
+results" answers) are kept for a shorter TTL of their own, since an
+employer missing today may be on file tomorrow.
+
+DetailMemo is the in-memory, per-run counterpart for detail lookups shared by
+several employers' search hits.
+"""
+import json
+import re
+import sqlite3
+import time
+from threading import Event, Lock
+
+from canonical import canonical_date, canonical_name, canonical_zip
+
+_WHITESPACE = re.compile(r"\s+")
+# How an empty result list is stored
+_EMPTY = json.dumps([])
+
+
+def normalize_value(value):
+    """Case- and whitespace-insensitive form of one request parameter"""
+    return _WHITESPACE.sub(" ", str(value or "")).strip().upper()
+
+
+def make_key(params):
+    """Stable cache key for a request's query parameters.
+
+    Searches are keyed on the canonical employer name, ZIP and date, so
+    "ACME, INC." in 93291-9358 hits the entry for "ACME" in 93291. Detail
+    lookups keep the exact name the site returned.
+    """
+    if params.get("handler") == "SearchPolicyHolders":
+        params = dict(
+            params,
+            EmployerName=canonical_name(params.get("EmployerName")),
+            ZipCode=canonical_zip(params.get("ZipCode")),
+            CoverageDate=canonical_date(params.get("CoverageDate")),
+        )
+    normalized = sorted(
+        (name, normalize_value(value)) for name, value in params.items()
+    )
+    return json.dumps(normalized, separators=(",", ":"))
+
+
+class LookupCache:
+    """SQLite-backed lookup cache with a TTL and LRU size eviction"""
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=100000, evict_every=200,
+                 empty_ttl_seconds=6 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.empty_ttl_seconds = min(empty_ttl_seconds, ttl_seconds)
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lookups (
+                key TEXT PRIMARY KEY,
+                handler TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS lookups_accessed ON lookups (accessed_at)"
+        )
+
+    def get(self, params):
+        """Return the cached value for these request params, or None on a miss"""
+        key = make_key(params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM lookups WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self._ttl_for(row[0]):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE lookups SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def _ttl_for(self, value):
+        return self.empty_ttl_seconds if value == _EMPTY else self.ttl_seconds
+
+    def peek(self, params):
+        """Return (value, created_at) for these params, ignoring the TTL, or None.
+
+        Read-only: it doesn't count as a hit or refresh the entry's LRU time.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM lookups WHERE key = ?", (make_key(params),)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, params, value):
+        """Store the parsed result of a lookup; an empty one gets the short TTL"""
+        key = make_key(params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?, ?)",
+                (key, params.get("handler", ""), json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute(
+            "DELETE FROM lookups WHERE created_at < ? OR (value = ? AND created_at < ?)",
+            (now - self.ttl_seconds, _EMPTY, now - self.empty_ttl_seconds),
+        )
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM lookups WHERE key IN "
+                "(SELECT key FROM lookups ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def evict(self):
+        """Drop expired entries and trim the cache back to max_entries"""
+        with self._lock:
+            self._evict(time.time())
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / max(1, total) * 100,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DetailMemo:
+    """Thread-safe per-run memo of detail lookups.
+
+    Each distinct key is fetched once; workers that ask for a key while its
+    fetch is in flight wait for that result instead of issuing their own
+    request. A fetch that returns None (request failure) is not memoized.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(employer, coverage_date):
+        return (
+            normalize_value(employer["employer_name"]),
+            normalize_value(employer["city"]),
+            normalize_value(employer["state"]),
+            normalize_value(coverage_date),
+        )
+
+    def get_or_fetch(self, key, fetch):
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = {"done": Event(), "value": None}
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            entry["done"].wait()
+            return entry["value"]
+
+        try:
+            entry["value"] = fetch()
+        finally:
+            if entry["value"] is None:
+                with self._lock:
+                    self._entries.pop(key, None)
+            entry["done"].set()
+        return entry["value"]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "distinct": len(self._entries),
+            "hit_rate": self.hits / max(1, total) * 100,
+        }
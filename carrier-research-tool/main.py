@@ -15,6 +15,11 @@ import requests
 from bs4 import BeautifulSoup
 from seleniumbase import SB
 
+from buffered_log import BufferedLog
+from input_reader import is_spreadsheet, iter_input, sniff_delimiter
+from progress_journal import Progress
+from result_record import to_json
+
 # File paths
 COOKIE_FILE = "browser_cookies.pkl"
 REQUESTS_SESSION_FILE = "requests_session.pkl"
@@ -25,20 +30,15 @@ OUTPUT_JSON = "final_output.json"
 
 MAX_RETRIES = 3
 RETRY_DELAY = 2
+LOG_LEVEL = "DEBUG"  # Lowest status printed: DEBUG, INFO, SUCCESS, WARNING or ERROR
+
+# Console logging, written by a background thread
+execution_log = BufferedLog(level=LOG_LEVEL)
 
 
 def log_step(step_name, status="INFO", message=""):
     """Log step execution with timestamp"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    status_icons = {
-        "INFO": "ℹ️",
-        "SUCCESS": "✅",
-        "ERROR": "❌",
-        "WARNING": "⚠️",
-        "RETRY": "🔄",
-    }
-    icon = status_icons.get(status, "🔸")
-    print(f"{timestamp} {icon} [{status}] {step_name}: {message}")
+    execution_log.log(step_name, status, message)
 
 
 def save_cookies(sb):
@@ -159,6 +159,7 @@ def wait_for_manual_authentication(sb, email_address, website_url):
         "Starting manual authentication process...",
     )
 
+    execution_log.flush()
     print("\n" + "=" * 70)
     print("MANUAL AUTHENTICATION REQUIRED")
     print("=" * 70)
@@ -466,37 +467,12 @@ def get_policy_details(session, employer, coverage_date):
 def read_input_csv(file_path):
     """Read the input CSV file with employer data"""
     try:
-        employers = []
-
-        # First, let's detect the delimiter
-        with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
-
-            # Try to detect delimiter
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
-
+        delimiter = None
+        if not is_spreadsheet(file_path):
+            delimiter = sniff_delimiter(file_path)
             log_step("Read Input", "INFO", f"Detected delimiter: '{delimiter}'")
 
-            # Read the CSV with detected delimiter
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-
-            for row in reader:
-                # Clean up column names (remove BOM and extra spaces)
-                cleaned_row = {
-                    key.strip().replace("\ufeff", ""): value.strip()
-                    for key, value in row.items()
-                }
-
-                employers.append(
-                    {
-                        "bureau_number": cleaned_row.get("Bureau Number", ""),
-                        "employer_name": cleaned_row.get("Employer Name", ""),
-                        "zip_code": cleaned_row.get("Zip Code", ""),
-                        "coverage_date": cleaned_row.get("Coverage Date", ""),
-                    }
-                )
+        employers = list(iter_input(file_path, delimiter))
 
         log_step(
             "Read Input",
@@ -537,7 +513,7 @@ def load_progress():
     try:
         if os.path.exists(PROGRESS_FILE):
             with open(PROGRESS_FILE, "r", encoding="utf-8") as f:
-                progress = json.load(f)
+                progress = Progress.from_dict(json.load(f))
             log_step(
                 "Load Progress",
                 "SUCCESS",
@@ -550,17 +526,17 @@ def load_progress():
                 "INFO",
                 "No progress file found, starting fresh",
             )
-            return {"completed": [], "results": []}
+            return Progress()
     except Exception as e:
         log_step("Load Progress", "ERROR", f"Error loading progress: {e}")
-        return {"completed": [], "results": []}
+        return Progress()
 
 
 def save_progress(progress):
     """Save progress tracking data"""
     try:
         with open(PROGRESS_FILE, "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
+            json.dump(progress, f, indent=2, ensure_ascii=False, default=to_json)
         log_step(
             "Save Progress",
             "SUCCESS",
@@ -607,7 +583,7 @@ def save_final_output(results, csv_file=OUTPUT_CSV, json_file=OUTPUT_JSON):
 
         # Save JSON
         with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+            json.dump(results, f, indent=2, ensure_ascii=False, default=to_json)
 
         log_step(
             "Save Output",
@@ -752,9 +728,7 @@ def main():
         return
 
     # Filter out already completed employers
-    pending_employers = [
-        e for e in employers if e["bureau_number"] not in progress["completed"]
-    ]
+    pending_employers = list(progress.pending(employers))
 
     if not pending_employers:
         log_step("Main", "SUCCESS", "All employers already processed!")
@@ -829,8 +803,9 @@ def main():
             employer_results = process_employer(session, employer, progress)
 
             # Add results to progress
-            progress["results"].extend(employer_results)
-            progress["completed"].append(employer["bureau_number"])
+            progress.mark_completed(
+                employer["bureau_number"], employer_results
+            )
 
             # Save progress after each employer
             save_progress(progress)
@@ -860,6 +835,7 @@ def main():
     save_final_output(progress["results"])
 
     # Print final summary
+    execution_log.flush()
     print("\n" + "=" * 60)
     print("PROCESSING COMPLETE")
     print("=" * 60)
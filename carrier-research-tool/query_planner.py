@@ -0,0 +1,99 @@
+"""
+Query planning: coalesce input rows that resolve to the same search.
+
+Many input rows differ only in bureau number (or address) but send the same
+employer name / zip / coverage date to the site, up to trivial differences
+(see canonical.py). The planner groups rows by that effective search key so
+each group is looked up once, and fans the lookup's result rows back out to
+every bureau number in the group.
+"""
+from collections import OrderedDict
+
+from canonical import canonical_search_key
+
+
+def search_key(employer):
+    """The part of an input row that actually determines the search request"""
+    return canonical_search_key(
+        employer["employer_name"], employer["zip_code"], employer["coverage_date"]
+    )
+
+
+def iter_query_groups(employers, stats=None, window=None):
+    """Group input rows by search key, yielding groups as they close.
+
+    Each group is {"key": ..., "employers": [...]}; the first employer of a
+    group is the one searched. With a window, at most that many groups are
+    held open at once and the oldest is yielded when a new key would exceed
+    it, so a streamed input is planned in bounded memory; a duplicate that
+    arrives after its group was yielded starts a new group (the lookup cache
+    still answers it). Without a window every group is held until the input
+    is exhausted. `stats`, if given, is updated in place as groups are yielded.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(plan_stats(0, 0))
+    groups = OrderedDict()
+    rows = lookups = 0
+
+    for employer in employers:
+        rows += 1
+        key = search_key(employer)
+        group = groups.get(key)
+        if group is not None:
+            group["employers"].append(employer)
+            continue
+        if window and len(groups) >= window:
+            _, oldest = groups.popitem(last=False)
+            stats.update(plan_stats(rows, lookups))
+            yield oldest
+        groups[key] = {"key": key, "employers": [employer]}
+        lookups += 1
+
+    stats.update(plan_stats(rows, lookups))
+    while groups:
+        _, oldest = groups.popitem(last=False)
+        yield oldest
+
+
+def plan_stats(rows, lookups):
+    """Dedup figures for `rows` input rows planned into `lookups` lookups"""
+    return {
+        "rows": rows,
+        "lookups": lookups,
+        "saved": rows - lookups,
+        "dedup_ratio": rows / max(1, lookups),
+        "saved_percent": (rows - lookups) / max(1, rows) * 100,
+    }
+
+
+def plan_queries(employers):
+    """Group all input rows by search key.
+
+    Returns (groups, stats) with the groups in first-seen order.
+    """
+    stats = {}
+    groups = list(iter_query_groups(employers, stats))
+    return groups, stats
+
+
+def fan_out(results, employer):
+    """Copy a group's result rows onto one of its employers"""
+    member_results = []
+    for result in results:
+        member_result = dict(result)
+        member_result["bureau_number"] = employer["bureau_number"]
+        if result["lookup_status"] == "Not Found":
+            # Not-found rows echo the input name rather than a search hit
+            member_result["employer_name"] = employer["employer_name"]
+        member_results.append(member_result)
+    return member_results
+
+
+def describe_plan(stats):
+    """One-line summary of a plan for the logs"""
+    return (
+        f"{stats['rows']} rows -> {stats['lookups']} lookups "
+        f"(dedup ratio {stats['dedup_ratio']:.2f}x, "
+        f"{stats['saved']} requests saved, {stats['saved_percent']:.1f}%)"
+    )
@@ -0,0 +1,99 @@
+"""
+Classification of responses from the search site.
+
+classify_response() lowercases a body once and searches it once for each
+distinct indicator string (an indicator shared by a flag and an error
+category is searched for once), producing the request-log flags and the
+error category together so log_request_response() and analyze_error() can
+share one result instead of each lowercasing and searching the body again.
+
+Kept free of the browser/proxy imports in scraper.py so it can be imported
+by offline tools such as bench_parsers.py.
+"""
+
+# Error categories in priority order, with the strings that signal them
+ERROR_INDICATORS = [
+    ("SESSION_EXPIRED", [
+        "invalidsession",
+        "invalid session",
+        "session expired",
+        "please log in",
+        "authentication required",
+        "forbidden",
+        "access denied",
+    ]),
+    ("NOT_FOUND", [
+        "not found",
+        "no results",
+        "no matching",
+        "could not find",
+        "data not found",
+    ]),
+    ("PROXY_ERROR", [
+        "proxy error",
+        "connection refused",
+        "timeout",
+        "too many requests",
+        "rate limit",
+    ]),
+]
+
+# Request-log flags and the strings that set them
+FLAG_INDICATORS = {
+    "has_otp_modal": ["one-time passcode"],
+    "has_session_error": ["invalid session", "session expired", "login"],
+}
+
+
+def _build_index():
+    """Distinct lowercase indicators with the flags/categories each sets"""
+    labels = {}
+    for category, indicators in ERROR_INDICATORS:
+        for indicator in indicators:
+            labels.setdefault(indicator, set()).add(category)
+    for flag, indicators in FLAG_INDICATORS.items():
+        for indicator in indicators:
+            labels.setdefault(indicator, set()).add(flag)
+    return [(indicator, frozenset(found)) for indicator, found in labels.items()]
+
+
+_INDICATORS = _build_index()
+
+
+def classify_response(response_text):
+    """Classify a response body: lowercase it once, search it per indicator.
+
+    Returns {"has_otp_modal", "has_session_error", "error_type"}, where
+    error_type is what analyze_error() reports for the body.
+    """
+    found = set()
+    if response_text:
+        text_lower = response_text.lower()
+        for indicator, labels in _INDICATORS:
+            if indicator in text_lower:
+                found |= labels
+
+    error_type = "UNKNOWN_ERROR"
+    for category, _ in ERROR_INDICATORS:
+        if category in found:
+            error_type = category
+            break
+
+    return {
+        "has_otp_modal": "has_otp_modal" in found,
+        "has_session_error": "has_session_error" in found,
+        "error_type": error_type,
+    }
+
+
+def analyze_error(response_text, status_code, classification=None):
+    """Analyze error response
+
+    Pass the classify_response() result already computed for this body to
+    skip scanning it again.
+    """
+    if not response_text:
+        return "UNKNOWN_ERROR"
+    if classification is None:
+        classification = classify_response(response_text)
+    return classification["error_type"]
@@ -0,0 +1,288 @@
+"""
+Local stand-in for the coverage site's Search endpoint.
+
+Answers the two query shapes the scrapers send to /Search:
+  - handler=SearchPolicyHolders: a results table whose rows carry
+    data-employer/data-city/data-state, or the "No results" alert
+  - handler=PolicyHolderDetails: a table of detail-row rows with the seven
+    columns extract_policy_details() reads
+and a plain search page for /Search with no handler, so session health
+checks pass. Rows are synthetic but deterministic: the same query always
+gets the same answer, so runs are comparable.
+
+Latency, 400 (session expired) and 429 (rate limited) rates are
+configurable to exercise the retry and pacing paths.
+
+Usage:
+  python standin_server.py --port 8765 --latency-ms 150 --jitter-ms 50 \\
+                           --error-rate 0.01 --rate-limit-rate 0.02
+"""
+import argparse
+import hashlib
+import html
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CITIES = [
+    ("LOS ANGELES", "CA", "90021"),
+    ("FRESNO", "CA", "93716"),
+    ("COTATI", "CA", "94931"),
+    ("SAN BERNARDINO", "CA", "92408"),
+    ("PORTLAND", "OR", "97217"),
+    ("CHARLOTTE", "NC", "28202"),
+]
+INSURERS = [
+    "STATE COMPENSATION INSURANCE FUND",
+    "EMPLOYERS COMPENSATION INSURANCE COMPANY",
+    "ZENITH INSURANCE COMPANY",
+    "TRAVELERS PROPERTY CASUALTY COMPANY OF AMERICA",
+]
+SUFFIXES = ["INC", "LLC", "CORP", "CO", "& SONS", "SERVICES INC"]
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<div class="container">
+{body}
+</div>
+</body>
+</html>
+"""
+SEARCH_FORM = """<form method="get" action="/Search">
+    <label>Employer Name <input name="EmployerName"></label>
+    <label>Coverage Date <input name="CoverageDate"></label>
+    <input type="hidden" name="handler" value="SearchPolicyHolders">
+</form>"""
+NO_RESULTS = '<div class="alert alert-info">No results were found matching your search criteria.</div>'
+SESSION_EXPIRED = '<div class="alert alert-danger">Your session expired. Please log in again.</div>'
+RATE_LIMITED = """<!DOCTYPE html>
+<html>
+<head><title>429 Too Many Requests</title></head>
+<body><h1>Too Many Requests</h1><p>Rate limit exceeded. Try again later.</p></body>
+</html>
+"""
+
+
+def _rng(*parts):
+    """Random generator seeded from the query, so answers are repeatable"""
+    digest = hashlib.sha256("\x1f".join(parts).upper().encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def search_page(employer_name, zip_code, max_hits=3, no_result_rate=0.2):
+    """Results table for a search, or the no-results page"""
+    rng = _rng("search", employer_name, zip_code)
+    if not employer_name or rng.random() < no_result_rate:
+        return PAGE.format(title="Search - California Workers' Compensation Coverage", body=NO_RESULTS)
+
+    rows = []
+    for _ in range(rng.randint(1, max_hits)):
+        name = f"{employer_name.upper()} {rng.choice(SUFFIXES)}"
+        city, state, _ = rng.choice(CITIES)
+        rows.append(
+            '            <tr class="text-primary link-cursor" data-employer="{0}" data-city="{1}" data-state="{2}">\n'
+            "                <td>{0}</td><td>{1}</td><td>{2}</td>\n"
+            "            </tr>".format(html.escape(name), html.escape(city), state)
+        )
+    body = (
+        '    <table class="table table-hover">\n'
+        "        <thead><tr><th>Employer</th><th>City</th><th>State</th></tr></thead>\n"
+        "        <tbody>\n" + "\n".join(rows) + "\n        </tbody>\n    </table>"
+    )
+    return PAGE.format(title="Search - California Workers' Compensation Coverage", body=body)
+
+
+def details_page(employer_name, city, state):
+    """Detail table for one search hit"""
+    rng = _rng("details", employer_name, city, state)
+    zip_code = next((z for c, s, z in CITIES if c == city and s == state), f"9{rng.randint(0, 9999):04d}")
+    fein = f"{rng.randint(10, 99)}-{rng.randint(1000000, 9999999)}"
+    rows = []
+    for _ in range(rng.randint(1, 2)):
+        cells = [
+            employer_name,
+            f"{rng.randint(100, 9999)} {rng.choice(['MAIN ST', 'OLD REDWOOD HWY', 'BROADWAY'])}",
+            city,
+            state,
+            zip_code,
+            rng.choice(INSURERS),
+            fein,
+        ]
+        rows.append(
+            '        <tr class="detail-row">\n'
+            + "".join(f"            <td>{html.escape(cell)}</td>\n" for cell in cells)
+            + "        </tr>"
+        )
+    body = (
+        '<table class="table table-borderless border">\n'
+        "    <thead>\n"
+        "        <tr><th>Employer</th><th>Address</th><th>City</th><th>State</th><th>Zip</th><th>Insurer</th><th>FEIN</th></tr>\n"
+        "    </thead>\n"
+        "    <tbody>\n" + "\n".join(rows) + "\n    </tbody>\n</table>"
+    )
+    return PAGE.format(title="Policy Holder Details", body=body)
+
+
+class StandInServer:
+    """Threaded stand-in server, run in the background by start()"""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency_ms=0,
+        jitter_ms=0,
+        error_rate=0.0,
+        rate_limit_rate=0.0,
+        max_hits=3,
+        no_result_rate=0.2,
+        seed=None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_hits = max_hits
+        self.no_result_rate = no_result_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.handlers = Counter()
+        self.statuses = Counter()
+        self.thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, body = server.respond(self.path)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/Search"
+
+    def respond(self, path):
+        """(status, body) for a request path; also sleeps the configured latency"""
+        parsed = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
+        handler = query.get("handler", "")
+
+        with self.lock:
+            delay = max(self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms), 0)
+            roll = self.random.random()
+            self.handlers[handler or "page"] += 1
+        if delay:
+            time.sleep(delay / 1000)
+
+        if parsed.path.rstrip("/") != "/Search":
+            return self._count(404, PAGE.format(title="Not Found", body="<h1>Not Found</h1>"))
+        if not handler:
+            return self._count(200, PAGE.format(title="Search", body=SEARCH_FORM))
+        if roll < self.rate_limit_rate:
+            return self._count(429, RATE_LIMITED)
+        if roll < self.rate_limit_rate + self.error_rate:
+            return self._count(400, PAGE.format(title="Error", body=SESSION_EXPIRED))
+
+        if handler == "SearchPolicyHolders":
+            page = search_page(
+                query.get("EmployerName", ""),
+                query.get("ZipCode", ""),
+                self.max_hits,
+                self.no_result_rate,
+            )
+            return self._count(200, page)
+        if handler == "PolicyHolderDetails":
+            page = details_page(
+                query.get("EmployerName", ""),
+                query.get("City", ""),
+                query.get("State", ""),
+            )
+            return self._count(200, page)
+        return self._count(400, PAGE.format(title="Error", body="<h1>Unknown handler</h1>"))
+
+    def _count(self, status, body):
+        with self.lock:
+            self.statuses[status] += 1
+        return status, body
+
+    def stats(self):
+        """Requests served by handler name and by status code"""
+        with self.lock:
+            return {"handlers": dict(self.handlers), "statuses": dict(self.statuses)}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Search endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="mean added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 400 session-expired answers")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429 answers")
+    parser.add_argument("--max-hits", type=int, default=3, help="most search hits per query")
+    parser.add_argument("--no-result-rate", type=float, default=0.2, help="share of searches with no hits")
+    parser.add_argument("--seed", type=int, help="seed for latency and error draws")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.host,
+        args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_hits=args.max_hits,
+        no_result_rate=args.no_result_rate,
+        seed=args.seed,
+    )
+    print(f"Stand-in serving {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    print(f"Served {server.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+import pytest
+
+from hit_ranking import ZIP3_STATES, HitRanker, name_similarity, zip_state
+
+
+@pytest.mark.parametrize(
+    "zip_code, state",
+    [
+        ("00601", "PR"),
+        ("00802", "VI"),
+        ("10001", "NY"),
+        ("20001", "DC"),
+        ("20146", "VA"),  # Ashburn: 201xx is Northern Virginia
+        ("20190", "VA"),
+        ("20500", "DC"),
+        ("20852", "MD"),
+        ("22201", "VA"),
+        ("73301", "TX"),  # Austin's 733 inside Oklahoma's 730-749
+        ("73102", "OK"),
+        ("93291-9358", "CA"),
+        ("96813", "HI"),
+        ("99501", "AK"),
+        ("", ""),
+    ],
+)
+def test_zip_state(zip_code, state):
+    assert zip_state(zip_code) == state
+
+
+def test_zip3_table_is_sorted():
+    starts = [start for start, _ in ZIP3_STATES]
+    assert starts == sorted(set(starts))
+
+
+def test_name_similarity_tolerates_truncated_input():
+    assert name_similarity("MOORE TWININ", "Moore Twining Associates, Inc.") == 1.0
+    assert name_similarity("ACME", "ZENITH") < 0.5
+
+
+def test_threshold_keeps_the_state_match_and_always_the_best_hit():
+    employer = {"employer_name": "ACME", "zip_code": "20146"}
+    hits = [
+        {"employer_name": "ACME", "state": "DC", "city": ""},
+        {"employer_name": "ACME", "state": "VA", "city": ""},
+    ]
+    ranker = HitRanker("threshold", min_score=0.9)
+    assert ranker.select(employer, hits) == [hits[1]]
+    assert ranker.stats()["skipped"] == 1
+
+    nothing_close = [{"employer_name": "ZENITH", "state": "CA", "city": ""}] * 2
+    assert len(ranker.select(employer, nothing_close)) == 1
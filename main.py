@@ -7,7 +7,7 @@ from auth import load_auth
 from client import get_client
 from email_reader import get_otp_from_email, get_otp_simple
 from search import search_worker_detailed
-from storage import save_excel, save_json
+from storage import save_result
 
 
 def main():
@@ -76,9 +76,9 @@ def main():
             session = get_client()
             result = search_worker_detailed(session, search_data)
             output = {"input": search_data, "result": result}
-            save_json(output)
-            save_excel(output)
+            save_result(output)
             print("Search completed and saved successfully.")
+            print("Run `python storage.py` to rebuild results.json and results.xlsx.")
         except Exception as e:
             print(f"Search failed: {e}")
     else:
@@ -1,42 +1,131 @@
 import json
 import os
 
-from openpyxl import Workbook, load_workbook
+from openpyxl import Workbook
 
 JSON_FILE = "results.json"
+JSONL_FILE = "results.jsonl"
 EXCEL_FILE = "results.xlsx"
 
+EXCEL_HEADER = ["name", "postal", "date", "data"]
 
-def save_json(data):
-    try:
-        existing = json.load(open(JSON_FILE))
-    except:
-        existing = []
 
-    existing.append(data)
+def excel_row(data):
+    search = data["input"]
+    return [
+        search.get("name", search.get("EmployerName")),
+        search.get("postal", search.get("ZipCode")),
+        search.get("date", search.get("CoverageDate")),
+        json.dumps(data["result"]),
+    ]
 
-    with open(JSON_FILE, "w") as f:
-        json.dump(existing, f, indent=2)
 
+class ResultWriter:
+    """Append-only result writer.
 
-def save_excel(data):
-    exists = os.path.exists(EXCEL_FILE)
+    Each result is appended to results.jsonl and fsync'd before write()
+    returns, so saving one costs the same however many came before and a
+    saved result survives a crash. results.json and results.xlsx are only
+    rebuilt on demand, by export() (python storage.py), which streams the
+    JSONL once and writes the workbook in openpyxl's write-only mode.
+    """
 
-    if exists:
-        wb = load_workbook(EXCEL_FILE)
-        ws = wb.active
-    else:
-        wb = Workbook()
-        ws = wb.active
-        ws.append(["name", "postal", "date", "data"])
+    def __init__(self, jsonl_file=JSONL_FILE, json_file=JSON_FILE, excel_file=EXCEL_FILE):
+        self.jsonl_file = jsonl_file
+        self.json_file = json_file
+        self.excel_file = excel_file
+        self._file = None
 
-    ws.append(
-        [
-            data["input"]["name"],
-            data["input"]["postal"],
-            data["input"]["date"],
-            json.dumps(data["result"]),
-        ]
-    )
+        if not os.path.exists(jsonl_file) and os.path.exists(json_file):
+            self._migrate_json()
 
-    wb.save(EXCEL_FILE)
+    def _migrate_json(self):
+        """Seed the JSONL from a results.json written by the old save_json()"""
+        try:
+            existing = json.load(open(self.json_file))
+        except ValueError:
+            return
+        with open(self.jsonl_file, "w") as f:
+            for data in existing:
+                f.write(json.dumps(data) + "\n")
+
+    def write(self, data):
+        """Durably append one result"""
+        if self._file is None:
+            self._file = open(self.jsonl_file, "a")
+        self._file.write(json.dumps(data) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def iter_results(self):
+        if not os.path.exists(self.jsonl_file):
+            return
+        with open(self.jsonl_file) as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # Torn last line from a crash mid-write
+                    break
+                if line.strip():
+                    yield json.loads(line)
+
+    def export(self):
+        """Rewrite results.json and results.xlsx from the JSONL in one pass"""
+        json_tmp = self.json_file + ".tmp"
+        excel_tmp = self.excel_file + ".tmp"
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(EXCEL_HEADER)
+
+        count = 0
+        with open(json_tmp, "w") as f:
+            f.write("[")
+            for data in self.iter_results():
+                body = json.dumps(data, indent=2)
+                f.write(",\n  " if count else "\n  ")
+                f.write(body.replace("\n", "\n  "))
+                ws.append(excel_row(data))
+                count += 1
+            f.write("\n]" if count else "]")
+
+        wb.save(excel_tmp)
+        os.replace(json_tmp, self.json_file)
+        os.replace(excel_tmp, self.excel_file)
+        return count
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_writer = None
+
+
+def get_writer():
+    """Module-wide writer"""
+    global _writer
+
+    if _writer is None:
+        _writer = ResultWriter()
+    return _writer
+
+
+def save_result(data):
+    get_writer().write(data)
+
+
+def export_results():
+    """Rebuild results.json and results.xlsx from results.jsonl"""
+    return get_writer().export()
+
+
+if __name__ == "__main__":
+    count = export_results()
+    print(f"Wrote {count} results to {JSON_FILE} and {EXCEL_FILE}")
@@ -0,0 +1,222 @@
+"""
+Offline parser benchmark and regression check.
+
+Replays a corpus of saved response pages through the search/detail
+extractors, classify_response() and analyze_error(), without touching the network, and reports
+for each parser:
+  - throughput (pages/s)
+  - allocations (average tracemalloc peak per page; Python heap only, so
+    memory allocated inside lxml's C code is not counted)
+  - correctness against golden outputs in bench_corpus/golden.json
+
+The corpus is every distinct page (by content hash) under the given paths;
+by default the debug_logs/ pages saved by log_request_response(), the
+fixtures in bench_corpus/, and the page sources saved by the browser flow.
+
+Usage:
+  python bench_parsers.py                  # benchmark and check goldens
+  python bench_parsers.py --update-golden  # accept current outputs as golden
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from extractors import (
+    extract_policy_details,
+    extract_search_results,
+    policy_details_bs4,
+    search_results_bs4,
+)
+from response_classifier import ERROR_INDICATORS, analyze_error, classify_response
+
+DEFAULT_CORPUS = [
+    "debug_logs",
+    "bench_corpus",
+    os.path.join("..", "carrier-research-tool", "debug_page_source.html"),
+    os.path.join("..", "carrier-research-tool", "error_page_source.html"),
+]
+GOLDEN_FILE = os.path.join("bench_corpus", "golden.json")
+
+# Saved debug pages are named <timestamp>_<TYPE>_<status>.html
+STATUS_IN_NAME = re.compile(r"_(\d{3})\.html$")
+
+PARSERS = {
+    "search": lambda page: extract_search_results(page["text"]),
+    "details": lambda page: extract_policy_details(page["text"]),
+    "analyze_error": lambda page: analyze_error(page["text"], page["status_code"]),
+    "classify": lambda page: classify_response(page["text"]),
+}
+REFERENCE_PARSERS = {
+    "search (bs4)": lambda page: search_results_bs4(page["text"]),
+    "details (bs4)": lambda page: policy_details_bs4(page["text"]),
+    "classify (legacy)": lambda page: legacy_classify(page["text"]),
+}
+
+
+def legacy_classify(response_text):
+    """The per-indicator scans log_request_response() and analyze_error()
+    did before sharing classify_response(), each lowercasing the body again"""
+    has_otp_modal = "one-time passcode" in (response_text or "").lower()
+    has_session_error = any(
+        indicator in (response_text or "").lower()
+        for indicator in ["invalid session", "session expired", "login"]
+    )
+    # ...again to decide whether to save the page and log it to the console
+    for _ in range(2):
+        "one-time passcode" in (response_text or "").lower()
+    error_type = "UNKNOWN_ERROR"
+    if response_text:
+        text_lower = response_text.lower()
+        for category, indicators in ERROR_INDICATORS:
+            if any(indicator in text_lower for indicator in indicators):
+                error_type = category
+                break
+    return {
+        "has_otp_modal": has_otp_modal,
+        "has_session_error": has_session_error,
+        "error_type": error_type,
+    }
+
+
+def iter_corpus_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "*.html")))
+            # Pages kept by the debug page store
+            yield from sorted(glob.glob(os.path.join(path, "**", "*.html.gz"), recursive=True))
+        elif os.path.isfile(path):
+            yield path
+
+
+def load_corpus(paths):
+    """Distinct pages under `paths`, keyed by sha256 of their content"""
+    pages = {}
+    for path in iter_corpus_files(paths):
+        with (gzip.open if path.endswith(".gz") else open)(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in pages:
+            pages[digest]["copies"] += 1
+            continue
+        match = STATUS_IN_NAME.search(path)
+        pages[digest] = {
+            "sha256": digest,
+            "file": path,
+            "copies": 1,
+            "status_code": int(match.group(1)) if match else 200,
+            "text": data.decode("utf-8", errors="replace"),
+        }
+    return pages
+
+
+def run_outputs(pages):
+    return {
+        digest: {name: parser(page) for name, parser in PARSERS.items()}
+        for digest, page in pages.items()
+    }
+
+
+def measure_throughput(parser, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parser(page)
+    elapsed = time.perf_counter() - start
+    return len(pages) * repeat / max(elapsed, 1e-9)
+
+
+def measure_allocations(parser, pages):
+    """Average tracemalloc peak, in bytes, while parsing one page"""
+    total = 0
+    tracemalloc.start()
+    for page in pages:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        parser(page)
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / max(1, len(pages))
+
+
+def check_golden(outputs, pages, golden):
+    """Compare outputs with the goldens; returns (failures, unchecked)"""
+    failures = []
+    unchecked = 0
+    for digest, output in outputs.items():
+        expected = golden.get(digest)
+        if expected is None:
+            unchecked += 1
+            continue
+        for name, value in output.items():
+            if expected.get(name) != value:
+                failures.append((pages[digest]["file"], name, expected.get(name), value))
+    return failures, unchecked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline parser benchmark")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_CORPUS, help="corpus files/directories")
+    parser.add_argument("--golden", default=GOLDEN_FILE, help="golden outputs file")
+    parser.add_argument("--update-golden", action="store_true", help="write current outputs as golden")
+    parser.add_argument("--repeat", type=int, default=3, help="timing passes over the corpus")
+    parser.add_argument("--no-reference", action="store_true", help="skip the BeautifulSoup reference parsers")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.paths)
+    if not pages:
+        print("No pages found in corpus")
+        return 1
+    copies = sum(page["copies"] for page in pages.values())
+    print(f"Corpus: {len(pages)} distinct pages ({copies} files)")
+
+    outputs = run_outputs(pages)
+
+    if args.update_golden:
+        golden = {
+            digest: {"file": pages[digest]["file"].replace(os.sep, "/"), **output}
+            for digest, output in sorted(outputs.items(), key=lambda item: pages[item[0]]["file"])
+        }
+        with open(args.golden, "w", encoding="utf-8") as f:
+            json.dump(golden, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Wrote {len(golden)} golden outputs to {args.golden}")
+        return 0
+
+    golden = {}
+    if os.path.exists(args.golden):
+        with open(args.golden, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+    failures, unchecked = check_golden(outputs, pages, golden)
+
+    corpus = list(pages.values())
+    parsers = dict(PARSERS)
+    if not args.no_reference:
+        parsers.update(REFERENCE_PARSERS)
+
+    print()
+    print(f"{'parser':<16} {'pages/s':>10} {'peak KiB/page':>14}")
+    for name, func in parsers.items():
+        rate = measure_throughput(func, corpus, args.repeat)
+        peak = measure_allocations(func, corpus)
+        print(f"{name:<16} {rate:10.1f} {peak / 1024:14.1f}")
+
+    print()
+    checked = len(pages) - unchecked
+    print(f"Correctness: {checked - len({f[0] for f in failures})}/{checked} pages match golden, {unchecked} without golden")
+    for path, name, expected, actual in failures:
+        print(f"  MISMATCH {path} [{name}]")
+        print(f"    expected: {json.dumps(expected, ensure_ascii=False)[:200]}")
+        print(f"    actual:   {json.dumps(actual, ensure_ascii=False)[:200]}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Startup budget check for the offline code paths.
+
+Imports each offline entry module in a fresh interpreter and checks that
+  - the import finishes within the startup budget (best of --runs)
+  - none of the heavy, display- or browser-bound packages got imported
+  - importing scraper did not create the ProxyManager (which reads
+    proxy_status.json)
+
+Each import runs in a temporary directory, so module-level side effects
+(debug_logs/, the request log index) don't touch the real run's files.
+
+Usage:
+  python bench_startup.py                 # check against the default budget
+  python bench_startup.py --budget-ms 300 --runs 5
+  python bench_startup.py --importtime scraper   # slowest imports of one module
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules offline commands import; they must start without the heavy set
+OFFLINE_MODULES = [
+    "scraper",
+    "log_report",
+    "request_log",
+    "debug_store",
+    "progress_journal",
+    "results_store",
+    "lookup_cache",
+    "job_ledger",
+]
+HEAVY_MODULES = [
+    "pyautogui",
+    "pynput",
+    "selenium",
+    "seleniumbase",
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "firebase_admin",
+]
+DEFAULT_BUDGET_MS = 500
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module} as target
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+extra = {{}}
+if {module!r} == "scraper":
+    extra["proxy_manager_created"] = target.proxy_manager is not None
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy, "extra": extra}}))
+"""
+
+
+def probe(module, workdir):
+    """Import `module` in a fresh interpreter; returns the probe's report and wall time"""
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "import failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), wall
+
+
+def show_importtime(module, workdir, top=15):
+    """Print the slowest cumulative imports reported by -X importtime"""
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  (self {self_us / 1000:6.1f}ms)  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("modules", nargs="*", help=f"modules to check (default: {', '.join(OFFLINE_MODULES)})")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="import time budget per module")
+    parser.add_argument("--runs", type=int, default=3, help="imports per module; the best one counts")
+    parser.add_argument("--importtime", metavar="MODULE", help="show the slowest imports of MODULE and exit")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as workdir:
+        if args.importtime:
+            show_importtime(args.importtime, workdir)
+            return 0
+
+        failures = 0
+        print(f"Startup budget: {args.budget_ms:.0f}ms per module (best of {args.runs})")
+        for module in args.modules or OFFLINE_MODULES:
+            try:
+                runs = [probe(module, workdir) for _ in range(args.runs)]
+            except RuntimeError as e:
+                print(f"  FAIL {module:<18} import error: {e}")
+                failures += 1
+                continue
+
+            report, wall = min(runs, key=lambda run: run[0]["elapsed"])
+            problems = []
+            if report["elapsed"] * 1000 > args.budget_ms:
+                problems.append("over budget")
+            if report["heavy"]:
+                problems.append(f"imported {', '.join(report['heavy'])}")
+            if report["extra"].get("proxy_manager_created"):
+                problems.append("created ProxyManager")
+            failures += bool(problems)
+
+            print(
+                f"  {'FAIL' if problems else 'ok  '} {module:<18} "
+                f"import {report['elapsed'] * 1000:7.1f}ms  "
+                f"process {wall * 1000:7.1f}ms"
+                + (f"  - {'; '.join(problems)}" if problems else "")
+            )
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Buffered step logger.
+
+log() only filters by level and puts a tuple on a SimpleQueue, so the hot
+path costs a few microseconds and never touches the console or the disk.
+A single background writer thread drains the queue in batches, formats the
+lines, echoes them to stdout, appends them to the log file with one write
+per batch and rotates the file by size. Because only the writer prints or
+writes, lines from concurrent workers never interleave. Once close() has
+stopped the writer (at exit, say), log() writes each line itself.
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from queue import Empty, SimpleQueue
+
+STATUS_ICONS = {
+    "INFO": "ℹ️",
+    "SUCCESS": "✅",
+    "ERROR": "❌",
+    "WARNING": "⚠️",
+    "RETRY": "🔄",
+    "DEBUG": "🔍",
+    "PROXY": "🔁",
+}
+
+# Status -> severity used for level filtering; unknown statuses count as INFO
+LEVELS = {
+    "DEBUG": 10,
+    "INFO": 20,
+    "PROXY": 20,
+    "SUCCESS": 25,
+    "RETRY": 30,
+    "WARNING": 30,
+    "ERROR": 40,
+}
+
+_FLUSH = object()
+_STOP = object()
+
+
+class BufferedLog:
+    """Queue-fed logger with one writer thread, level filtering and rotation"""
+
+    def __init__(
+        self,
+        path=None,
+        level="DEBUG",
+        echo=True,
+        max_bytes=10 * 1024 * 1024,
+        backup_count=5,
+        batch_size=500,
+    ):
+        self.path = path
+        self.min_level = LEVELS.get(level, 20)
+        self.echo = echo
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self._queue = SimpleQueue()
+        self._file = None
+        self._closed = False
+        self._direct_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def log(self, step_name, status="INFO", message=""):
+        """Queue one log line; returns immediately"""
+        if LEVELS.get(status, 20) >= self.min_level:
+            item = (time.time(), step_name, status, message)
+            if self._closed:
+                self._write_direct([item])
+            else:
+                self._queue.put(item)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been written"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self):
+        """Write out the queue and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((_STOP, None))
+        self._writer.join()
+        # Lines queued by a log() that raced with close()
+        leftover = []
+        try:
+            while True:
+                leftover.append(self._queue.get_nowait())
+        except Empty:
+            pass
+        self._write_direct([item for item in leftover if item[0] not in (_FLUSH, _STOP)])
+        for item in leftover:
+            if item[0] is _FLUSH:
+                item[1].set()
+
+    def _write_direct(self, items):
+        """Write lines from the calling thread; used once the writer has stopped"""
+        if not items:
+            return
+        with self._direct_lock:
+            self._write([self._format(item) for item in items])
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _format(item):
+        created, step_name, status, message = item
+        timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+        icon = STATUS_ICONS.get(status, "🔸")
+        return f"{timestamp} {icon} [{status}] {step_name}: {message}"
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except Empty:
+                pass
+
+            lines = []
+            waiters = []
+            stop = False
+            for item in batch:
+                if item[0] is _FLUSH:
+                    waiters.append(item[1])
+                elif item[0] is _STOP:
+                    stop = True
+                else:
+                    lines.append(self._format(item))
+
+            if lines:
+                self._write(lines)
+            for done in waiters:
+                done.set()
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write(self, lines):
+        text = "\n".join(lines) + "\n"
+        try:
+            if self.echo:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            if self.path:
+                data = text.encode("utf-8")
+                self._open()
+                if self._file.tell() and self._file.tell() + len(data) > self.max_bytes:
+                    self._rotate()
+                self._file.write(data)
+                self._file.flush()
+        except Exception as e:
+            # Logging must never take the writer thread down with it
+            sys.stderr.write(f"Log writer error: {e}\n")
+
+    def _open(self):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "ab")
+
+    def _rotate(self):
+        """Shift log -> log.1 -> ... -> log.N, dropping the oldest"""
+        self._file.close()
+        self._file = None
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
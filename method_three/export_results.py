@@ -0,0 +1,251 @@
+"""
+Rebuild the final CSV/JSON outputs offline, without scraping.
+
+Streams result rows from one source, filters them, and writes them through
+write_final_output(), the same writer save_final_output() uses, in a
+single pass. Only the current record is held in memory, plus the set of
+bureau numbers already seen when reading the journal.
+
+Sources:
+  journal  the progress snapshot + journal tail (default); a legacy
+           progress_tracker JSON is migrated to a snapshot first
+  store    the append-only results sink
+  cache    the lookup cache, replayed for each row of an input CSV exactly
+           as process_employer() would build its rows; rows whose search
+           was never cached are skipped and counted
+
+Usage:
+  python export_results.py
+  python export_results.py --status Found --since 2025-12-01 --until 2025-12-08
+  python export_results.py --bureaus 42,270 --bureau-file redo.txt -o redo.csv --json-out redo.json
+  python export_results.py --source cache --input input_fast.csv
+  SCRAPER_INSTANCE=2 python export_results.py   # files of scraper instance 2
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from input_reader import iter_input
+from lookup_cache import LookupCache
+from progress_journal import ProgressJournal
+from results_store import ResultsStore, write_final_output
+
+# Same files scraper.py reads and writes, for the same SCRAPER_INSTANCE
+INSTANCE = os.environ.get("SCRAPER_INSTANCE", "1")
+INPUT_CSV = "input_fast.csv"
+OUTPUT_CSV = f"final_output_fast_{INSTANCE}.csv"
+OUTPUT_JSON = f"final_output_fast_{INSTANCE}.json"
+RESULTS_STORE_FILE = f"final_output_fast_{INSTANCE}.results.jsonl"
+PROGRESS_FILE = f"progress_tracker_fast_{INSTANCE}.json"
+PROGRESS_SNAPSHOT_FILE = f"progress_tracker_fast_{INSTANCE}.snapshot.jsonl"
+PROGRESS_JOURNAL_FILE = f"progress_tracker_fast_{INSTANCE}.journal.jsonl"
+LOOKUP_CACHE_FILE = "lookup_cache_fast_1.sqlite3"  # shared by every instance
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# ==========================================================
+# SOURCES
+# ==========================================================
+def iter_journal(bureaus=None):
+    """Result rows from the progress snapshot and journal, in completion order"""
+    journal = ProgressJournal(
+        PROGRESS_SNAPSHOT_FILE, PROGRESS_JOURNAL_FILE, legacy_file=PROGRESS_FILE
+    )
+    journal.migrate()
+    for record in journal.iter_records():
+        if bureaus is not None and record["bureau_number"] not in bureaus:
+            continue
+        yield from record["results"]
+
+
+def iter_store():
+    """Result rows from the append-only results sink"""
+    store = ResultsStore(RESULTS_STORE_FILE)
+    try:
+        yield from store.iter_results()
+    finally:
+        store.close()
+
+
+def convert_date_format(date_str):
+    """mm/dd/yyyy -> yyyy-mm-dd, as scraper.convert_date_format() sends it"""
+    try:
+        return datetime.strptime(date_str, "%m/%d/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return date_str
+
+
+def cached_results(cache, employer):
+    """The rows process_employer() would build from cached lookups, or None"""
+    coverage_date = convert_date_format(employer["coverage_date"])
+    search = cache.peek(
+        {
+            "handler": "SearchPolicyHolders",
+            "CoverageDate": coverage_date,
+            "Fein": "",
+            "EmployerName": employer["employer_name"],
+            "StreetAddress": "",
+            "City": "",
+            "State": "",
+            "ZipCode": employer["zip_code"],
+        }
+    )
+    if search is None:
+        return None
+    hits, searched_at = search
+    searched_at = datetime.fromtimestamp(searched_at).strftime(TIMESTAMP_FORMAT)
+
+    if not hits:
+        return [
+            {
+                "bureau_number": employer["bureau_number"],
+                "employer_name": employer["employer_name"],
+                "street_address": "",
+                "city": "",
+                "state": "",
+                "zip_code": "",
+                "insurer_name": "",
+                "fein": "",
+                "lookup_status": "Not Found",
+                "extracted_at": searched_at,
+            }
+        ]
+
+    results = []
+    for hit in hits:
+        details = cache.peek(
+            {
+                "handler": "PolicyHolderDetails",
+                "CoverageDate": coverage_date,
+                "EmployerName": hit["employer_name"],
+                "City": hit["city"],
+                "State": hit["state"],
+            }
+        )
+        if details and details[0]:
+            details = details[0]
+            results.append(
+                {
+                    "bureau_number": employer["bureau_number"],
+                    "employer_name": details["employer_name"],
+                    "street_address": details["street_address"],
+                    "city": details["city"],
+                    "state": details["state"],
+                    "zip_code": details["zip_code"],
+                    "insurer_name": details["insurer_name"],
+                    "fein": details["fein"],
+                    "lookup_status": "Found",
+                    "extracted_at": details["extracted_at"],
+                }
+            )
+        else:
+            results.append(
+                {
+                    "bureau_number": employer["bureau_number"],
+                    "employer_name": hit["employer_name"],
+                    "street_address": "",
+                    "city": hit["city"],
+                    "state": hit["state"],
+                    "zip_code": "",
+                    "insurer_name": "",
+                    "fein": "",
+                    "lookup_status": "Details Not Found",
+                    "extracted_at": searched_at,
+                }
+            )
+    return results
+
+
+def iter_cache(input_csv, stats, bureaus=None):
+    """Result rows rebuilt from the lookup cache for each input row"""
+    cache = LookupCache(LOOKUP_CACHE_FILE)
+    try:
+        for employer in iter_input(input_csv):
+            if bureaus is not None and employer["bureau_number"] not in bureaus:
+                continue
+            results = cached_results(cache, employer)
+            if results is None:
+                stats["uncached"] += 1
+                continue
+            yield from results
+    finally:
+        cache.close()
+
+
+# ==========================================================
+# FILTERS
+# ==========================================================
+def normalize_bound(value):
+    """Accept 2025-12-05, 2025-12-05 10:00 or 2025-12-05T10:00:00"""
+    return value.replace("T", " ") if value else None
+
+
+def filter_results(results, statuses=None, since=None, until=None, bureaus=None):
+    """Keep rows matching every given filter; `until` is exclusive"""
+    for result in results:
+        if statuses and result.get("lookup_status") not in statuses:
+            continue
+        extracted_at = result.get("extracted_at") or ""
+        if since and extracted_at < since:
+            continue
+        if until and extracted_at >= until:
+            continue
+        if bureaus is not None and result.get("bureau_number") not in bureaus:
+            continue
+        yield result
+
+
+def read_bureaus(values, path):
+    """Bureau numbers from comma-separated values and/or a one-per-line file"""
+    if not values and not path:
+        return None
+    bureaus = set()
+    for value in values or []:
+        bureaus.update(b.strip() for b in value.split(",") if b.strip())
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            bureaus.update(line.strip() for line in f if line.strip())
+    return bureaus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the final outputs without scraping")
+    parser.add_argument("--source", choices=("journal", "store", "cache"), default="journal")
+    parser.add_argument("--input", default=INPUT_CSV, help="input CSV/XLSX replayed against the cache")
+    parser.add_argument("--status", action="append", help="keep this lookup_status (repeatable)")
+    parser.add_argument("--since", help="earliest extracted_at (inclusive)")
+    parser.add_argument("--until", help="latest extracted_at (exclusive)")
+    parser.add_argument("--bureaus", action="append", help="comma-separated bureau numbers to keep")
+    parser.add_argument("--bureau-file", help="file of bureau numbers to keep, one per line")
+    parser.add_argument("-o", "--csv-out", default=OUTPUT_CSV)
+    parser.add_argument("--json-out", default=OUTPUT_JSON)
+    args = parser.parse_args()
+
+    bureaus = read_bureaus(args.bureaus, args.bureau_file)
+    stats = {"uncached": 0}
+    if args.source == "journal":
+        results = iter_journal(bureaus)
+    elif args.source == "store":
+        results = iter_store()
+    else:
+        results = iter_cache(args.input, stats, bureaus)
+
+    results = filter_results(
+        results,
+        statuses=set(args.status) if args.status else None,
+        since=normalize_bound(args.since),
+        until=normalize_bound(args.until),
+        bureaus=bureaus,
+    )
+    count = write_final_output(results, args.csv_out, args.json_out)
+
+    print(f"Wrote {count} records from the {args.source} to {args.csv_out} and {args.json_out}")
+    if stats["uncached"]:
+        print(f"Skipped {stats['uncached']} input rows with no cached search")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
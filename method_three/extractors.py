@@ -0,0 +1,169 @@
+"""
+Targeted extraction of search hits and policy details from response HTML.
+
+The fast path parses the page once with lxml and pulls only what is needed:
+the data-employer/data-city/data-state attributes of result rows and the
+cells of the first complete detail-row. The original BeautifulSoup walk is
+kept as the reference implementation; it is used when lxml is not
+installed, when lxml fails on a page, and when the fast path comes back
+empty on a page that does contain result markup.
+"""
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # BeautifulSoup path only
+    lxml = None
+
+DETAIL_FIELDS = [
+    "employer_name",
+    "street_address",
+    "city",
+    "state",
+    "zip_code",
+    "insurer_name",
+    "fein",
+]
+
+_HAS_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+if lxml is not None:
+    _SEARCH_ROWS = etree.XPath("//tr[@data-employer]")
+    _RESULT_ROWS = etree.XPath("//tr[contains(@class, 'result-row')]")
+    _DETAIL_ROWS = etree.XPath("//tr[" + _HAS_CLASS.format("detail-row") + "]")
+    _CELLS = etree.XPath("./td")
+    _TEXT = etree.XPath(".//text()")
+
+
+# ==========================================================
+# lxml fast path
+# ==========================================================
+def _parse(html):
+    if not html or not html.strip():
+        return None
+    return lxml.html.fromstring(html)
+
+
+def _cell_text(cell):
+    """Same text as BeautifulSoup's get_text(strip=True)"""
+    return "".join(text.strip() for text in _TEXT(cell))
+
+
+def _search_results_lxml(html):
+    root = _parse(html)
+    if root is None:
+        return []
+
+    results = []
+    for row in _SEARCH_ROWS(root):
+        employer = row.get("data-employer")
+        if employer:
+            results.append(
+                {
+                    "employer_name": employer,
+                    "city": row.get("data-city") or "",
+                    "state": row.get("data-state") or "",
+                }
+            )
+
+    if not results:
+        for row in _RESULT_ROWS(root):
+            cells = _CELLS(row)
+            if len(cells) >= 3:
+                results.append(
+                    {
+                        "employer_name": _cell_text(cells[0]),
+                        "city": _cell_text(cells[1]),
+                        "state": _cell_text(cells[2]),
+                    }
+                )
+    return results
+
+
+def _policy_details_lxml(html):
+    root = _parse(html)
+    if root is None:
+        return {}
+
+    for row in _DETAIL_ROWS(root):
+        cells = _CELLS(row)
+        if len(cells) >= len(DETAIL_FIELDS):
+            return {
+                field: _cell_text(cell) for field, cell in zip(DETAIL_FIELDS, cells)
+            }
+    return {}
+
+
+# ==========================================================
+# BeautifulSoup reference path
+# ==========================================================
+def search_results_bs4(html):
+    """Reference search-hit extraction with BeautifulSoup"""
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+
+    for row in soup.find_all("tr", attrs={"data-employer": True}):
+        employer = row.get("data-employer")
+        if employer:
+            results.append(
+                {
+                    "employer_name": employer,
+                    "city": row.get("data-city") or "",
+                    "state": row.get("data-state") or "",
+                }
+            )
+
+    if not results:
+        for row in soup.find_all("tr", class_=lambda x: x and "result-row" in x):
+            cells = row.find_all("td")
+            if len(cells) >= 3:
+                results.append(
+                    {
+                        "employer_name": cells[0].get_text(strip=True),
+                        "city": cells[1].get_text(strip=True),
+                        "state": cells[2].get_text(strip=True),
+                    }
+                )
+    return results
+
+
+def policy_details_bs4(html):
+    """Reference detail-row extraction with BeautifulSoup"""
+    soup = BeautifulSoup(html, "html.parser")
+
+    for row in soup.find_all("tr", class_="detail-row"):
+        cells = row.find_all("td")
+        if len(cells) >= len(DETAIL_FIELDS):
+            return {
+                field: cell.get_text(strip=True)
+                for field, cell in zip(DETAIL_FIELDS, cells)
+            }
+    return {}
+
+
+# ==========================================================
+# Public API
+# ==========================================================
+def extract_search_results(html):
+    """List of {"employer_name", "city", "state"} hits on a search page"""
+    if lxml is not None:
+        try:
+            results = _search_results_lxml(html)
+            if results or ("data-employer" not in html and "result-row" not in html):
+                return results
+        except (etree.ParserError, ValueError):
+            pass
+    return search_results_bs4(html)
+
+
+def extract_policy_details(html):
+    """The first complete detail row of a details page, or {} if none"""
+    if lxml is not None:
+        try:
+            details = _policy_details_lxml(html)
+            if details or "detail-row" not in html:
+                return details
+        except (etree.ParserError, ValueError):
+            pass
+    return policy_details_bs4(html)
@@ -0,0 +1,247 @@
+"""
+Record/replay transport for requests sessions.
+
+A CassetteAdapter is mounted on a session in place of the stock
+HTTPAdapter, so session.get() call sites don't change. Modes:
+  - passthrough: plain HTTPAdapter behaviour, nothing written
+  - record: send over the network and append each exchange to the cassette
+  - replay: answer from the cassette; nothing touches the network, and a
+    request that was never recorded fails with ConnectionError
+
+The cassette is gzip'd JSONL. Each distinct body is written once, as
+{"body": sha256, "text": ...}; each exchange is a small record
+{"key", "status", "reason", "headers", "body", "elapsed_ms"} that points
+at it. The key is the method and URL with its query parameters sorted.
+Recording into an existing cassette appends a new gzip member, so earlier
+exchanges are kept.
+
+A request sent several times (retries) is replayed in the order it was
+recorded; once its recordings run out the last one repeats.
+
+Usage:
+  python http_cassette.py CASSETTE     # summarise a cassette
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from threading import Lock
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MODES = ("passthrough", "record", "replay")
+
+# Response headers worth keeping; the body is stored decoded, so
+# Content-Encoding and Content-Length must not be replayed
+KEPT_HEADERS = ("Content-Type", "Retry-After", "Location")
+
+
+def request_key(method, url):
+    """Method plus URL with the query parameters in sorted order"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+
+
+def _encode(content):
+    return (content or b"").decode("utf-8", "surrogateescape")
+
+
+def _decode(text):
+    return text.encode("utf-8", "surrogateescape")
+
+
+class Cassette:
+    """Exchanges recorded to, or replayed from, one cassette file"""
+
+    def __init__(self, path, mode="replay"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.bodies = {}
+        self.exchanges = defaultdict(list)
+        self.positions = Counter()
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._file = None
+
+        if mode != "passthrough" and os.path.exists(path):
+            self._load()
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"Cassette {path} not found")
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "text" in record:
+                        # Recording only needs to know which bodies exist
+                        self.bodies[record["body"]] = (
+                            record["text"] if self.mode == "replay" else None
+                        )
+                    elif self.mode == "replay":
+                        self.exchanges[record["key"]].append(record)
+            except EOFError:
+                # Last member cut short by a crash; keep what was read
+                pass
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def record(self, request, response, elapsed):
+        text = _encode(response.content)
+        digest = hashlib.sha256(_decode(text)).hexdigest()
+        exchange = {
+            "key": request_key(request.method, request.url),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                name: response.headers[name]
+                for name in KEPT_HEADERS
+                if name in response.headers
+            },
+            "body": digest,
+            "elapsed_ms": round(elapsed * 1000, 1),
+        }
+        with self._lock:
+            if self._file is None:
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            if digest not in self.bodies:
+                self.bodies[digest] = None  # written; no need to keep it in memory
+                self._file.write(json.dumps({"body": digest, "text": text}) + "\n")
+            self._file.write(json.dumps(exchange) + "\n")
+            self.recorded += 1
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+    def lookup(self, request):
+        """The next recorded exchange for this request, or None"""
+        key = request_key(request.method, request.url)
+        with self._lock:
+            recorded = self.exchanges.get(key)
+            if not recorded:
+                self.misses += 1
+                return None
+            position = self.positions[key]
+            if position < len(recorded) - 1:
+                self.positions[key] += 1
+            self.replayed += 1
+            return recorded[position]
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+            "exchanges": sum(len(v) for v in self.exchanges.values()),
+            "bodies": len(self.bodies),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassetteAdapter(HTTPAdapter):
+    """HTTPAdapter that records to, or replays from, a Cassette"""
+
+    def __init__(self, cassette, replay_latency=False, **kwargs):
+        self.cassette = cassette
+        self.replay_latency = replay_latency
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == "replay":
+            return self._replay(request)
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        if self.cassette.mode == "record" and not kwargs.get("stream"):
+            # Read the body inside the timing; Session.send() only sets
+            # response.elapsed after this returns
+            response.content
+            elapsed = time.perf_counter() - start
+            self.cassette.record(request, response, elapsed)
+        return response
+
+    def _replay(self, request):
+        exchange = self.cassette.lookup(request)
+        if exchange is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {request_key(request.method, request.url)}",
+                request=request,
+            )
+        if self.replay_latency and exchange.get("elapsed_ms"):
+            time.sleep(exchange["elapsed_ms"] / 1000)
+
+        response = requests.Response()
+        response.status_code = exchange["status"]
+        response.reason = exchange.get("reason")
+        response.headers = CaseInsensitiveDict(exchange.get("headers") or {})
+        response._content = _decode(self.cassette.bodies.get(exchange["body"]) or "")
+        response.encoding = get_encoding_from_headers(response.headers) or "utf-8"
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(milliseconds=exchange.get("elapsed_ms") or 0)
+        return response
+
+    def __reduce__(self):
+        # Pickled sessions come back with a plain adapter, not a cassette
+        return (
+            HTTPAdapter,
+            (self._pool_connections, self._pool_maxsize, self.max_retries, self._pool_block),
+        )
+
+
+def mount_cassette(session, cassette, **adapter_kwargs):
+    """Mount a CassetteAdapter for http:// and https:// on `session`"""
+    adapter = CassetteAdapter(cassette, **adapter_kwargs)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a recorded HTTP cassette")
+    parser.add_argument("cassette")
+    args = parser.parse_args()
+
+    cassette = Cassette(args.cassette, mode="replay")
+    statuses = Counter()
+    handlers = Counter()
+    for key, exchanges in cassette.exchanges.items():
+        handler = dict(parse_qsl(urlsplit(key.split(" ", 1)[1]).query)).get("handler", "-")
+        for exchange in exchanges:
+            statuses[exchange["status"]] += 1
+            handlers[handler] += 1
+    size = os.path.getsize(args.cassette)
+    print(f"{args.cassette}: {size / 1024:.0f}KB")
+    print(f"  {sum(statuses.values())} exchanges, {len(cassette.exchanges)} distinct requests, "
+          f"{len(cassette.bodies)} distinct bodies")
+    print(f"  handlers: {', '.join(f'{h} {n}' for h, n in handlers.most_common())}")
+    print(f"  statuses: {', '.join(f'{s} {n}' for s, n in sorted(statuses.items()))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
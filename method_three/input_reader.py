@@ -0,0 +1,121 @@
+"""
+Streaming reader for the employer input file.
+
+Rows are yielded one at a time instead of being collected into a list, so
+memory use does not grow with the size of the input. The input can be a
+CSV or an XLSX workbook as the upstream lists arrive (read through
+openpyxl's read-only mode, which streams rows off the sheet).
+"""
+import csv
+import os
+from datetime import date, datetime
+
+# Input column -> employer dict key
+INPUT_COLUMNS = {
+    "Bureau Number": "bureau_number",
+    "Employer Name": "employer_name",
+    "Zip Code": "zip_code",
+    "Coverage Date": "coverage_date",
+}
+
+
+def normalize_header(name):
+    """Strip whitespace and any BOM from a column header"""
+    return (name or "").strip().replace("\ufeff", "")
+
+
+def sniff_delimiter(file_path, sample_size=1024):
+    """Detect the CSV delimiter from the start of the file"""
+    with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
+        return csv.Sniffer().sniff(csvfile.read(sample_size)).delimiter
+
+
+def iter_input_csv(file_path, delimiter=None):
+    """Yield one employer dict per CSV row.
+
+    The delimiter is sniffed once and the headers are normalized once, not
+    per row. Missing columns come through as empty strings.
+    """
+    if delimiter is None:
+        delimiter = sniff_delimiter(file_path)
+
+    with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile, delimiter=delimiter)
+        headers = [normalize_header(name) for name in next(reader, [])]
+        positions = [
+            (key, headers.index(column) if column in headers else None)
+            for column, key in INPUT_COLUMNS.items()
+        ]
+
+        for row in reader:
+            if not row:
+                continue
+            yield {
+                key: row[index].strip() if index is not None and index < len(row) else ""
+                for key, index in positions
+            }
+
+
+# ==========================================================
+# XLSX INPUT
+# ==========================================================
+SPREADSHEET_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+def is_spreadsheet(file_path):
+    return os.path.splitext(file_path)[1].lower() in SPREADSHEET_EXTENSIONS
+
+
+def cell_text(value):
+    """A cell value as the text a CSV export of it would hold"""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return f"{value.month}/{value.day}/{value.year}"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def iter_input_xlsx(file_path, sheet_name=None):
+    """Yield one employer dict per row of the first (or named) sheet.
+
+    Headers are mapped the same way as iter_input_csv(). A blank Coverage
+    Date repeats the one above it, since the sheets only fill it in where
+    it changes.
+    """
+    # openpyxl is only needed for spreadsheet input
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        headers = [normalize_header(cell_text(name)) for name in next(rows, ())]
+        positions = [
+            (key, headers.index(column) if column in headers else None)
+            for column, key in INPUT_COLUMNS.items()
+        ]
+
+        coverage_date = ""
+        for row in rows:
+            if not any(value is not None and value != "" for value in row):
+                continue
+            employer = {
+                key: cell_text(row[index]) if index is not None and index < len(row) else ""
+                for key, index in positions
+            }
+            if employer["coverage_date"]:
+                coverage_date = employer["coverage_date"]
+            else:
+                employer["coverage_date"] = coverage_date
+            yield employer
+    finally:
+        workbook.close()
+
+
+def iter_input(file_path, delimiter=None):
+    """Yield employer dicts from a CSV or XLSX input, picked by extension"""
+    if is_spreadsheet(file_path):
+        return iter_input_xlsx(file_path)
+    return iter_input_csv(file_path, delimiter)
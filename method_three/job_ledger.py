@@ -0,0 +1,303 @@
+"""
+Local, file-backed job ledger for the distributed runner.
+
+A drop-in for the Firebase /jobs tree when every worker runs on one machine
+(or shares one filesystem). Jobs live in a SQLite database in WAL mode:
+  - partial indexes on the pending jobs' seq and the in-progress jobs'
+    lease_until, so claiming the next job is one indexed lookup instead of
+    downloading and shuffling the whole tree
+  - claim() is atomic across threads and processes (BEGIN IMMEDIATE) and
+    gives the worker a lease; an in-progress job whose lease ran out is
+    handed to the next claimer, the same as a stale Firebase claim
+  - import_csv() loads the input CSV in one transaction and skips bureau
+    numbers that are already in the ledger, so it can be re-run
+  - per-status counters are kept by triggers, so pending/done counts are a
+    single-row read however many jobs there are
+
+Job dicts have the same fields the Firebase job nodes have.
+
+Usage:
+  python job_ledger.py --import input_fast.csv
+  python job_ledger.py                       # status counts
+  python job_ledger.py --retry-failed
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from threading import Lock
+
+from input_reader import iter_input
+
+STATUSES = ("pending", "in-progress", "done", "failed")
+
+JOB_FIELDS = (
+    "bureau_number",
+    "employer_name",
+    "zip_code",
+    "coverage_date",
+    "status",
+    "created_at",
+    "worker_id",
+    "claimed_at",
+    "reclaimed_count",
+    "completed_at",
+    "failed_at",
+    "error",
+    "result",
+)
+
+
+def _now_iso():
+    return datetime.utcnow().isoformat()
+
+
+class JobLedger:
+    """SQLite job table with a status index, leased claims and status counters"""
+
+    def __init__(self, path, lease_seconds=60 * 60):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._lock = Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                bureau_number TEXT PRIMARY KEY,
+                employer_name TEXT NOT NULL,
+                zip_code TEXT NOT NULL,
+                coverage_date TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                created_at TEXT NOT NULL,
+                worker_id TEXT,
+                claimed_at TEXT,
+                lease_until REAL NOT NULL DEFAULT 0,
+                reclaimed_count INTEGER NOT NULL DEFAULT 0,
+                completed_at TEXT,
+                failed_at TEXT,
+                error TEXT,
+                result TEXT,
+                seq INTEGER
+            );
+            -- Ledgers created before the partial indexes; it can't serve ORDER BY seq
+            DROP INDEX IF EXISTS jobs_status;
+            CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (seq) WHERE status = 'pending';
+            CREATE INDEX IF NOT EXISTS jobs_leased ON jobs (lease_until) WHERE status = 'in-progress';
+
+            CREATE TABLE IF NOT EXISTS job_counts (
+                status TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO job_counts VALUES
+                ('pending', 0), ('in-progress', 0), ('done', 0), ('failed', 0);
+
+            CREATE TRIGGER IF NOT EXISTS jobs_counted_insert AFTER INSERT ON jobs
+            BEGIN
+                UPDATE job_counts SET count = count + 1 WHERE status = NEW.status;
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_counted_update
+            AFTER UPDATE OF status ON jobs WHEN OLD.status != NEW.status
+            BEGIN
+                UPDATE job_counts SET count = count - 1 WHERE status = OLD.status;
+                UPDATE job_counts SET count = count + 1 WHERE status = NEW.status;
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_counted_delete AFTER DELETE ON jobs
+            BEGIN
+                UPDATE job_counts SET count = count - 1 WHERE status = OLD.status;
+            END;
+            """
+        )
+
+    def _row_to_job(self, row):
+        job = dict(zip(JOB_FIELDS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def get(self, bureau_number):
+        """The job dict for one bureau number, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE bureau_number = ?",
+                (bureau_number,),
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
+    def import_employers(self, employers):
+        """Add a pending job per employer; existing bureau numbers are left alone.
+
+        Returns the number of new jobs.
+        """
+        created_at = _now_iso()
+        total = "SELECT SUM(count) FROM job_counts"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.execute(total).fetchone()[0]
+                seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM jobs").fetchone()[0]
+                rows = (
+                    (
+                        employer["bureau_number"],
+                        employer["employer_name"],
+                        employer["zip_code"],
+                        employer["coverage_date"],
+                        created_at,
+                        seq + position,
+                    )
+                    for position, employer in enumerate(employers, 1)
+                    if employer["bureau_number"]
+                )
+                self._conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO jobs
+                        (bureau_number, employer_name, zip_code, coverage_date, created_at, seq)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                added = self._conn.execute(total).fetchone()[0] - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def import_csv(self, csv_path):
+        return self.import_employers(iter_input(csv_path))
+
+    # ------------------------------------------------------------------
+    # Claims
+    # ------------------------------------------------------------------
+    def claim(self, worker_id, lease_seconds=None):
+        """Atomically claim the next pending job, or an expired lease.
+
+        Returns (bureau_number, job) or (None, None) when nothing is claimable.
+        """
+        lease_seconds = self.lease_seconds if lease_seconds is None else lease_seconds
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT bureau_number, status FROM jobs "
+                    "WHERE status = 'pending' ORDER BY seq LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    row = self._conn.execute(
+                        "SELECT bureau_number, status FROM jobs "
+                        "WHERE status = 'in-progress' AND lease_until < ? "
+                        "ORDER BY lease_until LIMIT 1",
+                        (now,),
+                    ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None, None
+
+                bureau_number, status = row
+                self._conn.execute(
+                    """
+                    UPDATE jobs SET status = 'in-progress', worker_id = ?, claimed_at = ?,
+                        lease_until = ?, reclaimed_count = reclaimed_count + ?
+                    WHERE bureau_number = ?
+                    """,
+                    (
+                        worker_id,
+                        _now_iso(),
+                        now + lease_seconds,
+                        int(status == "in-progress"),
+                        bureau_number,
+                    ),
+                )
+                job = self._conn.execute(
+                    f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE bureau_number = ?",
+                    (bureau_number,),
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bureau_number, self._row_to_job(job)
+
+    def renew(self, bureau_number, worker_id, lease_seconds=None):
+        """Extend a held lease; returns False if the job is no longer this worker's"""
+        lease_seconds = self.lease_seconds if lease_seconds is None else lease_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? "
+                "WHERE bureau_number = ? AND worker_id = ? AND status = 'in-progress'",
+                (time.time() + lease_seconds, bureau_number, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def mark_done(self, bureau_number, result):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, completed_at = ?, lease_until = 0 "
+                "WHERE bureau_number = ?",
+                (json.dumps(result), _now_iso(), bureau_number),
+            )
+
+    def mark_failed(self, bureau_number, error_message):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, failed_at = ?, lease_until = 0 "
+                "WHERE bureau_number = ?",
+                (error_message, _now_iso(), bureau_number),
+            )
+
+    def retry_failed(self):
+        """Put every failed job back to pending; returns how many"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', worker_id = NULL, claimed_at = NULL "
+                "WHERE status = 'failed'"
+            )
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------------
+    def counts(self):
+        """Jobs per status, read from the trigger-maintained counters"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, count FROM job_counts").fetchall())
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT count FROM job_counts WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or load the local job ledger")
+    parser.add_argument("--ledger", default="jobs_fast_1.sqlite3")
+    parser.add_argument("--import", dest="import_csv", metavar="CSV", help="add pending jobs from an input CSV")
+    parser.add_argument("--retry-failed", action="store_true", help="put failed jobs back to pending")
+    args = parser.parse_args()
+
+    ledger = JobLedger(args.ledger)
+    if args.import_csv:
+        print(f"Imported {ledger.import_csv(args.import_csv)} new jobs from {args.import_csv}")
+    if args.retry_failed:
+        print(f"Requeued {ledger.retry_failed()} failed jobs")
+    counts = ledger.counts()
+    print(f"{args.ledger}: " + ", ".join(f"{status} {counts.get(status, 0)}" for status in STATUSES))
+    ledger.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Deferred imports for heavy dependencies.
+
+lazy_module("pyautogui") returns a stand-in that imports the real module
+the first time one of its attributes is read. lazy_attribute("seleniumbase",
+"Driver") does the same for a name imported from a module, and forwards
+calls as well. Modules that need a display (pyautogui, pynput) or take
+seconds to import (selenium, seleniumbase, the Google API client) are then
+loaded only by the code paths that use them, and commands that never touch
+the browser or Gmail start without them.
+
+Import errors surface at first use instead of at import time.
+"""
+import importlib
+
+
+class _LazyModule:
+    """Module stand-in; imports the module on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+class _LazyAttribute:
+    """Stand-in for `from module import name`; resolved on first use"""
+
+    def __init__(self, module_name, attr):
+        self._module_name = module_name
+        self._attr = attr
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            module = importlib.import_module(self._module_name)
+            self._target = getattr(module, self._attr)
+        return self._target
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<lazy {self._module_name}.{self._attr}>"
+
+
+def lazy_module(name):
+    return _LazyModule(name)
+
+
+def lazy_attribute(module_name, attr):
+    return _LazyAttribute(module_name, attr)
@@ -0,0 +1,323 @@
+"""
+Run report from the request log and the execution log.
+
+Streams both logs in timestamp order and reports, overall and per time
+window:
+  - p50/p95/p99 latency per request type (SEARCH, DETAILS), from the
+    "elapsed_ms" that log_request_response() records
+  - status code mix and analyze_error() category mix of failed requests
+  - employers/minute, from the "Progress: Completed N/M" lines, and
+    lookups/minute, from process_employer()'s completion lines
+  - for fast_main.py runs, both from its "Progress: N done - Bureau #a, #b:
+    K records" lines (one lookup per line, one employer per bureau number)
+
+Memory stays constant however large the logs are: each window is printed
+and dropped as soon as the next one starts, and latencies are counted in
+fixed log-scale buckets (about 2% wide) instead of being kept, so the
+percentiles are approximate to that resolution.
+
+Entries written before "elapsed_ms" / "error_type" were logged have no
+latency; their error category is recovered from the saved page when there
+is one.
+
+fast_main.py writes no request log and logs only to the console, so its
+report has throughput but no latency or status sections; capture the
+console and pass it with an empty --requests.
+
+Usage:
+  python log_report.py                                  # default log files
+  python log_report.py --window 5
+  python log_report.py --requests request_logs_1.jsonl other_run.jsonl.gz \\
+                       --execution-log debug_logs/execution_log.txt
+  python fast_main.py | tee fast_run.log
+  python log_report.py --requests --execution-log fast_run.log
+"""
+import argparse
+import glob
+import heapq
+import math
+import os
+import re
+import sys
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+
+from debug_store import DebugPageStore
+from request_log import iter_log_files
+from response_classifier import classify_response
+
+# scraper.py's request log for the same SCRAPER_INSTANCE
+DEFAULT_REQUEST_LOG = f"request_logs_{os.environ.get('SCRAPER_INSTANCE', '1')}.jsonl"
+DEFAULT_EXECUTION_LOG = os.path.join("debug_logs", "execution_log.txt")
+DEFAULT_PAGES_DIR = os.path.join("debug_logs", "pages")
+
+BUCKETS_PER_E = 50  # bucket width exp(1/50) ~ 2%
+PERCENTILES = (50, 95, 99)
+
+# 2025-12-05 00:57:50 ✅ [SUCCESS] Processing: Completed processing for X: 1 results
+EXECUTION_LINE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \S* ?\[(\w+)\] ([^:]+): (.*)$"
+)
+PROGRESS_MESSAGE = re.compile(r"^Completed (\d+)/(\d+)")
+# fast_main.py: "Progress: 12 done - Bureau #1, #2: 3 records"; failed
+# groups end in "failed: <error>" and count as neither
+FAST_PROGRESS_MESSAGE = re.compile(r"^Progress: \d+ done - Bureau (.*): \d+ records$")
+LOOKUP_MESSAGES = ("Completed processing for ", "No results found for ")
+
+
+class LatencyHistogram:
+    """Log-bucketed latency counts with approximate percentiles"""
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+
+    def add(self, ms):
+        self.buckets[round(math.log(max(ms, 0.1)) * BUCKETS_PER_E)] += 1
+        self.count += 1
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return math.exp(bucket / BUCKETS_PER_E)
+        return None
+
+
+class Stats:
+    """Counters for one window, or for the whole run"""
+
+    def __init__(self, start=None):
+        self.start = start
+        self.requests = Counter()
+        self.latency = {}
+        self.statuses = Counter()
+        self.error_types = Counter()
+        self.employers = 0
+        self.lookups = 0
+
+    def add_request(self, entry, error_type):
+        request_type = entry.get("type") or "UNKNOWN"
+        self.requests[request_type] += 1
+        elapsed = entry.get("elapsed_ms")
+        if elapsed is not None:
+            self.latency.setdefault(request_type, LatencyHistogram()).add(elapsed)
+        status = entry.get("status_code")
+        self.statuses[str(status) if status is not None else "error"] += 1
+        if error_type:
+            self.error_types[error_type] += 1
+
+
+def iter_request_entries(paths):
+    """Yield (time, entry) for every request log entry, in file order"""
+    for entry in iter_log_files(paths):
+        try:
+            yield datetime.fromisoformat(entry["timestamp"]), 0, entry
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+def iter_execution_lines(paths):
+    """Yield (time, (step, status, message)) for every execution log line"""
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = EXECUTION_LINE.match(line.rstrip("\n"))
+                if not match:
+                    continue
+                timestamp, status, step, message = match.groups()
+                yield datetime.fromisoformat(timestamp), 1, (step, status, message)
+
+
+def request_log_files(path):
+    """The rotated .jsonl.gz segments of a request log, oldest first, then the log"""
+    stem = path[: -len(".jsonl")] if path.endswith(".jsonl") else path
+    return sorted(glob.glob(f"{glob.escape(stem)}.*.jsonl.gz")) + [path]
+
+
+def execution_log_files(path):
+    """BufferedLog's rotated files (.N is oldest), then the live log"""
+    rotated = []
+    for candidate in glob.glob(f"{glob.escape(path)}.*"):
+        suffix = candidate[len(path) + 1:]
+        if suffix.isdigit():
+            rotated.append((int(suffix), candidate))
+    return [candidate for _, candidate in sorted(rotated, reverse=True)] + [path]
+
+
+def make_error_classifier(pages_dir):
+    """error_type for a failed request: logged, else from its saved page"""
+    store = DebugPageStore(pages_dir)
+    legacy_dir = os.path.dirname(pages_dir.rstrip(os.sep)) or "."
+
+    @lru_cache(maxsize=1024)
+    def classify_page(digest, filename):
+        page = store.get_for_request(
+            {"response_hash": digest, "response_file": filename}, legacy_dir
+        )
+        return classify_response(page)["error_type"] if page else "UNCLASSIFIED"
+
+    def error_type(entry):
+        if entry.get("status_code") == 200 and not entry.get("error"):
+            return None
+        if entry.get("error_type"):
+            return entry["error_type"]
+        if entry.get("response_hash") or entry.get("response_file"):
+            return classify_page(entry.get("response_hash"), entry.get("response_file"))
+        return "UNCLASSIFIED"
+
+    return error_type
+
+
+def format_ms(ms):
+    return "-" if ms is None else f"{ms:,.0f}ms"
+
+
+def format_latency(stats, request_type):
+    histogram = stats.latency.get(request_type)
+    if not histogram:
+        return "no timings"
+    return " ".join(
+        f"p{p}={format_ms(histogram.percentile(p))}" for p in PERCENTILES
+    )
+
+
+def format_mix(counter, limit=6):
+    return ", ".join(f"{key} {count}" for key, count in counter.most_common(limit)) or "-"
+
+
+def print_window(stats, minutes):
+    total = sum(stats.requests.values())
+    print(
+        f"{stats.start:%Y-%m-%d %H:%M}  "
+        f"{stats.employers / minutes:6.1f} employers/min  "
+        f"{stats.lookups / minutes:6.1f} lookups/min  "
+        f"{total:5d} requests"
+    )
+    for request_type in sorted(stats.requests):
+        print(
+            f"    {request_type:<8} {stats.requests[request_type]:5d}  "
+            f"{format_latency(stats, request_type)}"
+        )
+    print(f"    status   {format_mix(stats.statuses)}")
+    if stats.error_types:
+        print(f"    errors   {format_mix(stats.error_types)}")
+
+
+def print_summary(stats, first, last):
+    total = sum(stats.requests.values())
+    minutes = max((last - first).total_seconds() / 60, 1 / 60) if first else 0
+    print("=" * 72)
+    print(f"Run summary: {first} -> {last}" if first else "Run summary: no entries")
+    if not first:
+        return
+    print(
+        f"  {stats.employers} employers, {stats.lookups} lookups, {total} requests "
+        f"over {minutes:,.1f} min ({stats.employers / minutes:.1f} employers/min)"
+    )
+    for request_type in sorted(stats.requests):
+        timed = stats.latency.get(request_type)
+        print(
+            f"  {request_type:<8} {stats.requests[request_type]:6d} requests  "
+            f"{format_latency(stats, request_type)}"
+            + (f"  ({timed.count} timed)" if timed else "")
+        )
+    print(f"  status   {format_mix(stats.statuses, limit=None)}")
+    print(f"  errors   {format_mix(stats.error_types, limit=None)}")
+
+
+def report(request_paths, execution_paths, window_minutes, pages_dir):
+    """Stream both logs once and print per-window lines and a summary"""
+    error_type = make_error_classifier(pages_dir)
+    window_seconds = window_minutes * 60
+    overall = Stats()
+    window = None
+    first = last = None
+    last_completed = 0
+
+    events = heapq.merge(
+        iter_request_entries(request_paths),
+        iter_execution_lines(execution_paths),
+        key=lambda event: event[:2],
+    )
+    for when, source, item in events:
+        key = int(when.timestamp() // window_seconds)
+        if window is None or key > window[0]:
+            if window is not None:
+                print_window(window[1], window_minutes)
+            window = (key, Stats(datetime.fromtimestamp(key * window_seconds)))
+        # Slightly out-of-order lines from concurrent writers stay in the
+        # open window rather than reopening a closed one
+        stats = window[1]
+        first = first or when
+        last = max(last or when, when)
+
+        if source == 0:
+            kind = error_type(item)
+            stats.add_request(item, kind)
+            overall.add_request(item, kind)
+            continue
+
+        step, status, message = item
+        if step == "Progress":
+            match = PROGRESS_MESSAGE.match(message)
+            if match:
+                completed = int(match.group(1))
+                # The counter restarts from zero with each run
+                delta = completed - last_completed if completed >= last_completed else completed
+                last_completed = completed
+                stats.employers += delta
+                overall.employers += delta
+        elif step == "Processing" and message.startswith(LOOKUP_MESSAGES):
+            stats.lookups += 1
+            overall.lookups += 1
+        elif step == "Concurrent Processing":
+            match = FAST_PROGRESS_MESSAGE.match(message)
+            if match:
+                employers = match.group(1).count("#")
+                stats.employers += employers
+                overall.employers += employers
+                stats.lookups += 1
+                overall.lookups += 1
+
+    if window is not None:
+        print_window(window[1], window_minutes)
+    print_summary(overall, first, last)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, status and throughput report from the run logs")
+    parser.add_argument(
+        "--requests", nargs="*",
+        help=f"request log files (default: {DEFAULT_REQUEST_LOG} and its rotated segments; "
+        "none for a fast_main.py run)",
+    )
+    parser.add_argument(
+        "--execution-log", nargs="+",
+        help=f"execution log files (default: {DEFAULT_EXECUTION_LOG} and its rotated files)",
+    )
+    parser.add_argument("--window", type=float, default=15, help="window length in minutes")
+    parser.add_argument("--pages", default=DEFAULT_PAGES_DIR, help="debug page store, to classify old entries")
+    args = parser.parse_args()
+
+    if args.window <= 0:
+        parser.error("--window must be positive")
+
+    if args.requests is None:
+        request_paths = request_log_files(DEFAULT_REQUEST_LOG)
+    else:
+        request_paths = args.requests
+    execution_paths = args.execution_log or execution_log_files(DEFAULT_EXECUTION_LOG)
+    report(request_paths, execution_paths, args.window, args.pages)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
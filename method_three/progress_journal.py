@@ -0,0 +1,232 @@
+"""
+Write-ahead progress journal.
+
+Each completed bureau number is one appended, fsync'd JSON line holding the
+rows found for it, so recording progress costs the same for the first employer
+as for the fifteen-thousandth. The journal is periodically folded into a
+compacted snapshot file; resuming reads the snapshot once and replays the
+journal tail on top of it.
+"""
+import json
+import os
+from collections import Counter, defaultdict
+from threading import Lock
+
+from result_record import ResultRecord
+
+
+class Progress(dict):
+    """The {"completed": [...], "results": [...]} progress dict plus indexes.
+
+    Serializes like the plain dict it replaces (with json.dump(...,
+    default=result_record.to_json)), but also keeps a set of completed bureau
+    numbers and per-status result counts, so membership checks are O(1)
+    instead of a scan of the completed list. Result rows are held as compact
+    ResultRecords.
+    """
+
+    def __init__(self, completed=(), results=()):
+        super().__init__(completed=[], results=[])
+        self.completed_index = set()
+        self.status_counts = Counter()
+        for bureau_number in completed:
+            if bureau_number not in self.completed_index:
+                self.completed_index.add(bureau_number)
+                self["completed"].append(bureau_number)
+        self._add_results(results)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("completed", []), data.get("results", []))
+
+    def _add_results(self, results):
+        records = [ResultRecord.from_dict(result) for result in results]
+        self["results"].extend(records)
+        self.status_counts.update(r.get("lookup_status", "") for r in records)
+
+    def is_completed(self, bureau_number):
+        return bureau_number in self.completed_index
+
+    def mark_completed(self, bureau_number, results):
+        """Record a finished bureau number; returns False if it was already done"""
+        if bureau_number in self.completed_index:
+            return False
+        self.completed_index.add(bureau_number)
+        self["completed"].append(bureau_number)
+        self._add_results(results)
+        return True
+
+    def pending(self, employers):
+        """Yield the employers whose bureau number is not completed yet"""
+        completed_index = self.completed_index
+        for employer in employers:
+            if employer["bureau_number"] not in completed_index:
+                yield employer
+
+
+class ProgressJournal:
+    """Snapshot + append-only journal of completed bureau numbers"""
+
+    def __init__(self, snapshot_file, journal_file, legacy_file=None, compact_min=500):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.legacy_file = legacy_file
+        self.compact_min = compact_min
+        self.snapshot_records = 0
+        self.tail_records = 0
+        self._journal = None
+        self._lock = Lock()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _read_records(path):
+        """Yield journal records from a JSONL file, skipping a torn last line"""
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # Crash in the middle of an append; the record never committed
+                    break
+                yield json.loads(line)
+
+    def iter_records(self):
+        """Yield each completed bureau's record once, snapshot first then tail"""
+        seen = set()
+        for path in (self.snapshot_file, self.journal_file):
+            for record in self._read_records(path):
+                if record["bureau_number"] in seen:
+                    continue
+                seen.add(record["bureau_number"])
+                yield record
+
+    def migrate(self):
+        """Convert the legacy JSON file into a snapshot, if that hasn't happened yet"""
+        with self._lock:
+            if self._needs_migration():
+                self._migrate_legacy()
+
+    def load(self):
+        """Rebuild the Progress object from the snapshot and journal tail"""
+        with self._lock:
+            if self._needs_migration():
+                self._migrate_legacy()
+
+            progress = Progress()
+            self.snapshot_records = 0
+            self.tail_records = 0
+            for path in (self.snapshot_file, self.journal_file):
+                for record in self._read_records(path):
+                    if not progress.mark_completed(record["bureau_number"], record["results"]):
+                        continue
+                    if path == self.snapshot_file:
+                        self.snapshot_records += 1
+                    else:
+                        self.tail_records += 1
+            return progress
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def record(self, progress, bureau_number, results):
+        """Append one completed bureau number to the journal and to `progress`.
+
+        Returns False without writing anything if it was already completed.
+        """
+        line = json.dumps(
+            {"bureau_number": bureau_number, "results": results},
+            ensure_ascii=False,
+        )
+        with self._lock:
+            if progress.is_completed(bureau_number):
+                return False
+            if self._journal is None:
+                self._journal = self._open_journal()
+            self._journal.write(line + "\n")
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            progress.mark_completed(bureau_number, results)
+            self.tail_records += 1
+
+            # Geometric threshold keeps compaction amortized O(1) per record
+            if self.tail_records >= max(self.compact_min, self.snapshot_records):
+                self._compact()
+            return True
+
+    def _open_journal(self):
+        """Open the journal for appending, dropping a torn last line first"""
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, "r+b") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        return open(self.journal_file, "a", encoding="utf-8")
+
+    def compact(self):
+        """Fold the journal tail into a fresh snapshot"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        tmp_file = f"{self.snapshot_file}.tmp"
+        count = 0
+        with open(tmp_file, "w", encoding="utf-8") as out:
+            for record in self.iter_records():
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+        # A crash before this truncate only leaves duplicates, which replay skips
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_file, "w", encoding="utf-8").close()
+
+        self.snapshot_records = count
+        self.tail_records = 0
+
+    # ------------------------------------------------------------------
+    # Legacy progress_tracker JSON
+    # ------------------------------------------------------------------
+    def _needs_migration(self):
+        return (
+            self.legacy_file
+            and os.path.exists(self.legacy_file)
+            and not os.path.exists(self.snapshot_file)
+            and not os.path.exists(self.journal_file)
+        )
+
+    def _migrate_legacy(self):
+        """Convert a full {"completed", "results"} JSON file into a snapshot"""
+        with open(self.legacy_file, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+
+        results_by_bureau = defaultdict(list)
+        for result in legacy.get("results", []):
+            results_by_bureau[result["bureau_number"]].append(result)
+
+        bureau_numbers = list(dict.fromkeys(legacy.get("completed", [])))
+        completed = set(bureau_numbers)
+        bureau_numbers += [b for b in results_by_bureau if b not in completed]
+
+        tmp_file = f"{self.snapshot_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as out:
+            for bureau_number in bureau_numbers:
+                record = {
+                    "bureau_number": bureau_number,
+                    "results": results_by_bureau.pop(bureau_number, []),
+                }
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
@@ -0,0 +1,460 @@
+"""
+Rotating, indexed request log.
+
+Entries are appended as JSON lines to an active file. When it passes a size
+or age limit it is rotated into a gzip segment made of independent members
+of about `block_bytes` each, so any entry can be read back by seeking to its
+member and decompressing only that block. A SQLite sidecar index maps
+bureau number, session id and timestamp to (segment, offset, position):
+  - active file: offset is the line's byte offset, position is 0
+  - gzip segment: offset is the member's byte offset, position is the
+    line's offset inside the decompressed member
+Writes are flushed and indexed in batches of `batch_entries` (or after
+`batch_seconds`); lines a crash leaves unindexed are picked up on the next
+open, and an active file left behind by a rotation that was interrupted
+before its removal is recognized against the last segment and dropped.
+
+Usage:
+  python request_log.py --bureau 42
+  python request_log.py --session 140234 --since 2025-12-05T04:00 --until 2025-12-05T05:00
+  python request_log.py --rotate
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock, local
+
+_context = local()
+
+
+@contextmanager
+def bureau_context(bureau_numbers):
+    """Tag requests made by this thread with the bureau numbers being processed"""
+    previous = getattr(_context, "bureau_numbers", None)
+    _context.bureau_numbers = [str(b) for b in bureau_numbers]
+    try:
+        yield
+    finally:
+        _context.bureau_numbers = previous
+
+
+def current_bureau_numbers():
+    """Bureau numbers set by the innermost bureau_context() on this thread, or None"""
+    return getattr(_context, "bureau_numbers", None)
+
+
+class RequestLog:
+    """Append-only JSONL request log with rotation and a lookup index"""
+
+    def __init__(
+        self,
+        path,
+        max_bytes=64 * 1024 * 1024,
+        max_age_seconds=24 * 3600,
+        block_bytes=256 * 1024,
+        index_path=None,
+        batch_entries=64,
+        batch_seconds=1.0,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.block_bytes = block_bytes
+        self.batch_entries = batch_entries
+        self.batch_seconds = batch_seconds
+        stem = path[: -len(".jsonl")] if path.endswith(".jsonl") else path
+        self.stem = stem
+        self.index_path = index_path or f"{stem}.index.sqlite3"
+        self._lock = Lock()
+        self._file = None
+        self._pending_rows = []
+        self._pending_entries = 0
+        self._last_flush = time.monotonic()
+
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                file TEXT NOT NULL UNIQUE,
+                compressed INTEGER NOT NULL,
+                started_at REAL NOT NULL,
+                source_bytes INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                segment_id INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                bureau_number TEXT,
+                session_id TEXT,
+                timestamp TEXT
+            );
+            -- A coalesced search serves several bureau numbers, so one
+            -- logged entry can have several rows here
+            CREATE INDEX IF NOT EXISTS entries_bureau ON entries (bureau_number);
+            CREATE INDEX IF NOT EXISTS entries_session ON entries (session_id);
+            CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+            CREATE INDEX IF NOT EXISTS entries_location ON entries (segment_id, offset);
+            """
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(segments)")]
+        if "source_bytes" not in columns:
+            # Index files written before rotations recorded their size
+            with self._db:
+                self._db.execute("ALTER TABLE segments ADD COLUMN source_bytes INTEGER")
+        self._active_id, self._started_at = self._active_segment()
+        self._finish_rotation()
+        self._catch_up()
+
+    # ------------------------------------------------------------------
+    # Index bookkeeping
+    # ------------------------------------------------------------------
+    def _active_segment(self):
+        row = self._db.execute(
+            "SELECT id, started_at FROM segments WHERE file = ? AND compressed = 0",
+            (os.path.basename(self.path),),
+        ).fetchone()
+        if row:
+            return row
+        started_at = time.time()
+        if os.path.exists(self.path):
+            started_at = os.path.getmtime(self.path)
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO segments (file, compressed, started_at) VALUES (?, 0, ?)",
+                (os.path.basename(self.path), started_at),
+            )
+        return cursor.lastrowid, started_at
+
+    def _finish_rotation(self):
+        """Remove an active file already rotated into the last segment.
+
+        _rotate() commits the segment before removing the active file, so a
+        crash in between leaves the old lines in place with nothing indexed
+        against the active segment. That file has the size the last segment
+        was made from and starts with the same line.
+        """
+        if not os.path.exists(self.path):
+            return
+        if self._db.execute(
+            "SELECT 1 FROM entries WHERE segment_id = ? LIMIT 1", (self._active_id,)
+        ).fetchone():
+            return
+        row = self._db.execute(
+            "SELECT file, source_bytes FROM segments WHERE compressed = 1 ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is None or row[1] != os.path.getsize(self.path):
+            return
+        try:
+            first_block = _read_member(os.path.join(os.path.dirname(self.path), row[0]), 0)
+        except (OSError, EOFError, zlib.error):
+            return
+        with open(self.path, "rb") as f:
+            first_line = f.readline()
+        if first_line and first_block.startswith(first_line):
+            os.remove(self.path)
+
+    def _catch_up(self):
+        """Index lines of the active file written without an index (old runs, crashes)"""
+        if not os.path.exists(self.path):
+            return
+        (last,) = self._db.execute(
+            "SELECT MAX(offset) FROM entries WHERE segment_id = ?", (self._active_id,)
+        ).fetchone()
+        rows = []
+        with open(self.path, "rb") as f:
+            if last is not None:
+                f.seek(last)
+                f.readline()
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    if line:
+                        # Torn final line from a crash; drop it
+                        with open(self.path, "r+b") as out:
+                            out.truncate(offset)
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                rows.extend(self._index_rows(entry, self._active_id, offset, 0))
+        if rows:
+            with self._db:
+                self._db.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    @staticmethod
+    def _index_rows(entry, segment_id, offset, position):
+        bureaus = entry.get("bureau_numbers") or [entry.get("bureau_number")]
+        session = entry.get("session_id")
+        session = str(session) if session is not None else None
+        return [
+            (
+                segment_id,
+                offset,
+                position,
+                str(bureau) if bureau not in (None, "") else None,
+                session,
+                entry.get("timestamp"),
+            )
+            for bureau in bureaus
+        ]
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def append(self, entry):
+        """Append one request log entry; it is indexed with the next batch"""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._should_rotate(len(line)):
+                self._rotate()
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(line)
+            self._pending_rows.extend(self._index_rows(entry, self._active_id, offset, 0))
+            self._pending_entries += 1
+            if (
+                self._pending_entries >= self.batch_entries
+                or time.monotonic() - self._last_flush >= self.batch_seconds
+            ):
+                self._flush()
+
+    def flush(self):
+        """Write out buffered lines and commit their index rows"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        # Lines reach the file before their rows are committed, so a crash
+        # in between leaves lines _catch_up() can index, never dangling rows
+        if self._file is not None:
+            self._file.flush()
+        if self._pending_rows:
+            with self._db:
+                self._db.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", self._pending_rows)
+            self._pending_rows = []
+        self._pending_entries = 0
+        self._last_flush = time.monotonic()
+
+    def _should_rotate(self, incoming):
+        if self._file is not None:
+            size = self._file.tell()
+        elif os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+        else:
+            return False
+        if not size:
+            return False
+        if size + incoming > self.max_bytes:
+            return True
+        return self.max_age_seconds and time.time() - self._started_at > self.max_age_seconds
+
+    def rotate(self):
+        """Compress the active file into a new segment now"""
+        with self._lock:
+            self._flush()
+            if os.path.exists(self.path) and os.path.getsize(self.path):
+                self._rotate()
+
+    def _rotate(self):
+        self._flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        stamp = datetime.fromtimestamp(self._started_at).strftime("%Y%m%dT%H%M%S")
+        segment = f"{self.stem}.{stamp}.jsonl.gz"
+        suffix = 1
+        while os.path.exists(segment):
+            suffix += 1
+            segment = f"{self.stem}.{stamp}-{suffix}.jsonl.gz"
+
+        # Write the segment as independent gzip members of ~block_bytes each
+        moves = []
+        tmp_segment = f"{segment}.tmp"
+        with open(self.path, "rb") as src, open(tmp_segment, "wb") as out:
+            block = bytearray()
+            block_lines = []
+            line_offset = 0
+
+            def flush_block():
+                member_offset = out.tell()
+                out.write(gzip.compress(bytes(block), mtime=0))
+                for old_offset, position in block_lines:
+                    moves.append((member_offset, position, old_offset))
+                block.clear()
+                block_lines.clear()
+
+            for line in src:
+                if not line.endswith(b"\n"):
+                    break
+                block_lines.append((line_offset, len(block)))
+                block += line
+                line_offset += len(line)
+                if len(block) >= self.block_bytes:
+                    flush_block()
+            if block:
+                flush_block()
+            out.flush()
+            os.fsync(out.fileno())
+
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO segments (file, compressed, started_at, source_bytes) VALUES (?, 1, ?, ?)",
+                (os.path.basename(segment), self._started_at, line_offset),
+            )
+            segment_id = cursor.lastrowid
+            self._db.executemany(
+                "UPDATE entries SET segment_id = ?, offset = ?, position = ? "
+                "WHERE segment_id = ? AND offset = ?",
+                ((segment_id, offset, position, self._active_id, old) for offset, position, old in moves),
+            )
+            self._started_at = time.time()
+            self._db.execute(
+                "UPDATE segments SET started_at = ? WHERE id = ?",
+                (self._started_at, self._active_id),
+            )
+            os.replace(tmp_segment, segment)
+        os.remove(self.path)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def find(self, bureau_number=None, session_id=None, since=None, until=None):
+        """Yield logged entries matching every given filter, oldest first"""
+        clauses, args = [], []
+        if bureau_number is not None:
+            clauses.append("bureau_number = ?")
+            args.append(str(bureau_number))
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            args.append(str(session_id))
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            args.append(until)
+        where = " AND ".join(clauses) or "1"
+
+        with self._lock:
+            self._flush()
+            rows = self._db.execute(
+                "SELECT DISTINCT s.file, s.compressed, e.offset, e.position, e.timestamp, s.id "
+                "FROM entries e JOIN segments s ON s.id = e.segment_id "
+                f"WHERE {where} ORDER BY e.timestamp, s.id, e.offset, e.position",
+                args,
+            ).fetchall()
+
+        directory = os.path.dirname(self.path)
+        member_cache = {}
+        for file_name, compressed, offset, position, _, _ in rows:
+            path = os.path.join(directory, file_name)
+            if compressed:
+                key = (path, offset)
+                if key not in member_cache:
+                    member_cache.clear()
+                    member_cache[key] = _read_member(path, offset)
+                data = member_cache[key]
+                end = data.index(b"\n", position)
+                yield json.loads(data[position:end])
+            else:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    yield json.loads(f.readline())
+
+    def iter_entries(self):
+        """Yield every entry in every segment, in write order, by streaming"""
+        with self._lock:
+            self._flush()
+            segments = self._db.execute(
+                "SELECT file, compressed FROM segments ORDER BY compressed DESC, id"
+            ).fetchall()
+        yield from iter_log_files(
+            os.path.join(os.path.dirname(self.path), file_name) for file_name, _ in segments
+        )
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._db.close()
+
+
+def _read_member(path, offset):
+    """Decompress the single gzip member that starts at `offset`"""
+    decompressor = zlib.decompressobj(wbits=31)
+    chunks = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while not decompressor.eof:
+            chunk = f.read(64 * 1024)
+            if not chunk:
+                break
+            chunks.append(decompressor.decompress(chunk))
+    return b"".join(chunks)
+
+
+def iter_log_files(paths):
+    """Stream JSON entries from plain or gzip'd JSONL files, skipping bad lines"""
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up logged requests")
+    parser.add_argument(
+        "--log",
+        default=f"request_logs_{os.environ.get('SCRAPER_INSTANCE', '1')}.jsonl",
+        help="active request log file (default: the one of scraper instance $SCRAPER_INSTANCE)",
+    )
+    parser.add_argument("--bureau", help="bureau number")
+    parser.add_argument("--session", help="session id")
+    parser.add_argument("--since", help="earliest timestamp (ISO, inclusive)")
+    parser.add_argument("--until", help="latest timestamp (ISO, exclusive)")
+    parser.add_argument("--rotate", action="store_true", help="rotate the active file now")
+    args = parser.parse_args()
+
+    log = RequestLog(args.log)
+    try:
+        if args.rotate:
+            log.rotate()
+            print(f"Rotated {args.log}")
+            return 0
+        if not (args.bureau or args.session or args.since or args.until):
+            parser.print_usage()
+            return 1
+        count = 0
+        for entry in log.find(args.bureau, args.session, args.since, args.until):
+            print(json.dumps(entry, ensure_ascii=False))
+            count += 1
+        print(f"{count} matching requests", file=sys.stderr)
+        return 0
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
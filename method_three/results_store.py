@@ -0,0 +1,168 @@
+"""
+Append-only results sink.
+
+Every finished employer appends its result rows to a JSONL file and the byte
+offset of each row to a fixed-width index file. Both writes are fsync'd, so a
+finished job costs O(rows appended) no matter how many results came before.
+The final TSV/JSON outputs are written once, by streaming back out of the sink.
+"""
+import csv
+import json
+import os
+import struct
+from threading import Lock
+
+from result_record import to_json
+
+# (output column, result key) pairs for the final TSV
+OUTPUT_COLUMNS = [
+    ("Bureau Number", "bureau_number"),
+    ("Employer Name", "employer_name"),
+    ("Street Address", "street_address"),
+    ("City", "city"),
+    ("State", "state"),
+    ("Zip Code", "zip_code"),
+    ("Insurer Name", "insurer_name"),
+    ("LookupStatus", "lookup_status"),
+]
+
+_OFFSET = struct.Struct("<Q")
+
+
+def write_final_output(results, csv_file, json_file):
+    """Stream results into the tab-separated CSV and the JSON array outputs.
+
+    The JSON file is byte-for-byte what json.dump(results, indent=2) wrote,
+    but it is produced one record at a time so `results` can be any iterable.
+    Returns the number of records written.
+    """
+    count = 0
+    with open(csv_file, "w", newline="", encoding="utf-8") as csvfile, open(
+        json_file, "w", encoding="utf-8"
+    ) as jsonfile:
+        writer = csv.writer(csvfile, delimiter="\t")
+        writer.writerow([column for column, _ in OUTPUT_COLUMNS])
+
+        jsonfile.write("[")
+        for result in results:
+            writer.writerow([result[key] for _, key in OUTPUT_COLUMNS])
+
+            body = json.dumps(result, indent=2, ensure_ascii=False, default=to_json)
+            jsonfile.write(",\n  " if count else "\n  ")
+            jsonfile.write(body.replace("\n", "\n  "))
+            count += 1
+        jsonfile.write("\n]" if count else "]")
+
+    return count
+
+
+class ResultsStore:
+    """Append-only JSONL file of result rows with an fsync'd offset index"""
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._lock = Lock()
+        self._recover()
+        self._data = open(self.path, "ab")
+        self._index = open(self.index_path, "ab")
+        self._count = os.path.getsize(self.index_path) // _OFFSET.size
+
+    def _recover(self):
+        """Trim anything written after the last fully indexed record.
+
+        A crash between the data write and the index write leaves rows that
+        were never acknowledged; they are dropped so the two files agree.
+        """
+        for path in (self.path, self.index_path):
+            if not os.path.exists(path):
+                open(path, "wb").close()
+
+        index_size = os.path.getsize(self.index_path)
+        index_size -= index_size % _OFFSET.size
+        data_end = 0
+
+        with open(self.index_path, "r+b") as index:
+            index.truncate(index_size)
+            if index_size:
+                index.seek(index_size - _OFFSET.size)
+                (last_offset,) = _OFFSET.unpack(index.read(_OFFSET.size))
+                with open(self.path, "rb") as data:
+                    data.seek(last_offset)
+                    line = data.readline()
+                if line.endswith(b"\n"):
+                    data_end = last_offset + len(line)
+                else:
+                    # The last indexed row itself is torn; forget it as well
+                    index.truncate(index_size - _OFFSET.size)
+                    data_end = last_offset
+
+        if os.path.getsize(self.path) != data_end:
+            with open(self.path, "r+b") as data:
+                data.truncate(data_end)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, results):
+        """Durably append result rows; returns the number appended"""
+        lines = [
+            json.dumps(result, ensure_ascii=False, default=to_json).encode("utf-8") + b"\n"
+            for result in results
+        ]
+        if not lines:
+            return 0
+
+        with self._lock:
+            offset = self._data.seek(0, os.SEEK_END)
+            offsets = bytearray()
+            for line in lines:
+                offsets += _OFFSET.pack(offset)
+                offset += len(line)
+
+            self._data.write(b"".join(lines))
+            self._data.flush()
+            os.fsync(self._data.fileno())
+
+            self._index.write(bytes(offsets))
+            self._index.flush()
+            os.fsync(self._index.fileno())
+
+            self._count += len(lines)
+        return len(lines)
+
+    def get(self, position):
+        """Read a single result row by its position in the store"""
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        with open(self.index_path, "rb") as index:
+            index.seek(position * _OFFSET.size)
+            (offset,) = _OFFSET.unpack(index.read(_OFFSET.size))
+        with open(self.path, "rb") as data:
+            data.seek(offset)
+            return json.loads(data.readline())
+
+    def iter_results(self, start=0):
+        """Yield result rows in append order, starting at position `start`"""
+        end = self._count
+        if start >= end:
+            return
+        offset = 0
+        if start:
+            with open(self.index_path, "rb") as index:
+                index.seek(start * _OFFSET.size)
+                (offset,) = _OFFSET.unpack(index.read(_OFFSET.size))
+
+        with open(self.path, "rb") as data:
+            data.seek(offset)
+            for _ in range(end - start):
+                yield json.loads(data.readline())
+
+    def export(self, csv_file, json_file):
+        """Write the final CSV/JSON outputs from the store in one pass"""
+        return write_final_output(self.iter_results(), csv_file, json_file)
+
+    def close(self):
+        with self._lock:
+            self._data.close()
+            self._index.close()
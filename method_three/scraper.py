@@ -1,5 +1,5 @@
+import atexit
 import base64
-import csv
 import json
 import os
 import pickle
@@ -8,48 +8,52 @@ import re
 import sys
 import time
 import traceback
-import pyautogui
 import math
 import threading
 import random
 from datetime import datetime
 from threading import Lock
 from urllib.parse import quote, urlencode
-from pynput import mouse, keyboard
 import socket
 
 import requests
 import urllib3
-from bs4 import BeautifulSoup
 
-# Firebase imports
-try:
-    import firebase_admin
-    from firebase_admin import credentials, db
-    FIREBASE_AVAILABLE = True
-    print("✅ Firebase Admin imported successfully")
-except ImportError:
-    # Only catch ImportError, not all exceptions
-    firebase_admin = None
-    FIREBASE_AVAILABLE = False
-    print("❌ Firebase Admin ImportError: firebase-admin not installed.")
-    print("Install with: pip install firebase-admin")
-except Exception as e:
-    # Other exceptions (like credential issues) during import
-    firebase_admin = None
-    FIREBASE_AVAILABLE = False
-    print(f"❌ Firebase Admin import error: {e}")
+from buffered_log import BufferedLog
+from debug_store import DebugPageStore
+from extractors import extract_policy_details, extract_search_results
+from http_cassette import Cassette, mount_cassette
+from input_reader import is_spreadsheet, iter_input, sniff_delimiter
+from job_ledger import JobLedger
+from lazy_imports import lazy_attribute, lazy_module
+from lookup_cache import LookupCache
+from progress_journal import Progress, ProgressJournal
+from query_planner import describe_plan, fan_out, plan_queries
+from request_log import RequestLog, bureau_context, current_bureau_numbers
+from response_classifier import analyze_error, classify_response
+from results_store import ResultsStore, write_final_output
+
+# Heavy dependencies, imported on first use (see lazy_imports.py) so that
+# offline commands like --export start without a display or a browser
+pyautogui = lazy_module("pyautogui")
+mouse = lazy_module("pynput.mouse")
+keyboard = lazy_module("pynput.keyboard")
+Request = lazy_attribute("google.auth.transport.requests", "Request")
+InstalledAppFlow = lazy_attribute("google_auth_oauthlib.flow", "InstalledAppFlow")
+build = lazy_attribute("googleapiclient.discovery", "build")
+By = lazy_attribute("selenium.webdriver.common.by", "By")
+Keys = lazy_attribute("selenium.webdriver.common.keys", "Keys")
+EC = lazy_module("selenium.webdriver.support.expected_conditions")
+WebDriverWait = lazy_attribute("selenium.webdriver.support.ui", "WebDriverWait")
+Driver = lazy_attribute("seleniumbase", "Driver")
+
+# Firebase, imported by import_firebase() when distributed mode is tried
+firebase_admin = None
+credentials = None
+db = None
 
 # Disable SSL warnings when using proxies with SSL interception
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from seleniumbase import Driver
 
 # ==========================================================
 # CONFIG - PROXY SETTINGS
@@ -76,13 +80,28 @@ CREDENTIALS_FILE = "credentials.json"
 TOKEN_PICKLE = "token.pickle"
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 INPUT_CSV = "input_fast.csv"
-OUTPUT_CSV = "final_output_fast_1.csv"
-OUTPUT_JSON = "final_output_fast_1.json"
-COOKIE_FILE = "browser_cookies_fast_1.pkl"
-REQUESTS_SESSION_FILE = "requests_session_fast_1.pkl"
-PROGRESS_FILE = "progress_tracker_fast_1.json"
-REQUEST_LOG_FILE = "request_logs_1.jsonl"
+# Per-instance files (results, progress, request log, cookies) carry this
+# number, so several instances can share a directory; set SCRAPER_INSTANCE
+# per process. The lookup cache and the job ledger are shared.
+INSTANCE = os.environ.get("SCRAPER_INSTANCE", "1")
+OUTPUT_CSV = f"final_output_fast_{INSTANCE}.csv"
+OUTPUT_JSON = f"final_output_fast_{INSTANCE}.json"
+RESULTS_STORE_FILE = f"final_output_fast_{INSTANCE}.results.jsonl"
+COOKIE_FILE = f"browser_cookies_fast_{INSTANCE}.pkl"
+REQUESTS_SESSION_FILE = f"requests_session_fast_{INSTANCE}.pkl"
+PROGRESS_FILE = f"progress_tracker_fast_{INSTANCE}.json"
+PROGRESS_SNAPSHOT_FILE = f"progress_tracker_fast_{INSTANCE}.snapshot.jsonl"
+PROGRESS_JOURNAL_FILE = f"progress_tracker_fast_{INSTANCE}.journal.jsonl"
+REQUEST_LOG_FILE = f"request_logs_{INSTANCE}.jsonl"
 DEBUG_DIR = "debug_logs"
+DEBUG_PAGES_DIR = os.path.join(DEBUG_DIR, "pages")
+LOG_LEVEL = "DEBUG"  # Lowest status logged: DEBUG, INFO, SUCCESS, WARNING or ERROR
+LOOKUP_CACHE_FILE = "lookup_cache_fast_1.sqlite3"
+LOOKUP_CACHE_TTL_HOURS = 7 * 24  # 0 disables the lookup cache
+LOOKUP_CACHE_MAX_ENTRIES = 100000
+LOOKUP_CACHE_EMPTY_TTL_HOURS = 6  # "No results" answers are re-checked sooner
+CASSETTE_MODE = "passthrough"  # passthrough, record or replay (see http_cassette.py)
+CASSETTE_FILE = "requests_cassette.jsonl.gz"
 
 MAX_RETRIES = 100
 RETRY_DELAY = 2
@@ -96,9 +115,13 @@ FIREBASE_DB_URL = "https://isruscrape-default-rtdb.firebaseio.com/"
 UPLOAD_CSV_TO_FIREBASE = True
 JOB_STALE_SECONDS = 60 * 60
 
+# Where distributed-mode jobs live: "firebase" (the /jobs tree) or "local"
+# (job_ledger.py, a SQLite file shared by workers on one machine)
+JOB_BACKEND = "firebase"
+JOB_LEDGER_FILE = "jobs_fast_1.sqlite3"
+
 # Thread safety
 progress_lock = Lock()
-log_lock = Lock()
 mouse_lock = Lock()
 
 # Global driver instance
@@ -110,6 +133,22 @@ recorded_events = []
 stop_flag = False
 mouse_start_time = None
 
+# Progress journal (PROGRESS_FILE is only read once, to migrate old runs)
+progress_journal = ProgressJournal(
+    PROGRESS_SNAPSHOT_FILE, PROGRESS_JOURNAL_FILE, legacy_file=PROGRESS_FILE
+)
+
+# Local lookup cache, opened on first use; off while a cassette records or replays
+lookup_cache = None
+lookup_cache_disabled_logged = False
+
+# Local job ledger (JOB_BACKEND = "local"), opened on first use
+job_ledger = None
+
+# Proxy rotation state, loaded by get_proxy_manager() on first use
+proxy_manager = None
+proxy_manager_lock = Lock()
+
 # Session recovery tracking
 session_recovery_count = 0
 MAX_SESSION_RECOVERIES = 5
@@ -117,62 +156,62 @@ MAX_SESSION_RECOVERIES = 5
 # Create debug directory
 os.makedirs(DEBUG_DIR, exist_ok=True)
 
+# Console + execution_log.txt, written by a background thread
+execution_log = BufferedLog(os.path.join(DEBUG_DIR, "execution_log.txt"), level=LOG_LEVEL)
+
+# Record/replay transport, opened by the first attach_cassette() call
+cassette = None
+
+# Saved response pages, stored once per distinct body
+debug_pages = DebugPageStore(DEBUG_PAGES_DIR)
+
+# Rotating request log with a bureau/session/timestamp index
+request_log = RequestLog(REQUEST_LOG_FILE)
+atexit.register(request_log.flush)
+
 # ==========================================================
 # LOGGING FUNCTIONS
 # ==========================================================
 def log_step(step_name, status="INFO", message=""):
     """Log step execution with timestamp"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    status_icons = {
-        "INFO": "ℹ️",
-        "SUCCESS": "✅",
-        "ERROR": "❌",
-        "WARNING": "⚠️",
-        "RETRY": "🔄",
-        "DEBUG": "🔍",
-        "PROXY": "🔁",
-    }
-    icon = status_icons.get(status, "🔸")
-    log_message = f"{timestamp} {icon} [{status}] {step_name}: {message}"
-    print(log_message)
-    
-    with open(os.path.join(DEBUG_DIR, "execution_log.txt"), "a", encoding="utf-8") as f:
-        f.write(log_message + "\n")
+    execution_log.log(step_name, status, message)
 
 def log_request_response(session_id, request_type, url, params=None, 
-                        status_code=None, response_text=None, error=None, proxy_used=None):
-    """Log HTTP requests and responses for debugging"""
+                        status_code=None, response_text=None, error=None, proxy_used=None,
+                        elapsed=None):
+    """Log HTTP requests and responses for debugging; returns the body's classification"""
+    classification = classify_response(response_text)
     timestamp = datetime.now().isoformat()
     log_entry = {
         "timestamp": timestamp,
         "session_id": session_id,
+        "bureau_numbers": current_bureau_numbers(),
         "type": request_type,
         "url": url,
         "params": params,
         "status_code": status_code,
         "response_length": len(response_text) if response_text else 0,
+        "elapsed_ms": round(elapsed.total_seconds() * 1000, 1) if elapsed else None,
         "error": str(error) if error else None,
         "proxy_used": proxy_used,
-        "has_otp_modal": "one-time passcode" in (response_text or "").lower(),
-        "has_session_error": any(indicator in (response_text or "").lower() 
-                                for indicator in ["invalid session", "session expired", "login"]),
+        "has_otp_modal": classification["has_otp_modal"],
+        "has_session_error": classification["has_session_error"],
     }
+    if status_code != 200:
+        log_entry["error_type"] = classification["error_type"]
     
-    if response_text and (status_code != 200 or "one-time passcode" in response_text.lower()):
-        filename = f"{timestamp.replace(':', '-').replace('.', '-')}_{request_type}_{status_code}.html"
-        with open(os.path.join(DEBUG_DIR, filename), "w", encoding="utf-8") as f:
-            f.write(response_text)
-        log_entry["response_file"] = filename
+    if response_text and (status_code != 200 or classification["has_otp_modal"]):
+        log_entry["response_hash"] = debug_pages.put(response_text)
     
-    with log_lock:
-        with open(REQUEST_LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+    request_log.append(log_entry)
     
-    if status_code == 400 or status_code == 403 or error or "one-time passcode" in (response_text or "").lower():
+    if status_code == 400 or status_code == 403 or error or classification["has_otp_modal"]:
         log_step(f"HTTP {request_type}", "DEBUG", 
                 f"URL: {url}, Status: {status_code}, "
                 f"Proxy: {proxy_used}, Error: {error}")
 
+    return classification
+
 # ==========================================================
 # PROXY MANAGER CLASS
 # ==========================================================
@@ -258,7 +297,14 @@ class ProxyManager:
             "success_rate": total_success / max(1, total_success + total_failures) * 100
         }
 
-proxy_manager = ProxyManager()
+def get_proxy_manager():
+    """Create the proxy manager (which reads PROXY_STATUS_FILE) on first use"""
+    global proxy_manager
+
+    with proxy_manager_lock:
+        if proxy_manager is None:
+            proxy_manager = ProxyManager()
+    return proxy_manager
 
 # ==========================================================
 # MOUSE RECORDING/REPLAY FUNCTIONS
@@ -309,6 +355,7 @@ def start_recording():
         recorded_events = []
     stop_flag = False
 
+    execution_log.flush()
     print("\n" + "="*60)
     print("DISCLAIMER MOUSE RECORDING")
     print("="*60)
@@ -417,6 +464,7 @@ def handle_cat_chat_disclaimer_automated(driver):
     if os.path.exists(DISCLAIMER_RECORD_FILE):
         log_step("Disclaimer", "INFO", "Found recorded disclaimer actions. Replaying...")
         
+        execution_log.flush()
         print("\n" + "="*60)
         print("AUTO-ACCEPTING DISCLAIMER IN 5 SECONDS...")
         print("="*60)
@@ -433,6 +481,7 @@ def handle_cat_chat_disclaimer_automated(driver):
         else:
             log_step("Disclaimer", "WARNING", "Automatic replay failed")
     
+    execution_log.flush()
     print("\n" + "="*60)
     print("DISCLAIMER HANDLING REQUIRED")
     print("="*60)
@@ -690,8 +739,9 @@ def get_latest_otp():
 # ==========================================================
 # OTP AUTOMATION FUNCTIONS
 # ==========================================================
-def find_and_click_element(driver, selectors, by=By.CSS_SELECTOR, timeout=10, description=""):
+def find_and_click_element(driver, selectors, by=None, timeout=10, description=""):
     """Find and click an element from a list of selectors"""
+    by = by or By.CSS_SELECTOR
     for selector in selectors:
         try:
             element = WebDriverWait(driver, timeout).until(
@@ -706,8 +756,9 @@ def find_and_click_element(driver, selectors, by=By.CSS_SELECTOR, timeout=10, de
     log_step("Element Click", "WARNING", f"Could not click {description} with any selector")
     return False
 
-def find_and_fill_element(driver, selectors, text, by=By.CSS_SELECTOR, timeout=10, description=""):
+def find_and_fill_element(driver, selectors, text, by=None, timeout=10, description=""):
     """Find an element and fill it with text"""
+    by = by or By.CSS_SELECTOR
     for selector in selectors:
         try:
             element = WebDriverWait(driver, timeout).until(
@@ -1079,6 +1130,7 @@ def handle_cat_chat_disclaimer(driver):
     log_step("Disclaimer", "INFO", "2. Complete any CAPTCHA if required")
     log_step("Disclaimer", "INFO", "3. Click 'Accept', 'Agree', or similar button")
     
+    execution_log.flush()
     record_choice = input("\nWould you like to record mouse movements for future automation? (y/n): ").lower()
     if record_choice == 'y':
         log_step("Disclaimer", "INFO", "Recording mouse movements...")
@@ -1086,6 +1138,7 @@ def handle_cat_chat_disclaimer(driver):
         time.sleep(5)
         start_recording()
     
+    execution_log.flush()
     input("\nPress ENTER after you've completed the CAPTCHA and accepted the disclaimer...")
     
     time.sleep(3)
@@ -1219,7 +1272,7 @@ def convert_cookies_to_requests_session():
         
         session.verify = False
         
-        proxy_config = proxy_manager.get_proxy_for_request()
+        proxy_config = get_proxy_manager().get_proxy_for_request()
         session.proxies.update(proxy_config)
         
         if PROXY_INTEGRATION_METHOD == "PROXY_GATEWAY":
@@ -1247,12 +1300,24 @@ def convert_cookies_to_requests_session():
             )
 
         log_step("Convert Cookies", "SUCCESS", f"Converted {len(selenium_cookies)} cookies with proxy")
-        return session
+        return attach_cassette(session)
 
     except Exception as e:
         log_step("Convert Cookies", "ERROR", f"Error converting cookies: {e}")
         return None
 
+def attach_cassette(session):
+    """Mount the record/replay transport on a session (no-op in passthrough mode)"""
+    global cassette
+    if CASSETTE_MODE == "passthrough":
+        return session
+    if cassette is None:
+        cassette = Cassette(CASSETTE_FILE, CASSETTE_MODE)
+        atexit.register(cassette.close)
+        log_step("Cassette", "INFO", f"{CASSETTE_MODE.capitalize()} mode with {CASSETTE_FILE}")
+    mount_cassette(session, cassette)
+    return session
+
 def save_requests_session(session):
     """Save requests session to file"""
     try:
@@ -1275,14 +1340,14 @@ def load_requests_session():
 
         session.verify = False
         
-        proxy_config = proxy_manager.get_proxy_for_request()
+        proxy_config = get_proxy_manager().get_proxy_for_request()
         session.proxies.update(proxy_config)
         
         if PROXY_INTEGRATION_METHOD == "PROXY_GATEWAY":
             session.auth = (BRIGHT_DATA_USERNAME, BRIGHT_DATA_PASSWORD)
 
         log_step("Load Requests Session", "SUCCESS", "Session loaded with updated proxy")
-        return session
+        return attach_cassette(session)
     except Exception as e:
         log_step("Load Requests Session", "ERROR", f"Error loading session: {e}")
         return None
@@ -1378,53 +1443,6 @@ def check_session_valid(session):
         traceback.print_exc()
         return False
 
-def analyze_error(response_text, status_code):
-    """Analyze error response"""
-    if not response_text:
-        return "UNKNOWN_ERROR"
-    
-    text_lower = response_text.lower() 
-    
-    session_indicators = [
-        'invalidsession',
-        'invalid session',
-        'session expired',
-        'please log in',
-        'authentication required',
-        'forbidden',
-        'access denied'
-    ]
-    
-    for indicator in session_indicators:
-        if indicator in text_lower:
-            return "SESSION_EXPIRED"
-    
-    not_found_indicators = [
-        'not found',
-        'no results',
-        'no matching',
-        'could not find',
-        'data not found'
-    ]
-    
-    for indicator in not_found_indicators:
-        if indicator in text_lower:
-            return "NOT_FOUND"
-    
-    proxy_indicators = [
-        'proxy error',
-        'connection refused',
-        'timeout',
-        'too many requests',
-        'rate limit'
-    ]
-    
-    for indicator in proxy_indicators:
-        if indicator in text_lower:
-            return "PROXY_ERROR"
-    
-    return "UNKNOWN_ERROR"
-
 def clear_all_sessions():
     """Clear all session files and cookies"""
     log_step("Session Cleanup", "INFO", "Clearing all session data...")
@@ -1518,40 +1536,69 @@ def convert_date_format(date_str):
         log_step("Date Conversion", "ERROR", f"Date conversion error: {e}")
         return date_str
 
+def get_lookup_cache():
+    """Open the on-disk lookup cache on first use; None if disabled or broken"""
+    global lookup_cache, lookup_cache_disabled_logged
+
+    if CASSETTE_MODE != "passthrough":
+        # The lookup cache would hide requests from the cassette
+        if not lookup_cache_disabled_logged:
+            log_step("Lookup Cache", "INFO", f"Disabled while the cassette is in {CASSETTE_MODE} mode")
+            lookup_cache_disabled_logged = True
+        return None
+
+    if lookup_cache is None and LOOKUP_CACHE_TTL_HOURS:
+        try:
+            lookup_cache = LookupCache(
+                LOOKUP_CACHE_FILE,
+                ttl_seconds=LOOKUP_CACHE_TTL_HOURS * 3600,
+                max_entries=LOOKUP_CACHE_MAX_ENTRIES,
+                empty_ttl_seconds=LOOKUP_CACHE_EMPTY_TTL_HOURS * 3600,
+            )
+            log_step("Lookup Cache", "SUCCESS", f"Opened {LOOKUP_CACHE_FILE} with {len(lookup_cache)} entries")
+        except Exception as e:
+            log_step("Lookup Cache", "ERROR", f"Error opening lookup cache: {e}")
+    return lookup_cache
+
 def search_policy_holders_with_recovery(session, employer_name, coverage_date, zip_code, max_retries=PROXY_MAX_RETRIES):
     """Search with automatic session recovery using browser refresh"""
     session_id = id(session)
+
+    params = {
+        "handler": "SearchPolicyHolders",
+        "CoverageDate": convert_date_format(coverage_date),
+        "Fein": "",
+        "EmployerName": employer_name,
+        "StreetAddress": "",
+        "City": "",
+        "State": "",
+        "ZipCode": zip_code,
+    }
+
+    cache = get_lookup_cache()
+    if cache is not None:
+        cached = cache.get(params)
+        if cached is not None:
+            log_step("Search", "DEBUG", f"Cache hit: {len(cached)} results for {employer_name}")
+            return cached, session
     
     for attempt in range(max_retries):
         try:
-            coverage_date_api = convert_date_format(coverage_date)
-
-            params = {
-                "handler": "SearchPolicyHolders",
-                "CoverageDate": coverage_date_api,
-                "Fein": "",
-                "EmployerName": employer_name,
-                "StreetAddress": "",
-                "City": "",
-                "State": "",
-                "ZipCode": zip_code,
-            }
-
             url = "https://www.caworkcompcoverage.com/Search"
             
             log_step("Search", "DEBUG", f"Searching for {employer_name} on {coverage_date} in {zip_code} (Attempt {attempt+1}/{max_retries})")
             
             if attempt > 0:
-                proxy_config = proxy_manager.get_proxy_for_request()
+                proxy_config = get_proxy_manager().get_proxy_for_request()
                 session.proxies.update(proxy_config)
                 log_step("Proxy", "INFO", f"Rotating proxy for retry attempt {attempt+1}")
             
             response = session.get(url, params=params, timeout=PROXY_REQUEST_TIMEOUT)
             
-            log_request_response(session_id, "SEARCH", url, params, response.status_code, response.text)
+            classification = log_request_response(session_id, "SEARCH", url, params, response.status_code, response.text, elapsed=response.elapsed)
 
             if response.status_code == 400 or response.status_code == 403:
-                error_type = analyze_error(response.text, response.status_code)
+                error_type = analyze_error(response.text, response.status_code, classification)
                 
                 if error_type == 'SESSION_EXPIRED':
                     log_step("Search", "WARNING", f"Session expired (attempt {attempt + 1}/{max_retries})")
@@ -1598,35 +1645,13 @@ def search_policy_holders_with_recovery(session, employer_name, coverage_date, z
                 else:
                     return [], session
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            results = []
+            results = extract_search_results(response.text)
 
-            result_rows = soup.find_all("tr", attrs={"data-employer": True})
-            
-            for row in result_rows:
-                employer_data = row.get("data-employer")
-                city_data = row.get("data-city", "")
-                state_data = row.get("data-state", "")
-                
-                if employer_data:
-                    result = {
-                        "employer_name": employer_data,
-                        "city": city_data,
-                        "state": state_data,
-                    }
-                    results.append(result)
-
-            if not results:
-                result_rows = soup.find_all("tr", class_=lambda x: x and "result-row" in x)
-                for row in result_rows:
-                    cells = row.find_all("td")
-                    if len(cells) >= 3:
-                        result = {
-                            "employer_name": cells[0].get_text(strip=True),
-                            "city": cells[1].get_text(strip=True),
-                            "state": cells[2].get_text(strip=True),
-                        }
-                        results.append(result)
+            # OTP/expired-session pages parse to no results too; only real
+            # hits and the site's own "no results" answer are cached
+            cacheable = not classification["has_otp_modal"] and classification["error_type"] != "SESSION_EXPIRED"
+            if cache is not None and cacheable and (results or classification["error_type"] == "NOT_FOUND"):
+                cache.put(params, results)
 
             log_step("Search", "DEBUG", f"Found {len(results)} results for {employer_name}")
             return results, session
@@ -1645,34 +1670,39 @@ def get_policy_details_with_recovery(session, employer, coverage_date, max_retri
     """Get details with automatic session recovery and proxy rotation"""
     session_id = id(session)
     proxy_url = PROXY_GATEWAY_URL if PROXY_INTEGRATION_METHOD == "PROXY_GATEWAY" else PROXY_MANAGER_URL
+
+    params = {
+        "handler": "PolicyHolderDetails",
+        "CoverageDate": convert_date_format(coverage_date),
+        "EmployerName": employer["employer_name"],
+        "City": employer["city"],
+        "State": employer["state"],
+    }
+
+    cache = get_lookup_cache()
+    if cache is not None:
+        cached = cache.get(params)
+        if cached is not None:
+            log_step("Details", "DEBUG", f"Cache hit for {employer['employer_name']}")
+            return cached, session
     
     for attempt in range(max_retries):
         try:
-            coverage_date_api = convert_date_format(coverage_date)
-
-            params = {
-                "handler": "PolicyHolderDetails",
-                "CoverageDate": coverage_date_api,
-                "EmployerName": employer["employer_name"],
-                "City": employer["city"],
-                "State": employer["state"],
-            }
-
             url = "https://www.caworkcompcoverage.com/Search"
             
             log_step("Details", "DEBUG", f"Getting details for {employer['employer_name']} (Attempt {attempt+1}/{max_retries})")
             
             if attempt > 0:
-                proxy_config = proxy_manager.get_proxy_for_request()
+                proxy_config = get_proxy_manager().get_proxy_for_request()
                 session.proxies.update(proxy_config)
                 log_step("Proxy", "INFO", f"Rotating proxy for retry attempt {attempt+1}")
             
             response = session.get(url, params=params, timeout=PROXY_REQUEST_TIMEOUT)
             
-            log_request_response(session_id, "DETAILS", url, params, response.status_code, response.text, proxy_used=proxy_url)
+            classification = log_request_response(session_id, "DETAILS", url, params, response.status_code, response.text, proxy_used=proxy_url, elapsed=response.elapsed)
 
             if response.status_code == 400 or response.status_code == 403:
-                error_type = analyze_error(response.text, response.status_code)
+                error_type = analyze_error(response.text, response.status_code, classification)
                 
                 if error_type == 'SESSION_EXPIRED':
                     log_step("Details", "WARNING", f"Session expired (attempt {attempt + 1}/{max_retries})")
@@ -1685,17 +1715,17 @@ def get_policy_details_with_recovery(session, employer, coverage_date, max_retri
                         time.sleep(RETRY_DELAY * (PROXY_BACKOFF_FACTOR ** attempt))
                         continue
                     else:
-                        proxy_manager.record_proxy_result(proxy_url, success=False)
+                        get_proxy_manager().record_proxy_result(proxy_url, success=False)
                         return {}, session
                 
                 elif error_type == 'NOT_FOUND':
                     log_step("Details", "INFO", f"Details not found for {employer['employer_name']}")
-                    proxy_manager.record_proxy_result(proxy_url, success=True)
+                    get_proxy_manager().record_proxy_result(proxy_url, success=True)
                     return {}, session
                 
                 elif error_type == 'PROXY_ERROR':
                     log_step("Details", "WARNING", f"Proxy error for {employer['employer_name']}. Rotating proxy...")
-                    proxy_manager.record_proxy_result(proxy_url, success=False)
+                    get_proxy_manager().record_proxy_result(proxy_url, success=False)
                     
                     if attempt < max_retries - 1:
                         time.sleep(RETRY_DELAY * (PROXY_BACKOFF_FACTOR ** attempt))
@@ -1705,12 +1735,12 @@ def get_policy_details_with_recovery(session, employer, coverage_date, max_retri
                 
                 else:
                     log_step("Details", "WARNING", f"Unknown error for {employer['employer_name']}")
-                    proxy_manager.record_proxy_result(proxy_url, success=False)
+                    get_proxy_manager().record_proxy_result(proxy_url, success=False)
                     return {}, session
 
             if response.status_code != 200:
                 log_step("Details", "ERROR", f"Details request failed: {response.status_code}")
-                proxy_manager.record_proxy_result(proxy_url, success=False)
+                get_proxy_manager().record_proxy_result(proxy_url, success=False)
                 
                 if attempt < max_retries - 1:
                     time.sleep(RETRY_DELAY * (PROXY_BACKOFF_FACTOR ** attempt))
@@ -1718,34 +1748,21 @@ def get_policy_details_with_recovery(session, employer, coverage_date, max_retri
                 else:
                     return {}, session
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            policy_data = {}
+            policy_data = extract_policy_details(response.text)
+            if policy_data:
+                policy_data["extracted_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                log_step("Details", "SUCCESS", f"Found details for {policy_data['employer_name']}")
 
-            detail_rows = soup.find_all("tr", class_="detail-row")
-            
-            for row in detail_rows:
-                cells = row.find_all("td")
-                if len(cells) >= 7:
-                    policy_data = {
-                        "employer_name": cells[0].get_text(strip=True),
-                        "street_address": cells[1].get_text(strip=True),
-                        "city": cells[2].get_text(strip=True),
-                        "state": cells[3].get_text(strip=True),
-                        "zip_code": cells[4].get_text(strip=True),
-                        "insurer_name": cells[5].get_text(strip=True),
-                        "fein": cells[6].get_text(strip=True),
-                        "extracted_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    }
-                    log_step("Details", "SUCCESS", f"Found details for {policy_data['employer_name']}")
-                    break
+            if policy_data and cache is not None:
+                cache.put(params, policy_data)
 
-            proxy_manager.record_proxy_result(proxy_url, success=True)
+            get_proxy_manager().record_proxy_result(proxy_url, success=True)
             return policy_data, session
 
         except Exception as e:
             log_step("Details", "ERROR", f"Details exception (attempt {attempt + 1}/{max_retries}): {str(e)}")
             traceback.print_exc()
-            proxy_manager.record_proxy_result(proxy_url, success=False)
+            get_proxy_manager().record_proxy_result(proxy_url, success=False)
             
             if attempt < max_retries - 1:
                 time.sleep(RETRY_DELAY * (PROXY_BACKOFF_FACTOR ** attempt))
@@ -1759,33 +1776,12 @@ def get_policy_details_with_recovery(session, employer, coverage_date, max_retri
 def read_input_csv(file_path):
     """Read the input CSV file"""
     try:
-        employers = []
-
-        with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
-
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
-
+        delimiter = None
+        if not is_spreadsheet(file_path):
+            delimiter = sniff_delimiter(file_path)
             log_step("Read Input", "INFO", f"Detected delimiter: '{delimiter}'")
 
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-
-            for row in reader:
-                cleaned_row = {
-                    key.strip().replace("\ufeff", ""): value.strip()
-                    for key, value in row.items()
-                }
-
-                employers.append(
-                    {
-                        "bureau_number": cleaned_row.get("Bureau Number", ""),
-                        "employer_name": cleaned_row.get("Employer Name", ""),
-                        "zip_code": cleaned_row.get("Zip Code", ""),
-                        "coverage_date": cleaned_row.get("Coverage Date", ""),
-                    }
-                )
+        employers = list(iter_input(file_path, delimiter))
 
         log_step("Read Input", "SUCCESS", f"Read {len(employers)} employers")
         return employers
@@ -1794,33 +1790,37 @@ def read_input_csv(file_path):
         return []
 
 def load_progress():
-    """Load progress tracking data"""
+    """Load progress by replaying the snapshot and journal tail"""
     try:
-        if os.path.exists(PROGRESS_FILE):
-            with open(PROGRESS_FILE, "r", encoding="utf-8") as f:
-                progress = json.load(f)
-            log_step(
-                "Load Progress",
-                "SUCCESS",
-                f"Loaded progress: {len(progress.get('completed', []))} completed, {len(progress.get('results', []))} results",
-            )
-            return progress
-        else:
-            log_step("Load Progress", "INFO", "No progress file found")
-            return {"completed": [], "results": []}
+        progress = progress_journal.load()
+        log_step(
+            "Load Progress",
+            "SUCCESS",
+            f"Loaded progress: {len(progress['completed'])} completed, {len(progress['results'])} results "
+            f"({progress_journal.snapshot_records} from snapshot, {progress_journal.tail_records} from journal)",
+        )
+        return progress
     except Exception as e:
         log_step("Load Progress", "ERROR", f"Error loading progress: {e}")
-        return {"completed": [], "results": []}
+        return Progress()
+
+def record_progress(progress, bureau_number, results):
+    """Append one completed bureau number to the progress journal"""
+    try:
+        progress_journal.record(progress, bureau_number, results)
+        return True
+    except Exception as e:
+        log_step("Save Progress", "ERROR", f"Error journaling Bureau #{bureau_number}: {e}")
+        return False
 
-def save_progress(progress):
-    """Save progress tracking data"""
+def save_progress():
+    """Compact the progress journal into a fresh snapshot"""
     try:
-        with open(PROGRESS_FILE, "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
+        progress_journal.compact()
         log_step(
             "Save Progress",
             "SUCCESS",
-            f"Progress saved: {len(progress.get('completed', []))} completed, {len(progress.get('results', []))} results",
+            f"Progress snapshot saved: {progress_journal.snapshot_records} completed",
         )
         return True
     except Exception as e:
@@ -1830,57 +1830,62 @@ def save_progress(progress):
 def save_final_output(results, csv_file=OUTPUT_CSV, json_file=OUTPUT_JSON):
     """Save final results"""
     try:
-        with open(csv_file, "w", newline="", encoding="utf-8") as csvfile:
-            fieldnames = [
-                "Bureau Number",
-                "Employer Name",
-                "Street Address",
-                "City",
-                "State",
-                "Zip Code",
-                "Insurer Name",
-                "LookupStatus",
-            ]
-            writer = csv.DictWriter(
-                csvfile, fieldnames=fieldnames, delimiter="\t"
-            )
-            writer.writeheader()
-            for result in results:
-                writer.writerow(
-                    {
-                        "Bureau Number": result["bureau_number"],
-                        "Employer Name": result["employer_name"],
-                        "Street Address": result["street_address"],
-                        "City": result["city"],
-                        "State": result["state"],
-                        "Zip Code": result["zip_code"],
-                        "Insurer Name": result["insurer_name"],
-                        "LookupStatus": result["lookup_status"],
-                    }
-                )
-
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-
+        count = write_final_output(results, csv_file, json_file)
         log_step(
             "Save Output",
             "SUCCESS",
-            f"Output saved to {csv_file} and {json_file}",
+            f"Output saved to {csv_file} and {json_file} ({count} records)",
         )
         return True
     except Exception as e:
         log_step("Save Output", "ERROR", f"Error saving output: {e}")
         return False
 
+def open_results_store(progress):
+    """Open the append-only results sink, seeding it from legacy progress results"""
+    store = ResultsStore(RESULTS_STORE_FILE)
+    if not len(store) and progress.get("results"):
+        store.append(progress["results"])
+        log_step("Results Store", "INFO", f"Seeded {len(store)} results from {PROGRESS_FILE}")
+    log_step("Results Store", "SUCCESS", f"Opened {RESULTS_STORE_FILE} with {len(store)} results")
+    return store
+
+def export_final_output(store):
+    """Write the final CSV/JSON once by streaming out of the results sink"""
+    if not len(store):
+        log_step("Main", "WARNING", "No results to save")
+        return False
+    return save_final_output(store.iter_results())
+
 # ==========================================================
 # FIREBASE COORDINATION FUNCTIONS
 # ==========================================================
+def import_firebase():
+    """Import firebase_admin on first call; returns True if it is available"""
+    global firebase_admin, credentials, db
+
+    if firebase_admin is not None:
+        return True
+    try:
+        import firebase_admin as admin
+        from firebase_admin import credentials as admin_credentials, db as admin_db
+    except ImportError:
+        # Only catch ImportError, not all exceptions
+        print("❌ Firebase Admin ImportError: firebase-admin not installed.")
+        print("Install with: pip install firebase-admin")
+        return False
+    except Exception as e:
+        # Other exceptions (like credential issues) during import
+        print(f"❌ Firebase Admin import error: {e}")
+        return False
+    firebase_admin, credentials, db = admin, admin_credentials, admin_db
+    print("✅ Firebase Admin imported successfully")
+    return True
+
 def init_firebase():
     """Initialize Firebase app and DB reference. Returns True if initialized."""
-    global firebase_admin
-    
-    # First check if module was successfully imported
-    if firebase_admin is None:
+    # First check if module can be imported
+    if not import_firebase():
         log_step("Firebase", "ERROR", "firebase_admin module not available. Check installation or import errors.")
         return False
     
@@ -1908,45 +1913,65 @@ def init_firebase():
         traceback.print_exc()
         return False
 
+def get_job_ledger():
+    """Open the local job ledger on first use"""
+    global job_ledger
+
+    if job_ledger is None:
+        job_ledger = JobLedger(JOB_LEDGER_FILE, lease_seconds=JOB_STALE_SECONDS)
+        log_step("Job Ledger", "SUCCESS", f"Opened {JOB_LEDGER_FILE}: {job_ledger.counts()}")
+    return job_ledger
+
+def init_job_backend():
+    """Open the configured job store. Returns True if it is usable."""
+    if JOB_BACKEND == "local":
+        try:
+            get_job_ledger()
+            return True
+        except Exception as e:
+            log_step("Job Ledger", "ERROR", f"Failed to open {JOB_LEDGER_FILE}: {e}")
+            return False
+    return init_firebase()
+
 def upload_csv_to_firebase(input_csv_path=INPUT_CSV, jobs_path="/jobs"):
     """
     Upload the CSV into Firebase under /jobs/{bureau_number}.
     - If a job node already exists, skip it (idempotent).
+    - Existing keys are read with one shallow get and the new jobs written
+      with one multi-path update, instead of a get() + set() per row.
+    With JOB_BACKEND = "local" the rows go into the job ledger instead.
     """
+    if JOB_BACKEND == "local":
+        try:
+            count_new = get_job_ledger().import_csv(input_csv_path)
+            log_step("Job Ledger", "SUCCESS", f"Imported CSV into {JOB_LEDGER_FILE}. New jobs: {count_new}")
+            return True
+        except Exception as e:
+            log_step("Job Ledger", "ERROR", f"Failed to import CSV: {e}")
+            traceback.print_exc()
+            return False
+
     if not init_firebase():
         return False
     try:
-        with open(input_csv_path, "r", newline="", encoding="utf-8") as csvfile:
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-            ref = db.reference(jobs_path)
-            count_new = 0
-            for row in reader:
-                cleaned = {k.strip().replace("\ufeff", ""): (v.strip() if v else "") for k, v in row.items()}
-                bureau = cleaned.get("Bureau Number", "") or cleaned.get("bureau_number", "")
-                if not bureau:
-                    continue
-                job_ref = ref.child(bureau)
-                existing = job_ref.get()
-                if existing:
-                    # Skip existing
-                    continue
-                job_data = {
-                    "bureau_number": bureau,
-                    "employer_name": cleaned.get("Employer Name", cleaned.get("employer_name", "")),
-                    "zip_code": cleaned.get("Zip Code", cleaned.get("zip_code", "")),
-                    "coverage_date": cleaned.get("Coverage Date", cleaned.get("coverage_date", "")),
-                    "status": "pending",
-                    "created_at": datetime.utcnow().isoformat(),
-                    "result": None,
-                }
-                job_ref.set(job_data)
-                count_new += 1
-            log_step("Firebase Upload", "SUCCESS", f"Uploaded CSV to Firebase. New jobs: {count_new}")
-            return True
+        ref = db.reference(jobs_path)
+        existing = set(ref.get(shallow=True) or {})
+        created_at = datetime.utcnow().isoformat()
+        new_jobs = {}
+        for employer in iter_input(input_csv_path):
+            bureau = employer["bureau_number"]
+            if not bureau or bureau in existing or bureau in new_jobs:
+                continue
+            new_jobs[bureau] = {
+                **employer,
+                "status": "pending",
+                "created_at": created_at,
+                "result": None,
+            }
+        if new_jobs:
+            ref.update(new_jobs)
+        log_step("Firebase Upload", "SUCCESS", f"Uploaded CSV to Firebase. New jobs: {len(new_jobs)}")
+        return True
     except Exception as e:
         log_step("Firebase Upload", "ERROR", f"Failed to upload CSV: {e}")
         traceback.print_exc()
@@ -1960,13 +1985,24 @@ def claim_job(worker_id, jobs_path="/jobs", stale_seconds=JOB_STALE_SECONDS):
       - For each job key attempt a transaction that sets status -> in-progress only if currently pending
         OR if currently in-progress but claimed_at older than stale_seconds (stale).
       - Return (job_key, job_data) on success or (None, None).
+    With JOB_BACKEND = "local" this is one indexed, leased claim on the job ledger.
     """
+    if JOB_BACKEND == "local":
+        try:
+            job_key, job_data = get_job_ledger().claim(worker_id, lease_seconds=stale_seconds)
+            if job_key is not None:
+                log_step("Job Ledger", "SUCCESS", f"Worker {worker_id} claimed job {job_key}")
+            return job_key, job_data
+        except Exception as e:
+            log_step("Job Ledger", "ERROR", f"Error claiming job: {e}")
+            return None, None
+
     if not init_firebase():
         return None, None
     try:
         jobs_ref = db.reference(jobs_path)
-        all_jobs = jobs_ref.get(shallow=False) or {}
-        job_keys = list(all_jobs.keys())
+        # Keys only; each candidate's data is read by its transaction
+        job_keys = list((jobs_ref.get(shallow=True) or {}).keys())
         random.shuffle(job_keys)
         now = datetime.utcnow()
         now_iso = now.isoformat()
@@ -2024,6 +2060,10 @@ def claim_job(worker_id, jobs_path="/jobs", stale_seconds=JOB_STALE_SECONDS):
 def mark_job_done(job_key, result_dict, jobs_path="/jobs"):
     """Write result to /jobs/{job_key}/result and set status to done"""
     try:
+        if JOB_BACKEND == "local":
+            get_job_ledger().mark_done(job_key, result_dict)
+            log_step("Job Ledger", "SUCCESS", f"Marked job {job_key} done")
+            return True
         if not init_firebase():
             return False
         job_ref = db.reference(f"{jobs_path}/{job_key}")
@@ -2043,6 +2083,10 @@ def mark_job_done(job_key, result_dict, jobs_path="/jobs"):
 def mark_job_failed(job_key, error_message, jobs_path="/jobs"):
     """Set job status to failed and set error message"""
     try:
+        if JOB_BACKEND == "local":
+            get_job_ledger().mark_failed(job_key, error_message)
+            log_step("Job Ledger", "WARNING", f"Marked job {job_key} failed: {error_message}")
+            return True
         if not init_firebase():
             return False
         job_ref = db.reference(f"{jobs_path}/{job_key}")
@@ -2175,7 +2219,7 @@ def main():
     log_step("Main", "INFO", "4. Invalid sessions/proxies will trigger recovery")
     log_step("Main", "INFO", "=" * 60)
 
-    stats = proxy_manager.get_stats()
+    stats = get_proxy_manager().get_stats()
     log_step("Proxy Stats", "INFO", f"Initial Stats - Total: {stats['total_requests']}, Success Rate: {stats['success_rate']:.1f}%")
 
     if not os.path.exists(INPUT_CSV):
@@ -2205,21 +2249,20 @@ def main():
             return
 
     progress = load_progress()
+    results_store = open_results_store(progress)
     employers = read_input_csv(INPUT_CSV)
 
     if not employers:
         log_step("Main", "ERROR", "No employers to process")
         return
 
-    pending_employers = [
-        e for e in employers if e["bureau_number"] not in progress["completed"]
-    ]
+    pending_employers = list(progress.pending(employers))
 
     if not pending_employers:
         log_step("Main", "SUCCESS", "All employers already processed!")
-        save_final_output(progress["results"])
+        export_final_output(results_store)
         
-        final_stats = proxy_manager.get_stats()
+        final_stats = get_proxy_manager().get_stats()
         log_step("Proxy Stats", "SUCCESS", 
                 f"Final Stats - Total: {final_stats['total_requests']}, "
                 f"Success: {final_stats['successful_requests']}, "
@@ -2230,26 +2273,34 @@ def main():
 
     log_step("Main", "INFO", f"Starting with {len(pending_employers)} employers pending")
 
+    groups, plan_stats = plan_queries(pending_employers)
+    log_step("Query Plan", "INFO", describe_plan(plan_stats))
+
     total_processed = 0
+    total_lookups = 0
     start_time = time.time()
     consecutive_failures = 0
     max_consecutive_failures = 3
 
-    for employer in pending_employers:
-        results, session, session_valid = process_employer(session, employer, progress)
+    for group in groups:
+        employer = group["employers"][0]
+        with bureau_context(member["bureau_number"] for member in group["employers"]):
+            results, session, session_valid = process_employer(session, employer, progress)
 
         if results and session_valid:
             with progress_lock:
-                progress["results"].extend(results)
-                progress["completed"].append(employer["bureau_number"])
-                save_progress(progress)
+                for member in group["employers"]:
+                    member_results = fan_out(results, member)
+                    results_store.append(member_results)
+                    record_progress(progress, member["bureau_number"], member_results)
 
-            total_processed += 1
+            total_processed += len(group["employers"])
+            total_lookups += 1
             consecutive_failures = 0
 
-            if total_processed % 5 == 0:
+            if total_lookups % 5 == 0:
                 save_requests_session(session)
-                stats = proxy_manager.get_stats()
+                stats = get_proxy_manager().get_stats()
                 log_step("Proxy Stats", "INFO", 
                         f"Progress Update - Requests: {stats['total_requests']}, "
                         f"Success Rate: {stats['success_rate']:.1f}%")
@@ -2290,12 +2341,10 @@ def main():
             
             time.sleep(2)
 
-    if progress["results"]:
-        save_final_output(progress["results"])
-    else:
-        log_step("Main", "WARNING", "No results to save")
+    save_progress()
+    export_final_output(results_store)
 
-    final_stats = proxy_manager.get_stats()
+    final_stats = get_proxy_manager().get_stats()
     
     log_step("Main", "INFO", "=" * 60)
     log_step("Main", "INFO", "📊 PROCESSING COMPLETE!")
@@ -2303,6 +2352,12 @@ def main():
     log_step("Main", "INFO", f"Total Employers Processed: {total_processed}")
     log_step("Main", "INFO", f"Total Time: {time.time() - start_time:.2f} seconds")
     log_step("Main", "INFO", f"Total Records Found: {len(progress['results'])}")
+    log_step("Main", "INFO", "Lookup Status: " + ", ".join(
+        f"{status}: {count}" for status, count in progress.status_counts.most_common()))
+    if lookup_cache is not None:
+        cache_stats = lookup_cache.stats()
+        log_step("Main", "INFO", f"Lookup Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                 f"({cache_stats['hit_rate']:.1f}% hit rate)")
     log_step("Main", "INFO", "=" * 60)
     log_step("Proxy Stats", "SUCCESS", 
             f"Proxy Performance - Total Requests: {final_stats['total_requests']}")
@@ -2324,10 +2379,24 @@ def main():
 # ==========================================================
 # DISTRIBUTED MAIN LOOP FOR FIREBASE
 # ==========================================================
+def any_pending_jobs(jobs_path="/jobs"):
+    """True while some job is still pending"""
+    if JOB_BACKEND == "local":
+        return get_job_ledger().pending_count() > 0
+    # Indexed query when /jobs has ".indexOn": "status"; the database rejects
+    # it otherwise, so fall back to reading the tree
+    jobs_ref = db.reference(jobs_path)
+    try:
+        pending = jobs_ref.order_by_child("status").equal_to("pending").limit_to_first(1).get()
+    except Exception:
+        snapshot = jobs_ref.get(shallow=False) or {}
+        return any(v.get("status") == "pending" for v in snapshot.values())
+    return bool(pending)
+
 def distributed_main_loop():
     """
     Coordination loop to let multiple scraper instances run concurrently.
-    - Upload CSV to Firebase if configured.
+    - Upload CSV to Firebase (or the local job ledger) if configured.
     - Each worker claims a job, processes it with existing process_employer(), and writes back results.
     """
     hostname = socket.gethostname()
@@ -2335,9 +2404,9 @@ def distributed_main_loop():
     worker_id = f"{hostname}:{pid}:{int(time.time())}"
     log_step("Distributed Main", "INFO", f"Worker ID: {worker_id}")
 
-    # Init/verify firebase
-    if not init_firebase():
-        log_step("Distributed Main", "ERROR", "Firebase initialization failed. Exiting distributed runner.")
+    # Init/verify firebase or the job ledger
+    if not init_job_backend():
+        log_step("Distributed Main", "ERROR", f"Job backend ({JOB_BACKEND}) initialization failed. Exiting distributed runner.")
         return
 
     if UPLOAD_CSV_TO_FIREBASE:
@@ -2371,9 +2440,12 @@ def distributed_main_loop():
             log_step("Distributed Main", "ERROR", "Failed to recover session. Exiting.")
             return
 
-    stats = proxy_manager.get_stats()
+    stats = get_proxy_manager().get_stats()
     log_step("Distributed Main", "INFO", f"Proxy Stats at start: Total={stats['total_requests']} SuccessRate={stats['success_rate']:.1f}%")
 
+    progress = load_progress()
+    results_store = open_results_store(progress)
+
     # Main claim/process loop
     idle_count = 0
     while True:
@@ -2381,10 +2453,7 @@ def distributed_main_loop():
         if job_key is None:
             idle_count += 1
             if idle_count > 3:
-                pending_ref = db.reference("/jobs")
-                snapshot = pending_ref.get(shallow=False) or {}
-                any_pending = any(v.get("status") == "pending" for v in snapshot.values())
-                if not any_pending:
+                if not any_pending_jobs():
                     log_step("Distributed Main", "SUCCESS", "No pending jobs remaining. Exiting.")
                     break
             log_step("Distributed Main", "INFO", "No job claimed; sleeping briefly...")
@@ -2400,7 +2469,8 @@ def distributed_main_loop():
         }
         
         try:
-            results_list, session, ok = process_employer(session, employer_data, load_progress())
+            with bureau_context([employer_data["bureau_number"]]):
+                results_list, session, ok = process_employer(session, employer_data, progress)
             if ok and results_list is not None:
                 result_payload = {
                     "worker_id": worker_id,
@@ -2408,13 +2478,10 @@ def distributed_main_loop():
                 }
                 mark_job_done(job_key, result_payload)
                 
-                progress = load_progress()
-                for r in results_list:
-                    if r["bureau_number"] not in progress.get("completed", []):
-                        progress.setdefault("results", []).append(r)
-                        progress.setdefault("completed", []).append(r["bureau_number"])
-                save_progress(progress)
-                save_final_output(progress.get("results", []))
+                bureau_number = employer_data["bureau_number"]
+                if not progress.is_completed(bureau_number):
+                    results_store.append(results_list)
+                    record_progress(progress, bureau_number, results_list)
             else:
                 mark_job_failed(job_key, f"Processing failed or session invalid for job {job_key}")
         except Exception as e:
@@ -2424,15 +2491,21 @@ def distributed_main_loop():
         
         time.sleep(0.5 + random.random() * 0.5)
 
+    save_progress()
+    export_final_output(results_store)
+
 # ==========================================================
 # ENTRY POINT
 # ==========================================================
 if __name__ == "__main__":
+    if "--export" in sys.argv[1:]:
+        # Rebuild the final CSV/JSON from the results sink without scraping
+        export_final_output(open_results_store(load_progress()))
     # Check if we should run in distributed mode
-    if FIREBASE_AVAILABLE:
+    elif JOB_BACKEND == "local" or import_firebase():
         try:
             print("\n" + "="*60)
-            print("🚀 STARTING DISTRIBUTED MODE (Firebase-coordinated)")
+            print(f"🚀 STARTING DISTRIBUTED MODE ({'job ledger' if JOB_BACKEND == 'local' else 'Firebase'}-coordinated)")
             print("="*60)
             distributed_main_loop()
         except KeyboardInterrupt:
@@ -2441,6 +2514,7 @@ if __name__ == "__main__":
             log_step("Entry", "ERROR", f"Fatal error in distributed mode: {e}")
             traceback.print_exc()
             # Fall back to single mode
+            execution_log.flush()
             print("\n" + "="*60)
             print("⚠️ Falling back to single mode...")
             print("="*60)
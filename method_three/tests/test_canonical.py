@@ -0,0 +1,79 @@
+import pytest
+
+from canonical import canonical_date, canonical_name, canonical_zip
+from lookup_cache import make_key
+from query_planner import plan_queries
+
+
+def search(name, zip_code, date):
+    return {
+        "handler": "SearchPolicyHolders",
+        "CoverageDate": date,
+        "Fein": "",
+        "EmployerName": name,
+        "StreetAddress": "",
+        "City": "",
+        "State": "",
+        "ZipCode": zip_code,
+    }
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Acme, Inc.", "ACME"),
+        ("ACME  INC", "ACME"),
+        ("acme l.l.c.", "ACME"),
+        ("Smith & Co., Ltd.", "SMITH AND CO"),
+        ("CO", "CO"),
+        ("  O'Brien   Plumbing ", "O BRIEN PLUMBING"),
+        (None, ""),
+    ],
+)
+def test_canonical_name(name, expected):
+    assert canonical_name(name) == expected
+
+
+@pytest.mark.parametrize(
+    "zip_code, expected",
+    [("93291", "93291"), ("93291-9358", "93291"), ("932919358", "93291"), ("2134", "02134"), ("", "")],
+)
+def test_canonical_zip(zip_code, expected):
+    assert canonical_zip(zip_code) == expected
+
+
+@pytest.mark.parametrize("date", ["11/1/2025", "11/01/2025", "2025-11-01", "11-01-2025"])
+def test_canonical_date(date):
+    assert canonical_date(date) == "2025-11-01"
+
+
+def test_search_keys_match_on_canonical_fields():
+    key = make_key(search("ACME", "93291", "2025-11-01"))
+    assert make_key(search("Acme, Inc.", "93291-9358", "11/1/2025")) == key
+    assert make_key(search(" acme  inc ", "932919358", "2025-11-01")) == key
+    assert make_key(search("ACME HOLDINGS", "93291", "2025-11-01")) != key
+    assert make_key(search("ACME", "93292", "2025-11-01")) != key
+    assert make_key(search("ACME", "93291", "2025-12-01")) != key
+
+
+def test_detail_keys_keep_the_exact_name():
+    details = {
+        "handler": "PolicyHolderDetails",
+        "CoverageDate": "2025-11-01",
+        "EmployerName": "ACME, INC.",
+        "City": "Fresno",
+        "State": "CA",
+    }
+    assert make_key(details) == make_key(dict(details, EmployerName=" acme,  inc. ", City="FRESNO"))
+    assert make_key(details) != make_key(dict(details, EmployerName="ACME"))
+
+
+def test_planner_groups_rows_with_the_same_canonical_search():
+    rows = [
+        {"bureau_number": "1", "employer_name": "Acme, Inc.", "zip_code": "93291-9358", "coverage_date": "11/1/2025"},
+        {"bureau_number": "2", "employer_name": "ACME", "zip_code": "93291", "coverage_date": "11/01/2025"},
+        {"bureau_number": "3", "employer_name": "ACME", "zip_code": "93701", "coverage_date": "11/01/2025"},
+    ]
+    groups, stats = plan_queries(rows)
+    assert [[e["bureau_number"] for e in group["employers"]] for group in groups] == [["1", "2"], ["3"]]
+    assert (stats["rows"], stats["lookups"]) == (3, 2)
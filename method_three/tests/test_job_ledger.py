@@ -0,0 +1,96 @@
+import pytest
+
+from job_ledger import JobLedger
+
+
+def employer(bureau_number):
+    return {
+        "bureau_number": bureau_number,
+        "employer_name": f"EMPLOYER {bureau_number}",
+        "zip_code": "93701",
+        "coverage_date": "11/01/2025",
+    }
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = JobLedger(str(tmp_path / "jobs.sqlite3"), lease_seconds=60)
+    ledger.import_employers(employer(b) for b in ("1", "2", "3"))
+    yield ledger
+    ledger.close()
+
+
+def expire_lease(ledger, bureau_number):
+    ledger._conn.execute(
+        "UPDATE jobs SET lease_until = 1 WHERE bureau_number = ?", (bureau_number,)
+    )
+
+
+def test_import_skips_known_bureau_numbers(ledger):
+    assert ledger.import_employers([employer("2"), employer("4"), employer("")]) == 1
+    assert ledger.counts()["pending"] == 4
+
+
+def test_claims_in_input_order_until_empty(ledger):
+    claimed = [ledger.claim("w1")[0] for _ in range(3)]
+    assert claimed == ["1", "2", "3"]
+    assert ledger.claim("w1") == (None, None)
+    assert ledger.counts() == {"pending": 0, "in-progress": 3, "done": 0, "failed": 0}
+
+
+def test_expired_lease_is_reclaimed(ledger):
+    for _ in range(3):
+        ledger.claim("w1")
+    assert ledger.claim("w2") == (None, None)
+
+    expire_lease(ledger, "2")
+    bureau_number, job = ledger.claim("w2")
+    assert bureau_number == "2"
+    assert job["worker_id"] == "w2"
+    assert job["reclaimed_count"] == 1
+    assert ledger.counts()["in-progress"] == 3
+
+    # The first worker lost the job and can't renew it any more
+    assert not ledger.renew("2", "w1")
+    assert ledger.renew("2", "w2")
+
+
+def test_live_lease_is_not_reclaimed(ledger):
+    for _ in range(3):
+        ledger.claim("w1")
+    assert ledger.renew("1", "w1")
+    assert ledger.claim("w2") == (None, None)
+
+
+def test_done_failed_and_retry(ledger):
+    ledger.claim("w1")
+    ledger.claim("w1")
+    ledger.mark_done("1", {"results": [{"lookup_status": "Found"}]})
+    ledger.mark_failed("2", "session invalid")
+    assert ledger.get("1")["result"] == {"results": [{"lookup_status": "Found"}]}
+    assert ledger.get("2")["error"] == "session invalid"
+
+    # Finished jobs are never handed out again, even with an old lease
+    expire_lease(ledger, "1")
+    assert ledger.claim("w2")[0] == "3"
+    assert ledger.claim("w2") == (None, None)
+
+    assert ledger.retry_failed() == 1
+    assert ledger.claim("w2")[0] == "2"
+    assert ledger.counts() == {"pending": 0, "in-progress": 2, "done": 1, "failed": 0}
+
+
+def test_claim_queries_use_the_partial_indexes(ledger):
+    plans = [
+        " ".join(row[3] for row in ledger._conn.execute("EXPLAIN QUERY PLAN " + query, args))
+        for query, args in (
+            ("SELECT bureau_number FROM jobs WHERE status = 'pending' ORDER BY seq LIMIT 1", ()),
+            (
+                "SELECT bureau_number FROM jobs WHERE status = 'in-progress' AND lease_until < ? "
+                "ORDER BY lease_until LIMIT 1",
+                (0,),
+            ),
+        )
+    ]
+    assert "jobs_pending" in plans[0] and "TEMP B-TREE" not in plans[0]
+    assert "jobs_leased" in plans[1] and "TEMP B-TREE" not in plans[1]
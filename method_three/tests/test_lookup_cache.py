@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from lookup_cache import DetailMemo, LookupCache, make_key
+
+
+def search(name, zip_code="93701", date="2025-11-01"):
+    return {
+        "handler": "SearchPolicyHolders",
+        "CoverageDate": date,
+        "Fein": "",
+        "EmployerName": name,
+        "StreetAddress": "",
+        "City": "",
+        "State": "",
+        "ZipCode": zip_code,
+    }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LookupCache(
+        str(tmp_path / "lookups.sqlite3"),
+        ttl_seconds=100,
+        empty_ttl_seconds=10,
+        max_entries=3,
+        evict_every=1000,
+    )
+    yield cache
+    cache.close()
+
+
+def age(cache, params, seconds):
+    """Pretend an entry was stored and last read `seconds` earlier"""
+    cache._conn.execute(
+        "UPDATE lookups SET created_at = created_at - ?, accessed_at = accessed_at - ? WHERE key = ?",
+        (seconds, seconds, make_key(params)),
+    )
+
+
+def test_hit_and_miss(cache):
+    assert cache.get(search("ACME")) is None
+    cache.put(search("ACME"), [{"employer_name": "ACME"}])
+    assert cache.get(search("ACME")) == [{"employer_name": "ACME"}]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(cache):
+    cache.put(search("ACME"), [{"employer_name": "ACME"}])
+    age(cache, search("ACME"), 101)
+    assert cache.get(search("ACME")) is None
+    # peek ignores the TTL
+    assert cache.peek(search("ACME"))[0] == [{"employer_name": "ACME"}]
+
+
+def test_empty_results_use_the_short_ttl(cache):
+    cache.put(search("NOBODY"), [])
+    cache.put(search("ACME"), [{"employer_name": "ACME"}])
+    assert cache.get(search("NOBODY")) == []
+    age(cache, search("NOBODY"), 11)
+    age(cache, search("ACME"), 11)
+    assert cache.get(search("NOBODY")) is None
+    assert cache.get(search("ACME")) is not None
+
+    cache.evict()
+    assert len(cache) == 1
+
+
+def test_evict_drops_expired_then_least_recently_used(cache):
+    for name in ("A", "B", "C", "D", "E"):
+        cache.put(search(name), [{"employer_name": name}])
+        age(cache, search(name), 1)
+        time.sleep(0.001)
+    age(cache, search("A"), 200)  # expired
+    cache.get(search("B"))  # B is now the most recently used
+
+    cache.evict()
+    assert len(cache) == 3
+    assert cache.peek(search("A")) is None
+    assert cache.peek(search("C")) is None
+    for name in ("B", "D", "E"):
+        assert cache.peek(search(name)) is not None
+
+
+def test_put_evicts_every_n_writes(tmp_path):
+    cache = LookupCache(str(tmp_path / "lookups.sqlite3"), max_entries=2, evict_every=4)
+    for index in range(4):
+        cache.put(search(f"EMPLOYER {index}"), [])
+        assert len(cache) == (2 if index == 3 else index + 1)
+    cache.close()
+
+
+def test_detail_memo_fetches_once_and_skips_failures():
+    memo = DetailMemo()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"insurer_name": "STATE FUND"}
+
+    assert memo.get_or_fetch("k", fetch) == {"insurer_name": "STATE FUND"}
+    assert memo.get_or_fetch("k", fetch) == {"insurer_name": "STATE FUND"}
+    assert len(calls) == 1
+
+    assert memo.get_or_fetch("failed", lambda: None) is None
+    assert memo.get_or_fetch("failed", fetch) == {"insurer_name": "STATE FUND"}
@@ -0,0 +1,91 @@
+import json
+
+from progress_journal import ProgressJournal
+
+
+def make_journal(tmp_path, **kwargs):
+    return ProgressJournal(
+        str(tmp_path / "progress.snapshot.jsonl"),
+        str(tmp_path / "progress.journal.jsonl"),
+        legacy_file=str(tmp_path / "progress.json"),
+        **kwargs,
+    )
+
+
+def row(bureau_number, status="Found"):
+    return {"bureau_number": bureau_number, "lookup_status": status}
+
+
+def test_record_and_reload(tmp_path):
+    journal = make_journal(tmp_path)
+    progress = journal.load()
+    assert journal.record(progress, "1", [row("1")])
+    assert journal.record(progress, "2", [])
+    assert not journal.record(progress, "1", [row("1")])
+    journal.close()
+
+    progress = make_journal(tmp_path).load()
+    assert progress["completed"] == ["1", "2"]
+    assert progress.is_completed("2")
+    assert progress.status_counts["Found"] == 1
+    assert [e["bureau_number"] for e in progress.pending([{"bureau_number": b} for b in "123"])] == ["3"]
+
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    """A crash in the middle of an append loses only that record"""
+    journal = make_journal(tmp_path)
+    progress = journal.load()
+    journal.record(progress, "1", [row("1")])
+    journal.close()
+    with open(tmp_path / "progress.journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"bureau_number": "2", "resu')
+
+    journal = make_journal(tmp_path)
+    progress = journal.load()
+    assert progress["completed"] == ["1"]
+
+    # The next append starts on a clean line
+    journal.record(progress, "3", [row("3")])
+    journal.close()
+    progress = make_journal(tmp_path).load()
+    assert progress["completed"] == ["1", "3"]
+
+
+def test_compaction_folds_tail_into_snapshot(tmp_path):
+    journal = make_journal(tmp_path, compact_min=3)
+    progress = journal.load()
+    for bureau_number in "12345":
+        journal.record(progress, bureau_number, [row(bureau_number)])
+    journal.close()
+
+    journal = make_journal(tmp_path, compact_min=3)
+    progress = journal.load()
+    assert progress["completed"] == list("12345")
+    assert journal.snapshot_records == 3
+    assert journal.tail_records == 2
+
+
+def test_crash_between_snapshot_and_truncate(tmp_path):
+    """Records in both the new snapshot and the old journal replay once"""
+    journal = make_journal(tmp_path)
+    progress = journal.load()
+    journal.record(progress, "1", [row("1")])
+    journal.record(progress, "2", [row("2")])
+    journal.close()
+    journal_text = (tmp_path / "progress.journal.jsonl").read_text(encoding="utf-8")
+    journal.compact()
+    (tmp_path / "progress.journal.jsonl").write_text(journal_text, encoding="utf-8")
+
+    progress = make_journal(tmp_path).load()
+    assert progress["completed"] == ["1", "2"]
+    assert len(progress["results"]) == 2
+
+
+def test_legacy_file_is_migrated(tmp_path):
+    legacy = {"completed": ["1", "2"], "results": [row("1"), row("3", "Not Found")]}
+    (tmp_path / "progress.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    progress = make_journal(tmp_path).load()
+    assert progress["completed"] == ["1", "2", "3"]
+    assert progress.status_counts == {"Found": 1, "Not Found": 1}
+    assert (tmp_path / "progress.snapshot.jsonl").exists()
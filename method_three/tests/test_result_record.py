@@ -0,0 +1,33 @@
+import json
+
+from result_record import RESULT_FIELDS, ResultRecord, to_json
+
+
+def make_row(bureau_number, city="FRESNO"):
+    row = dict.fromkeys(RESULT_FIELDS, "")
+    row.update(bureau_number=bureau_number, city=city, lookup_status="Found")
+    return row
+
+
+def test_record_reads_like_its_dict():
+    record = ResultRecord.from_dict(make_row("1"))
+    assert isinstance(record, ResultRecord)
+    assert record["city"] == "FRESNO"
+    assert record.get("missing", "x") == "x"
+    assert dict(record) == make_row("1")
+    assert record == make_row("1")
+    assert json.loads(json.dumps(record, default=to_json)) == make_row("1")
+
+
+def test_non_standard_rows_stay_dicts():
+    row = {"bureau_number": "1", "note": "extra"}
+    assert ResultRecord.from_dict(row) is row
+
+
+def test_records_are_hashable_and_dedupe():
+    first = ResultRecord.from_dict(make_row("1"))
+    same = ResultRecord.from_dict(make_row("1"))
+    other = ResultRecord.from_dict(make_row("1", city="CLOVIS"))
+    assert hash(first) == hash(same)
+    assert {first, same, other} == {first, other}
+    assert len({first: 1, same: 2}) == 1
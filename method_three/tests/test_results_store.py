@@ -0,0 +1,88 @@
+import json
+import os
+
+from results_store import ResultsStore
+
+
+def make_row(bureau_number, status="Found"):
+    return {
+        "bureau_number": bureau_number,
+        "employer_name": f"EMPLOYER {bureau_number}",
+        "street_address": "1 MAIN ST",
+        "city": "FRESNO",
+        "state": "CA",
+        "zip_code": "93701",
+        "insurer_name": "STATE FUND",
+        "fein": "",
+        "lookup_status": status,
+        "extracted_at": "2025-12-05 10:00:00",
+    }
+
+
+def test_append_and_reopen(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    store = ResultsStore(path)
+    assert store.append([make_row("1"), make_row("2")]) == 2
+    assert store.append([]) == 0
+    store.append([make_row("3")])
+    store.close()
+
+    store = ResultsStore(path)
+    assert len(store) == 3
+    assert store.get(1)["bureau_number"] == "2"
+    assert [row["bureau_number"] for row in store.iter_results(start=1)] == ["2", "3"]
+    store.close()
+
+
+def test_recover_drops_unindexed_rows(tmp_path):
+    """A crash after the data write but before the index write"""
+    path = str(tmp_path / "results.jsonl")
+    store = ResultsStore(path)
+    store.append([make_row("1"), make_row("2")])
+    store.close()
+    with open(path, "ab") as data:
+        data.write((json.dumps(make_row("3")) + "\n").encode("utf-8"))
+
+    store = ResultsStore(path)
+    assert len(store) == 2
+    assert [row["bureau_number"] for row in store.iter_results()] == ["1", "2"]
+    store.append([make_row("4")])
+    assert store.get(2)["bureau_number"] == "4"
+    store.close()
+
+
+def test_recover_drops_torn_row_and_partial_offset(tmp_path):
+    """A crash in the middle of the data write and of the index write"""
+    path = str(tmp_path / "results.jsonl")
+    store = ResultsStore(path)
+    store.append([make_row("1")])
+    store.close()
+
+    size = os.path.getsize(path)
+    with open(path, "ab") as data:
+        data.write(b'{"bureau_number": "2", "empl')
+    with open(f"{path}.idx", "ab") as index:
+        index.write(size.to_bytes(8, "little") + b"\x00\x00\x00")
+
+    store = ResultsStore(path)
+    assert len(store) == 1
+    assert os.path.getsize(path) == size
+    assert os.path.getsize(f"{path}.idx") == 8
+    assert list(store.iter_results()) == [make_row("1")]
+    store.close()
+
+
+def test_export_writes_csv_and_json(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.jsonl"))
+    rows = [make_row("1"), make_row("2", status="Not Found")]
+    store.append(rows)
+    csv_file = tmp_path / "out.csv"
+    json_file = tmp_path / "out.json"
+
+    assert store.export(str(csv_file), str(json_file)) == 2
+    assert json.loads(json_file.read_text(encoding="utf-8")) == rows
+    assert json_file.read_text(encoding="utf-8") == json.dumps(rows, indent=2, ensure_ascii=False)
+    lines = csv_file.read_text(encoding="utf-8").splitlines()
+    assert lines[0].split("\t")[0] == "Bureau Number"
+    assert lines[2].split("\t")[-1] == "Not Found"
+    store.close()